@@ -9,6 +9,7 @@ Example to use this script to run end-end ML pipeline using mlflow with split_si
     $ mlflow run . -P split_size=0.2
 """
 import configparser
+import json
 import logging
 import sys
 
@@ -16,7 +17,13 @@ import mlflow
 import mlflow.sklearn
 from mlflow.models.signature import infer_signature
 
-from housing_value.ingest_data import data_ingestion, data_labeling, save_split_data
+from housing_value.feature_store import build_feature_store
+from housing_value.ingest_data import (
+    data_ingestion,
+    data_labeling,
+    incremental_ingestion,
+    save_split_data,
+)
 from housing_value.score import load_scoring_data, scoring_with_pipeline
 from housing_value.train import load_training_data, training_with_pipeline
 
@@ -44,6 +51,40 @@ if __name__ == "__main__":
     HOUSING_URL = str(config["Default"]["raw_data_url"])
     HOUSING_PATH = str(config["Default"]["raw_data"])
     PROCESSED_DATA = str(config["Default"]["processed_data"])
+    DATA_FORMAT = str(config["Default"]["data_format"])
+    FLOAT_DTYPE = str(config["Data"]["float_dtype"])
+    CACHE_DATA = str(config["Default"]["cache_data"])
+    ENGINE = str(config["Train"]["engine"])
+    FINAL_STRATEGY = str(config["Train"]["final_strategy"])
+    PREDICT_ENGINE = str(config["Score"]["predict_engine"])
+    COMPACT = (
+        str(config["Train"]["compact_dtype"])
+        if config.getboolean("Train", "compact")
+        else None
+    )
+    PROFILE_REPORT = (
+        str(config["Train"]["profile_report"])
+        if config.getboolean("Train", "profile")
+        else None
+    )
+    PARAM_GRID = "boosting_param_grid" if ENGINE == "boosting" else "param_grid"
+    DISTRIBUTED = (
+        {
+            "address": str(config["Distributed"]["address"]),
+            "local_workers": int(config["Distributed"]["local_workers"]),
+            "shared_path": str(config["Distributed"]["shared_data"]),
+            "task_timeout": float(config["Distributed"]["task_timeout"]),
+        }
+        if config.getboolean("Distributed", "distributed")
+        else None
+    )
+    FEATURE_DATA = (
+        str(config["Default"]["feature_data"])
+        if config.getboolean("Default", "feature_store")
+        else None
+    )
+    CACHE_SIZE = int(float(config["Default"]["cache_size_mb"]) * 1024**2)
+    CACHE_AGE = float(config["Default"]["cache_age_days"]) * 24 * 60 * 60
     PICKLE_DATA = str(config["Default"]["pickle_data"])
     PIPE_FILE = str(config["Default"]["pipe_file"])
     OUTPUT_FILE = str(config["Default"]["output_file"])
@@ -57,11 +98,44 @@ if __name__ == "__main__":
 
         with mlflow.start_run(run_name="INGEST_DATA", nested=True) as ingest_data:
             mlflow.log_param("ingest_data", "yes")
-            housing = data_ingestion(housing_url=HOUSING_URL, housing_path=HOUSING_PATH)
-            housing = data_labeling(df=housing)
-            strat_train_set, strat_test_set = save_split_data(
-                df=housing, processed_path=PROCESSED_DATA, split_size=split_size
-            )
+            if config.getboolean("Default", "incremental_ingestion"):
+                manifest = incremental_ingestion(
+                    sources=HOUSING_URL,
+                    housing_path=HOUSING_PATH,
+                    processed_path=PROCESSED_DATA,
+                    split_size=split_size,
+                    data_format=DATA_FORMAT,
+                    cache_path=CACHE_DATA,
+                    max_cache_size=CACHE_SIZE,
+                    max_cache_age=CACHE_AGE,
+                    float_dtype=FLOAT_DTYPE,
+                )
+            else:
+                housing = data_ingestion(
+                    housing_url=HOUSING_URL,
+                    housing_path=HOUSING_PATH,
+                    cache_path=CACHE_DATA,
+                    max_cache_size=CACHE_SIZE,
+                    max_cache_age=CACHE_AGE,
+                    stream=config.getboolean("Default", "stream_raw_data"),
+                    data_format=DATA_FORMAT,
+                    float_dtype=FLOAT_DTYPE,
+                    max_workers=int(config["Default"]["ingest_workers"]) or None,
+                )
+                housing = data_labeling(df=housing)
+                strat_train_set, strat_test_set = save_split_data(
+                    df=housing,
+                    processed_path=PROCESSED_DATA,
+                    split_size=split_size,
+                    data_format=DATA_FORMAT,
+                )
+            if FEATURE_DATA:
+                build_feature_store(
+                    processed_path=PROCESSED_DATA,
+                    feature_path=FEATURE_DATA,
+                    data_format=DATA_FORMAT,
+                    float_dtype=FLOAT_DTYPE,
+                )
             logger.info(f"ingest_data run_id : {ingest_data.info.run_id}")
             mlflow.log_param("split_size", split_size)
             # mlflow.log_artifact(f"{HOUSING_PATH}/housing.csv")
@@ -71,23 +145,80 @@ if __name__ == "__main__":
 
         with mlflow.start_run(run_name="TRAIN_MODEL", nested=True) as train_model:
             mlflow.log_param("train_model", "yes")
-            housing, housing_labels = load_training_data(processed_path=PROCESSED_DATA)
+            housing, housing_labels = load_training_data(
+                processed_path=PROCESSED_DATA,
+                data_format=DATA_FORMAT,
+                float_dtype=FLOAT_DTYPE,
+                feature_path=FEATURE_DATA,
+            )
             pipe, best_param = training_with_pipeline(
                 df=housing,
                 labels=housing_labels,
                 pickle_path=PICKLE_DATA,
                 pipe_file=PIPE_FILE,
+                preprocessor=str(config["Train"]["preprocessor"]),
+                cache_path=str(config["Train"]["pipeline_cache"]),
+                cache_size=int(
+                    float(config["Train"]["pipeline_cache_size_mb"]) * 1024**2
+                ),
+                n_jobs=int(config["Train"]["n_jobs"]),
+                backend=str(config["Train"]["backend"]),
+                forest_jobs=int(config["Train"]["forest_jobs"]),
+                strategy=str(config["Search"]["strategy"]),
+                param_grid=json.loads(config["Search"][PARAM_GRID]),
+                n_iter=int(config["Search"]["n_iter"]),
+                resource=str(config["Search"]["halving_resource"]),
+                factor=int(config["Search"]["halving_factor"]),
+                warm_start=config.getboolean("Search", "warm_start"),
+                results_path=str(config["Search"]["results_data"]) or None,
+                distributed=DISTRIBUTED,
+                engine=ENGINE,
+                report_path=str(config["Train"]["engine_report"]),
+                final=FINAL_STRATEGY,
+                profile_path=PROFILE_REPORT,
+                compact=COMPACT,
             )
             logger.info(f"train_model run_id : {train_model.info.run_id}")
             # mlflow.log_artifact(f"{PROCESSED_DATA}/train.csv")
+            mlflow.log_param("engine", ENGINE)
             mlflow.log_param("best_estimator", best_param)
+            mlflow.log_param("final_strategy", FINAL_STRATEGY)
+            if PROFILE_REPORT:
+                with open(PROFILE_REPORT) as file:
+                    profile = json.load(file)
+                # one step per fit, in the order of candidates then folds
+                for step, fit in enumerate(profile["fits"]):
+                    mlflow.log_metrics(
+                        {
+                            f"fit_{key}": fit[key]
+                            for key in (
+                                "wall_time",
+                                "cpu_time",
+                                "peak_rss",
+                                "rss_growth",
+                                "model_size",
+                            )
+                            if key in fit
+                        },
+                        step=step,
+                    )
+                mlflow.log_artifact(PROFILE_REPORT)
+            # testing data is read while the pipe is refitted in the background
+            X_test, y_test = load_scoring_data(
+                processed_path=PROCESSED_DATA,
+                data_format=DATA_FORMAT,
+                float_dtype=FLOAT_DTYPE,
+                feature_path=FEATURE_DATA,
+            )
+            if FINAL_STRATEGY == "background":
+                pipe = pipe.result()
             signature = infer_signature(housing, pipe.predict(housing))
             mlflow.sklearn.log_model(pipe, "model", signature=signature)
             logger.info(f"Saving artifacts at : {mlflow.get_artifact_uri()}")
 
         with mlflow.start_run(run_name="SCORE_MODEL", nested=True) as score_model:
             mlflow.log_param("score_model", "yes")
-            X_test, y_test = load_scoring_data(processed_path=PROCESSED_DATA)
+            mlflow.log_param("predict_engine", PREDICT_ENGINE)
             output, rmse = scoring_with_pipeline(
                 df=X_test,
                 actuals=y_test,
@@ -95,6 +226,8 @@ if __name__ == "__main__":
                 pipe_file=PIPE_FILE,
                 output_path=PROCESSED_DATA,
                 output_file=OUTPUT_FILE,
+                engine=PREDICT_ENGINE,
+                n_jobs=int(config["Score"]["predict_jobs"]),
             )
             logger.info(f"score_model run_id : {score_model.info.run_id}")
             # mlflow.log_artifact(f"{PROCESSED_DATA}/test.csv")
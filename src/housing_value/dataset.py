@@ -0,0 +1,602 @@
+"""
+Notes
+-----
+Use this module to read and write the housing datasets in csv, parquet or feather format.
+Parquet and feather (Arrow IPC) files keep a typed schema with ocean_proximity stored as
+a dictionary-encoded column and support reading a subset of columns. The housing schema
+fixes the dtypes of the ten housing columns at load time. Datasets can also be read and
+written in bounded-size chunks, and rows can be appended to a dataset as part files
+(for e.g - train.part-000001.csv) which are read back together with the dataset.
+"""
+import glob
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATA_FORMATS = ("csv", "parquet", "feather")
+
+# manifest of the sources behind the parts of datasets, see incremental_ingestion
+MANIFEST_FILE = "manifest.json"
+
+CATEGORICAL_COLUMNS = ["ocean_proximity"]
+
+NUMERIC_COLUMNS = [
+    "longitude",
+    "latitude",
+    "housing_median_age",
+    "total_rooms",
+    "total_bedrooms",
+    "population",
+    "households",
+    "median_income",
+    "median_house_value",
+]
+
+OCEAN_PROXIMITY_CATEGORIES = ["<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN"]
+
+
+def housing_schema(float_dtype="float64"):
+    """Function to build the dtypes of the housing columns.
+
+    Parameters
+    ----------
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    schema : dictionary
+        The dtype of each housing column, ocean_proximity is categorical.
+
+    """
+    schema = {column: float_dtype for column in NUMERIC_COLUMNS}
+    schema["ocean_proximity"] = pd.CategoricalDtype(OCEAN_PROXIMITY_CATEGORIES)
+    return schema
+
+
+def csv_schema(float_dtype="float64"):
+    """Function to build the dtypes used while parsing housing csv data.
+
+    Categorical columns are parsed with inferred categories so that unknown values
+    are reported by apply_schema instead of being silently dropped by the parser.
+
+    Parameters
+    ----------
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    schema : dictionary
+        The dtype of each housing column for pandas.read_csv.
+
+    """
+    schema = housing_schema(float_dtype)
+    schema.update({column: "category" for column in CATEGORICAL_COLUMNS})
+    return schema
+
+
+def apply_schema(df, float_dtype="float64"):
+    """Function to cast the housing columns of a dataframe to the housing schema.
+
+    Values of ocean_proximity outside the known categories become missing values,
+    with a warning naming them.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe to cast, columns outside the schema are kept as is.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe with housing schema.
+
+    """
+    dtypes = {
+        column: dtype
+        for column, dtype in housing_schema(float_dtype).items()
+        if column in df.columns and df[column].dtype != dtype
+    }
+    if not dtypes:
+        return df
+    unknown = {
+        column: df[column][
+            df[column].notna() & ~df[column].isin(dtypes[column].categories)
+        ]
+        for column in CATEGORICAL_COLUMNS
+        if column in dtypes
+    }
+    df = df.astype(dtypes)
+    for column, values in unknown.items():
+        if len(values):
+            logger.warning(
+                f"Unknown values of {column} set to missing in {len(values)} rows : "
+                f"{sorted(values.astype(str).unique())}"
+            )
+    return df
+
+
+def log_memory_usage(df, stage):
+    """Function to log the in-memory footprint of a dataframe.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe to measure.
+    stage : str
+        The name of stage reported in log (for e.g - ingest).
+
+    Returns
+    -------
+    nbytes : int
+        The memory usage of dataframe in bytes.
+
+    """
+    nbytes = int(df.memory_usage(index=True, deep=True).sum())
+    logger.info(
+        f"Memory usage of {stage} data : {nbytes / 1024 ** 2:.2f} MB "
+        f"for {len(df)} rows, dtypes : {df.dtypes.astype(str).value_counts().to_dict()}"
+    )
+    return nbytes
+
+
+def drop_columns(df, columns):
+    """Function to drop columns of a dataframe without copying the remaining columns.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe, which is left unchanged.
+    columns : list
+        The columns to drop, missing columns are ignored.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe whose columns are views of the columns of df.
+
+    """
+    df = df.copy(deep=False)
+    for column in columns:
+        if column in df.columns:
+            del df[column]
+    return df
+
+
+def take_rows(df, index, exclude=None):
+    """Function to gather rows of a dataframe by position in a single copy.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe.
+    index : object
+        The numpy array of row positions or boolean mask of rows.
+    exclude : list
+        The columns left out of the gathered rows.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe of gathered rows.
+
+    """
+    if np.asarray(index).dtype == bool:
+        index = np.flatnonzero(index)
+    return drop_columns(df.take(index), exclude or [])
+
+
+def dataset_path(path, name, data_format="csv"):
+    """Function to build the file path of a dataset.
+
+    Parameters
+    ----------
+    path : str
+        The directory of dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+
+    Returns
+    -------
+    file_path : str
+        The file path of dataset.
+
+    """
+    if data_format not in DATA_FORMATS:
+        raise ValueError(
+            f"Unsupported data format : {data_format}, choose from {DATA_FORMATS}"
+        )
+    return os.path.join(path, f"{name}.{data_format}")
+
+
+def dataset_files(path, name, data_format="csv"):
+    """Function to list the files of a dataset, the dataset file followed by its parts.
+
+    Parameters
+    ----------
+    path : str
+        The directory of dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+
+    Returns
+    -------
+    file_paths : list
+        The existing file paths of dataset in reading order.
+
+    """
+    file_path = dataset_path(path, name, data_format)
+    parts = glob.glob(
+        os.path.join(
+            glob.escape(str(path)), f"{glob.escape(name)}.part-*.{data_format}"
+        )
+    )
+    return ([file_path] if os.path.exists(file_path) else []) + sorted(parts)
+
+
+def remove_dataset_parts(path, name, data_format="csv"):
+    """Function to remove the appended parts of a dataset and the manifest of them.
+
+    The manifest of incremental ingestion is removed too, as it would otherwise keep
+    recording sources whose parts are gone and the next incremental ingestion would
+    skip them.
+
+    Parameters
+    ----------
+    path : str
+        The directory of dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+
+    Returns
+    -------
+    none : None
+        Only removes part files and manifest.
+
+    """
+    for file_path in dataset_files(path, name, data_format)[1:]:
+        os.remove(file_path)
+        logger.debug(f"Removed stale part : {file_path}")
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+        logger.info(f"Removed manifest of rewritten {name} dataset : {manifest_path}")
+    return None
+
+
+def next_part_name(path, name, data_format="csv", part=None):
+    """Function to name the next part to append to a dataset.
+
+    Parameters
+    ----------
+    path : str
+        The directory of dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+    part : str
+        The tag of part, the next free sequence number is used if not provided.
+
+    Returns
+    -------
+    part_name : str
+        The name of part without extension (for e.g - train.part-000001), or name
+        itself if the dataset does not exist yet.
+
+    """
+    if part:
+        return f"{name}.part-{part}"
+    files = dataset_files(path, name, data_format)
+    if not files:
+        return name
+    sequence = len(files)
+    while os.path.exists(
+        dataset_path(path, f"{name}.part-{sequence:06d}", data_format)
+    ):
+        sequence += 1
+    return f"{name}.part-{sequence:06d}"
+
+
+def arrow_table(df):
+    """Function to convert a dataframe to an Arrow table with dictionary-encoded
+    categorical columns.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe to convert.
+
+    Returns
+    -------
+    table : object
+        The pyarrow.Table of dataframe.
+
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for column in CATEGORICAL_COLUMNS:
+        if column in table.column_names and not pa.types.is_dictionary(
+            table.schema.field(column).type
+        ):
+            table = table.set_column(
+                table.column_names.index(column),
+                column,
+                table.column(column).dictionary_encode(),
+            )
+    return table
+
+
+def write_dataset(df, path, name, data_format="csv"):
+    """Function to write a dataset in the given format.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe to write.
+    path : str
+        The directory to store dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+
+    Returns
+    -------
+    file_path : str
+        The file path of written dataset.
+
+    """
+    file_path = dataset_path(path, name, data_format)
+    if ".part-" not in name:
+        remove_dataset_parts(path, name, data_format)
+    if data_format == "csv":
+        df.to_csv(path_or_buf=file_path, index=False)
+    elif data_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(arrow_table(df), file_path)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(arrow_table(df), file_path)
+    logger.debug(f"Wrote {name} dataset to : {file_path}")
+    return file_path
+
+
+def append_dataset(df, path, name, data_format="csv", part=None):
+    """Function to append rows to a dataset as a new part file.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe of rows to append.
+    path : str
+        The directory of dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+    part : str
+        The tag of part, the next free sequence number is used if not provided.
+
+    Returns
+    -------
+    file_path : str
+        The file path of written part.
+
+    """
+    return write_dataset(
+        df, path, next_part_name(path, name, data_format, part), data_format
+    )
+
+
+def read_dataset(path, name, data_format="csv", columns=None, float_dtype=None):
+    """Function to read a dataset in the given format.
+
+    Parameters
+    ----------
+    path : str
+        The directory to read dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+    columns : list
+        The columns to read, all columns are read if not provided.
+    float_dtype : str
+        The dtype of numeric housing columns to enforce housing schema, columns are
+        read with their stored or inferred dtypes if not provided.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe of dataset.
+
+    """
+    file_paths = dataset_files(path, name, data_format) or [
+        dataset_path(path, name, data_format)
+    ]
+    frames = []
+    for file_path in file_paths:
+        logger.debug(f"Reading {name} dataset from : {file_path}")
+        if data_format == "csv":
+            dtype = csv_schema(float_dtype) if float_dtype else None
+            df = pd.read_csv(filepath_or_buffer=file_path, usecols=columns, dtype=dtype)
+        elif data_format == "parquet":
+            df = pd.read_parquet(file_path, engine="pyarrow", columns=columns)
+        else:
+            df = pd.read_feather(file_path, columns=columns)
+        frames.append(df)
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if float_dtype:
+        df = apply_schema(df, float_dtype)
+    return df
+
+
+def read_dataset_chunks(
+    path, name, data_format="csv", chunksize=100000, columns=None, float_dtype=None
+):
+    """Function to read a dataset in the given format in chunks.
+
+    Parameters
+    ----------
+    path : str
+        The directory to read dataset.
+    name : str
+        The name of dataset without extension (for e.g - train).
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+    chunksize : int
+        The maximum number of rows per chunk.
+    columns : list
+        The columns to read, all columns are read if not provided.
+    float_dtype : str
+        The dtype of numeric housing columns to enforce housing schema, columns are
+        read with their stored or inferred dtypes if not provided.
+
+    Yields
+    ------
+    df : object
+        The pandas dataframe of next chunk of dataset.
+
+    """
+    file_paths = dataset_files(path, name, data_format) or [
+        dataset_path(path, name, data_format)
+    ]
+    for file_path in file_paths:
+        logger.debug(f"Reading {name} dataset in chunks from : {file_path}")
+        dtype = csv_schema(float_dtype) if float_dtype else None
+        for df in read_file_chunks(file_path, data_format, chunksize, columns, dtype):
+            yield apply_schema(df, float_dtype) if float_dtype else df
+
+
+def read_file_chunks(
+    file_path, data_format="csv", chunksize=100000, columns=None, dtype=None
+):
+    """Function to read a single dataset file in chunks.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of dataset.
+    data_format : str
+        The format of dataset, one of csv, parquet or feather.
+    chunksize : int
+        The maximum number of rows per chunk.
+    columns : list
+        The columns to read, all columns are read if not provided.
+    dtype : dictionary
+        The dtypes used while parsing csv data.
+
+    Yields
+    ------
+    df : object
+        The pandas dataframe of next chunk of file.
+
+    """
+    if data_format == "csv":
+        with pd.read_csv(
+            filepath_or_buffer=file_path,
+            usecols=columns,
+            dtype=dtype,
+            chunksize=chunksize,
+        ) as reader:
+            yield from reader
+        return
+    if data_format == "parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(file_path).iter_batches(
+            batch_size=chunksize, columns=columns
+        )
+    else:
+        import pyarrow as pa
+
+        reader = pa.ipc.open_file(pa.memory_map(file_path))
+        batches = (
+            batch.slice(offset, chunksize)
+            for batch in map(reader.get_batch, range(reader.num_record_batches))
+            for offset in range(0, batch.num_rows, chunksize)
+        )
+    for batch in batches:
+        if columns and data_format == "feather":
+            batch = batch.select(columns)
+        yield batch.to_pandas()
+
+
+class DatasetWriter:
+    """Class to write a dataset in the given format incrementally, one chunk at a time.
+
+    Parquet chunks are written as row groups and feather chunks as record batches of
+    an Arrow IPC file, so chunks must share the same schema.
+
+    """
+
+    def __init__(self, path, name, data_format="csv"):
+        self.file_path = dataset_path(path, name, data_format)
+        if ".part-" not in name:
+            remove_dataset_parts(path, name, data_format)
+        self.data_format = data_format
+        self.writer = None
+        self.schema = None
+        self.rows = 0
+        self.started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, df):
+        if self.data_format == "csv":
+            df.to_csv(
+                path_or_buf=self.file_path,
+                mode="a" if self.started else "w",
+                header=not self.started,
+                index=False,
+            )
+        else:
+            table = arrow_table(df)
+            if self.schema is None:
+                self.schema = table.schema
+            elif not table.schema.equals(self.schema, check_metadata=False):
+                table = table.cast(self.schema)
+            if self.writer is None and (len(df) or not self.started):
+                self.writer = self.open_writer()
+            if len(df):
+                self.writer.write_table(table)
+        self.started = True
+        self.rows += len(df)
+        return self.rows
+
+    def open_writer(self):
+        if self.data_format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.file_path, self.schema)
+        import pyarrow as pa
+
+        return pa.ipc.new_file(self.file_path, self.schema)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        logger.debug(f"Wrote {self.rows} rows to : {self.file_path}")
+        return self.rows
@@ -0,0 +1,504 @@
+"""
+Notes
+-----
+Use this module to spread the fits of a hyperparameter search over worker processes
+on this and other hosts.
+DistributedSearchCV is a ForestSearchCV whose coordinator writes the estimator, data
+and folds of a search once to a shared directory and serves a queue of (group of
+candidates, fold) tasks with multiprocessing.managers. Workers, either local processes
+started by the coordinator or processes started on other hosts with this script, open
+the job file with memory-mapped arrays, grow the forests of their tasks and send the
+scores back, from which the coordinator picks best_params_ and refits.
+Workers report the tasks they start, and the coordinator queues again a task whose
+local worker died or which has run longer than task_timeout, failing the search once
+a task is lost more than task_retries times or no worker takes a task in time.
+The manager unpickles what its clients send, so coordinator and workers share a secret
+authentication key, given with --authkey or the HOUSING_VALUE_AUTHKEY environment
+variable. A coordinator without one generates a random key per search and writes it
+to a file readable only by its user in the shared directory.
+    $ HOUSING_VALUE_AUTHKEY=secret python src/housing_value/distributed.py --address coordinator:50000
+optional arguments:
+    -h, --help            show this help message and exit
+    --address ADDRESS     host:port of search coordinator, default val in setup.cfg: localhost:50000
+    --authkey AUTHKEY     authentication key shared with coordinator, default val: HOUSING_VALUE_AUTHKEY environment
+                          variable
+    --log-level LEVEL     provide logging level, default val in setup.cfg: DEBUG
+    --log-data LOG        file to store log data, default val in setup.cfg: logs/main.log if no console display is opted else default is console
+                          display
+    --no-console-log      do not display log on console
+"""
+import argparse
+import configparser
+import logging
+import multiprocessing
+import os
+import queue
+import secrets
+import shutil
+import socket
+import tempfile
+import time
+import traceback
+import uuid
+from multiprocessing.managers import BaseManager
+
+import joblib
+
+from housing_value.search import ForestSearchCV, fit_and_score_group
+
+logger = logging.getLogger(__name__)
+
+formatter = logging.Formatter(
+    "%(asctime)s %(name)s %(filename)s.%(funcName)s(%(lineno)d) %(levelname)s %(message)s",
+    datefmt="%m/%d/%Y %I:%M:%S %p",
+)
+
+# environment variable holding the authentication key of coordinator and workers
+AUTHKEY_ENV = "HOUSING_VALUE_AUTHKEY"
+
+# seconds given to local workers to exit once the manager is shut down
+WORKER_TIMEOUT = 10
+
+# result sent by a worker when it takes a task, ahead of the result of the task
+TASK_STARTED = "started"
+
+# queues live in the server process of SearchManager and are reached through proxies
+_tasks = queue.Queue()
+_results = queue.Queue()
+
+
+def _get_tasks():
+    return _tasks
+
+
+def _get_results():
+    return _results
+
+
+class SearchManager(BaseManager):
+    """Class to serve the task and result queues of a distributed search."""
+
+
+SearchManager.register("tasks", callable=_get_tasks)
+SearchManager.register("results", callable=_get_results)
+
+
+def parse_address(address):
+    """Function to parse the address of a search coordinator.
+
+    Parameters
+    ----------
+    address : str or tuple
+        The host:port string or (host, port) tuple of coordinator.
+
+    Returns
+    -------
+    address : tuple
+        The (host, port) tuple of coordinator.
+
+    """
+    if isinstance(address, str):
+        host, _, port = address.rpartition(":")
+        return host, int(port)
+    return tuple(address)
+
+
+def search_authkey(authkey=None):
+    """Function to get the authentication key of a distributed search.
+
+    Parameters
+    ----------
+    authkey : str or bytes
+        The authentication key, read from HOUSING_VALUE_AUTHKEY environment variable
+        if not provided.
+
+    Returns
+    -------
+    authkey : bytes
+        The authentication key, None if neither provided nor set in environment.
+
+    """
+    authkey = authkey or os.environ.get(AUTHKEY_ENV)
+    if isinstance(authkey, str):
+        return authkey.encode()
+    return authkey
+
+
+def search_worker(address, authkey):
+    """Function to run the tasks of a distributed search until it is finished.
+
+    Parameters
+    ----------
+    address : str or tuple
+        The address of search coordinator.
+    authkey : bytes
+        The authentication key shared with coordinator.
+
+    Returns
+    -------
+    n_tasks : int
+        The number of tasks run by worker.
+
+    """
+    manager = SearchManager(address=parse_address(address), authkey=authkey)
+    manager.connect()
+    tasks, results = manager.tasks(), manager.results()
+    logger.debug(f"Connected search worker {os.getpid()} to : {address}")
+    worker = (socket.gethostname(), os.getpid())
+    jobs = {}
+    n_tasks = 0
+    while True:
+        try:
+            task = tasks.get()
+        except (EOFError, OSError):
+            # coordinator shuts its manager down once the search is over
+            break
+        job_path, position, indices, fold = task
+        try:
+            results.put((position, worker, TASK_STARTED))
+        except (EOFError, OSError):
+            break
+        try:
+            if job_path not in jobs:
+                jobs = {job_path: joblib.load(job_path, mmap_mode="r")}
+            job = jobs[job_path]
+            train, test = job["folds"][fold]
+            result = fit_and_score_group(
+                job["estimator"],
+                job["X"],
+                job["y"],
+                train,
+                test,
+                job["candidate_params"],
+                indices,
+                job["scorer"],
+                job["n_estimators_param"],
+                job["return_train_score"],
+                job["store"],
+                fold,
+                job["model_path"],
+                job["profile"],
+            )
+        except Exception:
+            result = RuntimeError(
+                f"Search task {position} failed on worker {os.getpid()} :\n"
+                f"{traceback.format_exc()}"
+            )
+        try:
+            results.put((position, worker, result))
+        except (EOFError, OSError):
+            break
+        n_tasks += 1
+    logger.debug(f"Search worker {os.getpid()} ran {n_tasks} tasks")
+    return n_tasks
+
+
+def serve_searches(address, authkey, wait=5, n_searches=None):
+    """Function to run the tasks of one distributed search after another.
+
+    Parameters
+    ----------
+    address : str or tuple
+        The address of search coordinator.
+    authkey : bytes
+        The authentication key shared with coordinator.
+    wait : float
+        The seconds to wait before connecting again when no coordinator is listening
+        or a search is over.
+    n_searches : int
+        The number of searches to serve, searches are served until interrupted if not
+        provided.
+
+    Returns
+    -------
+    n_tasks : int
+        The number of tasks run by worker across searches.
+
+    """
+    n_tasks = 0
+    n_served = 0
+    while n_searches is None or n_served < n_searches:
+        try:
+            n_tasks += search_worker(address, authkey)
+            n_served += 1
+        except ConnectionRefusedError:
+            logger.debug(f"Waiting for search coordinator at : {address}")
+        time.sleep(wait)
+    return n_tasks
+
+
+class DistributedSearchCV(ForestSearchCV):
+    """Class to search random forest parameters with fits spread over worker processes.
+
+    It takes the parameters of ForestSearchCV and exposes the same results. The
+    coordinator listens at address, where port 0 picks a free port, and starts
+    local_workers worker processes on this host, while workers on other hosts join
+    with search_worker given address and authkey. The job file is written to
+    shared_path, which workers on other hosts must reach at the same path, and a
+    temporary directory is used if not provided. Fold estimators are dumped there too.
+    A task is queued again when its local worker dies or it runs longer than
+    task_timeout seconds, up to task_retries times, and the search fails if no worker
+    takes a task for task_timeout seconds.
+    authkey defaults to HOUSING_VALUE_AUTHKEY environment variable, and a random key
+    is generated for every search if it is not set and written to a file readable only
+    by the user in shared_path, whose path is logged.
+
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        n_jobs=None,
+        cv=5,
+        return_train_score=True,
+        n_estimators_param="n_estimators",
+        warm_start=True,
+        n_iter=None,
+        random_state=None,
+        results_path=None,
+        refit=True,
+        keep_fold_estimators=False,
+        profile=False,
+        address="localhost:0",
+        authkey=None,
+        local_workers=2,
+        shared_path=None,
+        task_timeout=3600,
+        task_retries=1,
+    ):
+        super().__init__(
+            estimator,
+            param_grid,
+            scoring=scoring,
+            n_jobs=n_jobs,
+            cv=cv,
+            return_train_score=return_train_score,
+            n_estimators_param=n_estimators_param,
+            warm_start=warm_start,
+            n_iter=n_iter,
+            random_state=random_state,
+            results_path=results_path,
+            refit=refit,
+            keep_fold_estimators=keep_fold_estimators,
+            profile=profile,
+        )
+        self.address = address
+        self.authkey = authkey
+        self.local_workers = local_workers
+        self.shared_path = shared_path
+        self.task_timeout = task_timeout
+        self.task_retries = task_retries
+
+    def _model_path(self):
+        if not self.shared_path:
+            return super()._model_path()
+        os.makedirs(self.shared_path, exist_ok=True)
+        return tempfile.mkdtemp(prefix="fold-estimators-", dir=self.shared_path)
+
+    def _fit_groups(self, X, y, candidate_params, groups, folds, store, model_path):
+        shared_path = self.shared_path or tempfile.mkdtemp(prefix="search-")
+        os.makedirs(shared_path, exist_ok=True)
+        job_name = f"search-{uuid.uuid4().hex}"
+        job_path = os.path.join(shared_path, f"{job_name}.joblib")
+        authkey_path = None
+        joblib.dump(
+            {
+                "estimator": self.estimator,
+                "X": X,
+                "y": y,
+                "folds": folds,
+                "candidate_params": candidate_params,
+                "scorer": self.scorer_,
+                "n_estimators_param": self.n_estimators_param,
+                "return_train_score": self.return_train_score,
+                "store": store,
+                "model_path": model_path,
+                "profile": self.profile,
+            },
+            job_path,
+        )
+        authkey = search_authkey(self.authkey)
+        if not authkey:
+            authkey = secrets.token_hex(16).encode()
+            authkey_path = os.path.join(shared_path, f"{job_name}.authkey")
+            with os.fdopen(
+                os.open(authkey_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb"
+            ) as file:
+                file.write(authkey)
+            logger.info(
+                f"Generated authkey of search, start remote workers with "
+                f"{AUTHKEY_ENV} set to the content of : {authkey_path}"
+            )
+        manager = SearchManager(address=parse_address(self.address), authkey=authkey)
+        manager.start()
+        workers = [
+            multiprocessing.Process(
+                target=search_worker, args=(manager.address, authkey), daemon=True
+            )
+            for _ in range(self.local_workers)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            tasks, results = manager.tasks(), manager.results()
+            n_splits = len(folds)
+            queued = [
+                (job_path, group * n_splits + fold, indices, fold)
+                for group, indices in enumerate(groups)
+                for fold in range(n_splits)
+            ]
+            for task in queued:
+                tasks.put(task)
+            logger.info(
+                f"Serving {len(queued)} search tasks to "
+                f"{self.local_workers} local workers at : {manager.address}"
+            )
+            out = self._collect_results(tasks, results, queued, workers)
+        finally:
+            # local and remote workers blocked on the queues stop with the manager
+            manager.shutdown()
+            for worker in workers:
+                worker.join(timeout=WORKER_TIMEOUT)
+                if worker.is_alive():
+                    worker.terminate()
+            os.remove(job_path)
+            if authkey_path:
+                os.remove(authkey_path)
+            if not self.shared_path:
+                shutil.rmtree(shared_path, ignore_errors=True)
+        return out
+
+    def _collect_results(self, tasks, results, queued, workers):
+        out = [None] * len(queued)
+        done = [False] * len(queued)
+        running = {}
+        retries = [0] * len(queued)
+        last_message = time.monotonic()
+        while not all(done):
+            try:
+                position, worker, result = results.get(timeout=1)
+            except queue.Empty:
+                now = time.monotonic()
+                dead = {
+                    (socket.gethostname(), process.pid)
+                    for process in workers
+                    if not process.is_alive()
+                }
+                for position, (worker, started) in list(running.items()):
+                    if worker in dead or now - started > self.task_timeout:
+                        del running[position]
+                        retries[position] += 1
+                        if retries[position] > self.task_retries:
+                            raise RuntimeError(
+                                f"Search task {position} was lost "
+                                f"{retries[position]} times, last on worker {worker}"
+                            )
+                        logger.warning(
+                            f"Queueing again search task {position} lost on worker "
+                            f"{worker}"
+                        )
+                        tasks.put(queued[position])
+                if (
+                    workers
+                    and not running
+                    and len(dead) == len(workers)
+                    and now - last_message > WORKER_TIMEOUT
+                ):
+                    raise RuntimeError(
+                        "Local search workers exited before search ended"
+                    )
+                if not running and now - last_message > self.task_timeout:
+                    raise RuntimeError(
+                        f"No search worker took a task for {self.task_timeout} "
+                        f"seconds, {done.count(False)} tasks were left"
+                    )
+                continue
+            last_message = time.monotonic()
+            if done[position]:
+                # a task queued again may also finish on the worker that was too slow
+                continue
+            if isinstance(result, str) and result == TASK_STARTED:
+                running[position] = (worker, last_message)
+                continue
+            if isinstance(result, Exception):
+                raise result
+            running.pop(position, None)
+            out[position] = result
+            done[position] = True
+        return out
+
+
+if __name__ == "__main__":
+    config = configparser.ConfigParser()
+    config.read("setup.cfg")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--address",
+        dest="ADDRESS",
+        type=str,
+        help="host:port of search coordinator, default val in setup.cfg: \
+        localhost:50000",
+    )
+    parser.add_argument(
+        "--authkey",
+        dest="AUTHKEY",
+        type=str,
+        help="authentication key shared with coordinator, default val: \
+        HOUSING_VALUE_AUTHKEY environment variable",
+    )
+    parser.add_argument(
+        "--log-level",
+        dest="LEVEL",
+        type=str,
+        help="provide logging level, default val in setup.cfg: DEBUG",
+    )
+    parser.add_argument(
+        "--log-data",
+        dest="LOG",
+        type=str,
+        help="file to store log data, default val in setup.cfg: logs/main.log if \
+        no console display is opted else default is console display ",
+    )
+    parser.add_argument(
+        "--no-console-log",
+        dest="NOCONSOLE",
+        action="store_true",
+        help="do not display log on console",
+    )
+
+    args = parser.parse_args()
+
+    if not args.NOCONSOLE:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+    else:
+        if not args.LOG:
+            file_handler = logging.FileHandler(str(config["Default"]["log_data"]))
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+
+    if args.LOG:
+        file_handler = logging.FileHandler(args.LOG)
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    if args.LEVEL:
+        logger.setLevel(level=args.LEVEL)
+    else:
+        logger.setLevel(level=str(config["Default"]["log_level"]))
+
+    if args.ADDRESS:
+        ADDRESS = args.ADDRESS
+    else:
+        ADDRESS = str(config["Distributed"]["address"])
+
+    AUTHKEY = search_authkey(args.AUTHKEY)
+    if not AUTHKEY:
+        parser.error(f"--authkey or {AUTHKEY_ENV} environment variable is required")
+
+    # serve one search after another, waiting for the coordinator of the next one
+    serve_searches(ADDRESS, AUTHKEY)
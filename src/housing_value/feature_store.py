@@ -0,0 +1,168 @@
+"""
+Notes
+-----
+Use this module to store features and labels as memory-mapped numpy arrays.
+Each dataset (for e.g - train) is a directory holding numeric.npy, one .npy file of
+integer codes per categorical column, labels.npy and metadata.json. Numeric columns
+are stored in fortran order so that reading them back gives a pandas dataframe whose
+columns are views of the memory-mapped file, and joblib workers receive the arrays
+by file name instead of a pickled copy.
+"""
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from housing_value.dataset import (
+    CATEGORICAL_COLUMNS,
+    OCEAN_PROXIMITY_CATEGORIES,
+    apply_schema,
+    read_dataset,
+)
+
+logger = logging.getLogger(__name__)
+
+LABEL_COLUMN = "median_house_value"
+
+CATEGORIES = {"ocean_proximity": OCEAN_PROXIMITY_CATEGORIES}
+
+
+def write_feature_store(features, labels, path, name, float_dtype="float32"):
+    """Function to write features and labels as memory-mapped numpy arrays.
+
+    Parameters
+    ----------
+    features : object
+        The pandas dataframe of features.
+    labels : object
+        The pandas series of labels.
+    path : str
+        The directory of feature store.
+    name : str
+        The name of dataset (for e.g - train).
+    float_dtype : str
+        The dtype of numeric features and labels, float64 or float32.
+
+    Returns
+    -------
+    metadata : dictionary
+        The columns, dtypes and categories of stored dataset.
+
+    """
+    store_path = os.path.join(path, name)
+    os.makedirs(store_path, exist_ok=True)
+    features = apply_schema(features, float_dtype)
+    numeric_columns = [
+        column for column in features.columns if column not in CATEGORICAL_COLUMNS
+    ]
+    categorical_columns = [
+        column for column in features.columns if column in CATEGORICAL_COLUMNS
+    ]
+    numeric = np.lib.format.open_memmap(
+        os.path.join(store_path, "numeric.npy"),
+        mode="w+",
+        dtype=float_dtype,
+        shape=(len(features), len(numeric_columns)),
+        fortran_order=True,
+    )
+    for position, column in enumerate(numeric_columns):
+        numeric[:, position] = features[column].to_numpy()
+    numeric.flush()
+    for column in categorical_columns:
+        np.save(
+            os.path.join(store_path, f"{column}.npy"),
+            features[column].cat.codes.to_numpy().astype(np.int8),
+        )
+    np.save(
+        os.path.join(store_path, "labels.npy"), labels.to_numpy().astype(float_dtype)
+    )
+    metadata = {
+        "rows": len(features),
+        "columns": list(features.columns),
+        "numeric_columns": numeric_columns,
+        "categories": {column: CATEGORIES[column] for column in categorical_columns},
+        "label": labels.name or LABEL_COLUMN,
+        "float_dtype": float_dtype,
+    }
+    with open(os.path.join(store_path, "metadata.json"), "w") as file:
+        json.dump(metadata, file, indent=2)
+    logger.info(f"Stored {name} feature store at : {store_path}")
+    return metadata
+
+
+def read_feature_store(path, name, mmap_mode="r"):
+    """Function to open features and labels of a feature store without copying them.
+
+    Parameters
+    ----------
+    path : str
+        The directory of feature store.
+    name : str
+        The name of dataset (for e.g - train).
+    mmap_mode : str
+        The numpy memory-map mode, None reads arrays into memory.
+
+    Returns
+    -------
+    features : object
+        The pandas dataframe of features backed by memory-mapped arrays.
+    labels : object
+        The pandas series of labels backed by a memory-mapped array.
+
+    """
+    store_path = os.path.join(path, name)
+    with open(os.path.join(store_path, "metadata.json")) as file:
+        metadata = json.load(file)
+    numeric = np.load(os.path.join(store_path, "numeric.npy"), mmap_mode=mmap_mode)
+    features = pd.DataFrame(numeric, columns=metadata["numeric_columns"], copy=False)
+    for column, categories in metadata["categories"].items():
+        codes = np.load(os.path.join(store_path, f"{column}.npy"), mmap_mode=mmap_mode)
+        features.insert(
+            metadata["columns"].index(column),
+            column,
+            pd.Categorical.from_codes(codes, categories=categories),
+        )
+    labels = pd.Series(
+        np.load(os.path.join(store_path, "labels.npy"), mmap_mode=mmap_mode),
+        name=metadata["label"],
+        copy=False,
+    )
+    logger.info(f"Opened {name} feature store at : {store_path}")
+    return features, labels
+
+
+def build_feature_store(
+    processed_path, feature_path, data_format="csv", float_dtype="float32"
+):
+    """Function to write the feature store of train and test data.
+
+    Parameters
+    ----------
+    processed_path : str
+        The directory to read train and test data.
+    feature_path : str
+        The directory of feature store.
+    data_format : str
+        The format of train and test data, one of csv, parquet or feather.
+    float_dtype : str
+        The dtype of numeric features and labels, float64 or float32.
+
+    Returns
+    -------
+    metadata : dictionary
+        The metadata of each stored dataset keyed by name.
+
+    """
+    metadata = {}
+    for name in ("train", "test"):
+        df = read_dataset(processed_path, name, data_format, float_dtype=float_dtype)
+        metadata[name] = write_feature_store(
+            df.drop(LABEL_COLUMN, axis=1),
+            df[LABEL_COLUMN],
+            feature_path,
+            name,
+            float_dtype=float_dtype,
+        )
+    return metadata
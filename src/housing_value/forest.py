@@ -0,0 +1,257 @@
+"""
+Notes
+-----
+Use this module to compact a trained random forest for smaller artifacts and faster
+loading.
+CompactForestRegressor keeps only what prediction needs, the feature, threshold and
+children of every node and the value of leaves, in flat arrays holding the nodes of
+all trees one after the other. Impurity, sample counts and the estimator
+objects of each tree are dropped. With float32 the thresholds are rounded down to the
+nearest float32, so that float32 inputs take the same branches as in the random
+forest, and leaf values are stored as float32 too.
+Compaction trades predict time for artifact size and load time, pickles being about 2.5
+(float64) to 3.5 (float32) times smaller and loading about 20 times faster, while large
+batches predict about twice as slow as with RandomForestRegressor. Compact pipes can
+not be refreshed with new rows either, so compaction is off by default in setup.cfg.
+For batch scoring, vectorized_pipeline replaces the random forests of a pipe by compact
+forests that spread their trees over a pool of threads, numpy releasing the GIL while
+rows are walked through the flat arrays. On one thread it is slower than the Cython
+predict of RandomForestRegressor, which spreads trees over threads with n_jobs too, so
+score.py keeps pipeline as its default predict engine.
+"""
+import copy
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from joblib import effective_n_jobs
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+
+from housing_value.search import FoldEnsembleRegressor
+
+logger = logging.getLogger(__name__)
+
+COMPACT_DTYPES = ("float64", "float32")
+PREDICT_ENGINES = ("pipeline", "vectorized")
+
+
+def float32_thresholds(threshold):
+    """Function to round thresholds down to float32 keeping every split of float32.
+
+    Parameters
+    ----------
+    threshold : object
+        The numpy array of float64 thresholds.
+
+    Returns
+    -------
+    threshold : object
+        The numpy array of largest float32 values not above each threshold, so that
+        x <= threshold gives the same result for every float32 x.
+
+    """
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForestRegressor(BaseEstimator, RegressorMixin):
+    """Class to predict with the trees of a fitted random forest held in flat arrays.
+
+    Nodes of tree t are roots_[t] onwards, and the left and right child of node i are
+    children_[2 * i] and children_[2 * i + 1], positions in the flat arrays. Leaves
+    are their own children. Rows go down all trees together, one level at a time,
+    and rows that reached a leaf are dropped from the next levels, in batches of
+    batch_size rows. Predictions are the leaf values of every tree summed in tree
+    order and divided by the number of trees, as RandomForestRegressor does. With
+    n_jobs, trees are split into that many contiguous chunks walked by a pool of
+    threads, and leaf values are still summed in tree order, so predictions do not
+    depend on n_jobs. fit trains a clone of forest and compacts it, while compact
+    takes an already fitted random forest.
+
+    """
+
+    def __init__(self, forest=None, dtype="float64", batch_size=65536, n_jobs=None):
+        self.forest = forest
+        self.dtype = dtype
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+
+    def __setstate__(self, state):
+        # forests compacted before trees were walked by threads use one thread
+        state.setdefault("n_jobs", None)
+        super().__setstate__(state)
+
+    def fit(self, X, y):
+        forest = clone(self.forest or RandomForestRegressor()).fit(X, y)
+        return self.compact(forest)
+
+    def compact(self, forest):
+        if self.dtype not in COMPACT_DTYPES:
+            raise ValueError(f"Unsupported compact dtype : {self.dtype}")
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        if trees[0].n_outputs != 1:
+            raise ValueError("Only random forests of one output can be compacted")
+        sizes = np.array([tree.node_count for tree in trees])
+        index_dtype = np.int32 if 2 * sizes.sum() < np.iinfo(np.int32).max else np.int64
+        self.roots_ = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(index_dtype)
+        feature, threshold, children, value = [], [], [], []
+        for root, tree in zip(self.roots_, trees):
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(np.where(leaf, 0.0, tree.threshold))
+            left = np.where(leaf, nodes, tree.children_left)
+            right = np.where(leaf, nodes, tree.children_right)
+            children.append(root + np.column_stack([left, right]).ravel())
+            value.append(tree.value[:, 0, 0])
+        feature_dtype = np.int16 if forest.n_features_in_ < 2**15 else np.int32
+        self.feature_ = np.concatenate(feature).astype(feature_dtype)
+        threshold = np.concatenate(threshold)
+        if self.dtype == "float32":
+            self.threshold_ = float32_thresholds(threshold)
+        else:
+            self.threshold_ = threshold
+        self.children_ = np.concatenate(children).astype(index_dtype)
+        self.value_ = np.concatenate(value).astype(self.dtype)
+        self.n_features_in_ = forest.n_features_in_
+        return self
+
+    def _leaves(self, X, roots):
+        # leaf of row r in tree t at t * n_rows + r, rows of a tree next to each other
+        n_rows, n_features = X.shape
+        n_trees = len(roots)
+        values = X.ravel()
+        index_dtype = self.children_.dtype
+        leaves = np.repeat(roots, n_rows)
+        positions = np.arange(n_rows * n_trees, dtype=index_dtype)
+        offsets = np.tile(np.arange(n_rows, dtype=index_dtype) * n_features, n_trees)
+        feature = self.feature_.astype(index_dtype)
+        nodes = leaves.copy()
+        while len(nodes):
+            x = np.take(values, offsets + np.take(feature, nodes))
+            go_right = x > np.take(self.threshold_, nodes)
+            nodes = np.take(self.children_, 2 * nodes + go_right)
+            done = np.take(self.children_, 2 * nodes) == nodes
+            n_done = np.count_nonzero(done)
+            if n_done == len(nodes):
+                leaves[positions] = nodes
+                break
+            # leaves step to themselves, rows are dropped once a quarter has finished
+            if 4 * n_done >= len(nodes):
+                leaves[positions[done]] = nodes[done]
+                keep = ~done
+                nodes, positions, offsets = nodes[keep], positions[keep], offsets[keep]
+        return leaves.reshape(n_trees, n_rows)
+
+    def _batches(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        for start in range(0, len(X), self.batch_size):
+            yield X[start : start + self.batch_size]
+
+    def _map_trees(self, X, function):
+        # yields function of each batch and chunk of roots, chunks run by the threads
+        n_jobs = min(effective_n_jobs(self.n_jobs), len(self.roots_))
+        chunks = np.array_split(self.roots_, n_jobs)
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            for batch in self._batches(X):
+                yield batch, executor.map(functools.partial(function, batch), chunks)
+
+    def _leaf_values(self, X, roots):
+        return np.take(self.value_, self._leaves(X, roots))
+
+    def apply(self, X):
+        return np.concatenate(
+            [
+                np.concatenate(list(leaves)).T
+                for _, leaves in self._map_trees(X, self._leaves)
+            ]
+            or [np.empty((0, len(self.roots_)), dtype=self.children_.dtype)]
+        )
+
+    def predict(self, X):
+        predictions = []
+        for batch, values in self._map_trees(X, self._leaf_values):
+            batch_predictions = np.zeros(len(batch))
+            for chunk_values in values:
+                for tree_values in chunk_values:
+                    batch_predictions += tree_values
+            predictions.append(batch_predictions / len(self.roots_))
+        return np.concatenate(predictions) if predictions else np.zeros(0)
+
+
+def compact_pipeline(pipe, dtype="float64"):
+    """Function to replace the random forests of a trained pipe by compact forests.
+
+    Parameters
+    ----------
+    pipe : object
+        The fitted sklearn.pipeline.Pipeline, random forest or FoldEnsembleRegressor
+        of them.
+    dtype : str
+        The dtype of thresholds and leaf values, float64 or float32.
+
+    Returns
+    -------
+    pipe : object
+        The pipe with each RandomForestRegressor replaced by a CompactForestRegressor,
+        other models are kept as they are.
+
+    """
+
+    def compact(model):
+        if isinstance(model, RandomForestRegressor):
+            return CompactForestRegressor(dtype=dtype).compact(model)
+        logger.debug(f"Kept {type(model).__name__} as it is not a random forest")
+        return model
+
+    return _map_models(pipe, compact)
+
+
+def vectorized_pipeline(pipe, n_jobs=None):
+    """Function to replace the random forests of a pipe by threaded compact forests.
+
+    Parameters
+    ----------
+    pipe : object
+        The fitted sklearn.pipeline.Pipeline, random forest or FoldEnsembleRegressor
+        of them.
+    n_jobs : int
+        The number of threads walking the trees, -1 uses all processors and one
+        thread is used if not provided.
+
+    Returns
+    -------
+    pipe : object
+        The pipe with each RandomForestRegressor compacted with float64 thresholds and
+        leaf values, so that its predictions are those of the random forest, and each
+        CompactForestRegressor copied to use n_jobs threads, other models are kept as
+        they are.
+
+    """
+
+    def vectorize(model):
+        if isinstance(model, RandomForestRegressor):
+            return CompactForestRegressor(n_jobs=n_jobs).compact(model)
+        if isinstance(model, CompactForestRegressor):
+            return copy.copy(model).set_params(n_jobs=n_jobs)
+        logger.debug(f"Kept {type(model).__name__} as it is not a random forest")
+        return model
+
+    return _map_models(pipe, vectorize)
+
+
+def _map_models(pipe, function):
+    # applies function to the model of a pipe and to each model of a fold ensemble
+    if isinstance(pipe, Pipeline):
+        name, model = pipe.steps[-1]
+        return Pipeline(pipe.steps[:-1] + [(name, _map_models(model, function))])
+    if isinstance(pipe, FoldEnsembleRegressor):
+        return FoldEnsembleRegressor(
+            [_map_models(estimator, function) for estimator in pipe.estimators]
+        )
+    return function(pipe)
@@ -0,0 +1,343 @@
+"""
+Notes
+-----
+Use this module to generate synthetic housing data of any size for scale testing.
+The generated data has the columns and dtypes of the housing data, a realistic mix
+of income_cat and ocean_proximity and a controllable rate of missing total_bedrooms.
+    $ python src/housing_value/generate_data.py --rows 1000000
+optional arguments:
+    -h, --help            show this help message and exit
+    --rows ROWS           number of rows to generate, default val: 20640
+    --output-data OUTPUT  directory to store generated data, default val in setup.cfg: data/synthetic
+    --data-format {csv,parquet,feather}
+                          format of generated data, default val in setup.cfg: csv
+    --chunk-size CHUNK    number of rows generated and written at a time, default val: 1000000
+    --missing-rate MISSING
+                          fraction of missing total_bedrooms, default val: 0.01
+    --seed SEED           seed of random generator, default val: 42
+    --archive             also pack generated csv data into housing.tgz for ingestion
+    --force               overwrite housing data already stored in output directory
+    --log-level LEVEL     provide logging level, default val in setup.cfg: DEBUG
+    --log-data LOG        file to store log data, default val in setup.cfg: logs/main.log if no console display is opted else default is console
+                          display
+    --no-console-log      do not display log on console
+"""
+import argparse
+import configparser
+import logging
+import os
+import tarfile
+
+import numpy as np
+import pandas as pd
+
+from housing_value.dataset import (
+    DATA_FORMATS,
+    OCEAN_PROXIMITY_CATEGORIES,
+    DatasetWriter,
+    apply_schema,
+    dataset_path,
+)
+
+logger = logging.getLogger(__name__)
+
+formatter = logging.Formatter(
+    "%(asctime)s %(name)s %(filename)s.%(funcName)s(%(lineno)d) %(levelname)s %(message)s",
+    datefmt="%m/%d/%Y %I:%M:%S %p",
+)
+
+# share of each income_cat in the housing data, bins of median_income are
+# [0, 1.5), [1.5, 3), [3, 4.5), [4.5, 6) and [6, 15]
+INCOME_CAT_SHARES = [0.04, 0.32, 0.35, 0.18, 0.11]
+
+INCOME_BINS = [0.5, 1.5, 3.0, 4.5, 6.0, 15.0]
+
+# share of each ocean_proximity category in OCEAN_PROXIMITY_CATEGORIES order
+OCEAN_PROXIMITY_SHARES = [0.4426, 0.3174, 0.0002, 0.1109, 0.1289]
+
+
+def generate_housing_data(rows, missing_rate=0.01, seed=42, float_dtype="float64"):
+    """Function to generate a dataframe of synthetic housing data.
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows to generate.
+    missing_rate : float
+        The fraction of missing total_bedrooms.
+    seed : int or object
+        The seed or numpy.random.Generator of random numbers.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe of synthetic housing data.
+
+    """
+    rng = np.random.default_rng(seed)
+    income_cat = rng.choice(5, size=rows, p=INCOME_CAT_SHARES)
+    low = np.take(INCOME_BINS, income_cat)
+    high = np.take(INCOME_BINS, income_cat + 1)
+    median_income = low + (high - low) * rng.beta(1.0, 1.0 + income_cat // 4, rows)
+    ocean_proximity = rng.choice(5, size=rows, p=OCEAN_PROXIMITY_SHARES)
+    households = np.maximum(np.round(rng.lognormal(6.0, 0.7, rows)), 1.0)
+    total_rooms = np.round(households * rng.uniform(3.5, 7.0, rows))
+    total_bedrooms = np.round(total_rooms * rng.uniform(0.15, 0.28, rows))
+    total_bedrooms[rng.random(rows) < missing_rate] = np.nan
+    population = np.round(households * rng.uniform(2.0, 4.0, rows))
+    inland = ocean_proximity == OCEAN_PROXIMITY_CATEGORIES.index("INLAND")
+    median_house_value = np.clip(
+        np.round(
+            (30000.0 + 42000.0 * median_income)
+            * np.where(inland, 0.6, 1.0)
+            * rng.lognormal(0.0, 0.25, rows)
+        ),
+        14999.0,
+        500001.0,
+    )
+    df = pd.DataFrame(
+        {
+            "longitude": np.round(
+                np.where(inland, -119.5, -121.0) + rng.normal(0.0, 1.5, rows), 2
+            ),
+            "latitude": np.round(rng.uniform(32.5, 42.0, rows), 2),
+            "housing_median_age": rng.integers(1, 53, rows).astype(float),
+            "total_rooms": total_rooms,
+            "total_bedrooms": total_bedrooms,
+            "population": population,
+            "households": households,
+            "median_income": np.round(median_income, 4),
+            "median_house_value": median_house_value,
+            "ocean_proximity": pd.Categorical.from_codes(
+                ocean_proximity, categories=OCEAN_PROXIMITY_CATEGORIES
+            ),
+        }
+    )
+    return apply_schema(df, float_dtype)
+
+
+def generate_housing_chunks(
+    rows, chunksize=1_000_000, missing_rate=0.01, seed=42, float_dtype="float64"
+):
+    """Function to generate synthetic housing data in bounded-size chunks.
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows to generate.
+    chunksize : int
+        The number of rows of each chunk.
+    missing_rate : float
+        The fraction of missing total_bedrooms.
+    seed : int
+        The seed of random numbers.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Yields
+    ------
+    chunk : object
+        The pandas dataframe of synthetic housing data.
+
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunksize):
+        size = min(chunksize, rows - start)
+        chunk = generate_housing_data(size, missing_rate, rng, float_dtype)
+        chunk.index = pd.RangeIndex(start, start + size)
+        yield chunk
+
+
+def write_housing_data(
+    path,
+    rows,
+    data_format="csv",
+    chunksize=1_000_000,
+    missing_rate=0.01,
+    seed=42,
+    archive=False,
+    float_dtype="float64",
+    overwrite=False,
+):
+    """Function to generate synthetic housing data and write it chunk by chunk.
+
+    Parameters
+    ----------
+    path : str
+        The directory to store generated data as housing.<format>.
+    rows : int
+        The number of rows to generate.
+    data_format : str
+        The format of generated data, one of csv, parquet or feather.
+    chunksize : int
+        The number of rows generated and written at a time.
+    missing_rate : float
+        The fraction of missing total_bedrooms.
+    seed : int
+        The seed of random numbers.
+    archive : bool
+        Whether to pack generated csv data into housing.tgz, which is the raw data
+        expected by ingest_data.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+    overwrite : bool
+        Whether to replace housing data already stored in path, which raises a
+        FileExistsError otherwise.
+
+    Returns
+    -------
+    file_path : str
+        The path of generated data, or of the archive if archive is True.
+
+    """
+    if archive and data_format != "csv":
+        raise ValueError("Only csv data can be packed into housing.tgz")
+    file_paths = [dataset_path(path, "housing", data_format)]
+    if archive:
+        file_paths.append(os.path.join(path, "housing.tgz"))
+    existing = [file_path for file_path in file_paths if os.path.exists(file_path)]
+    if existing and not overwrite:
+        raise FileExistsError(
+            f"Housing data already stored, pass overwrite to replace : {existing}"
+        )
+    os.makedirs(path, exist_ok=True)
+    with DatasetWriter(path, "housing", data_format) as writer:
+        for chunk in generate_housing_chunks(
+            rows, chunksize, missing_rate, seed, float_dtype
+        ):
+            writer.write(chunk)
+    file_path = writer.file_path
+    logger.info(f"Stored {writer.rows} rows of generated data at : {file_path}")
+    if archive:
+        tgz_path = os.path.join(path, "housing.tgz")
+        with tarfile.open(tgz_path, "w:gz") as housing_tgz:
+            housing_tgz.add(file_path, arcname="housing.csv")
+        logger.info(f"Stored housing.tgz at : {path}")
+        file_path = tgz_path
+    return file_path
+
+
+if __name__ == "__main__":
+    config = configparser.ConfigParser()
+    config.read("setup.cfg")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows",
+        dest="ROWS",
+        type=int,
+        default=20640,
+        help="number of rows to generate, default val: 20640",
+    )
+    parser.add_argument(
+        "--output-data",
+        dest="OUTPUT",
+        type=str,
+        help="directory to store generated data, default val in setup.cfg: \
+        data/synthetic",
+    )
+    parser.add_argument(
+        "--data-format",
+        dest="FORMAT",
+        type=str,
+        choices=DATA_FORMATS,
+        help="format of generated data, default val in setup.cfg: csv",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="CHUNK",
+        type=int,
+        default=1_000_000,
+        help="number of rows generated and written at a time, default val: 1000000",
+    )
+    parser.add_argument(
+        "--missing-rate",
+        dest="MISSING",
+        type=float,
+        default=0.01,
+        help="fraction of missing total_bedrooms, default val: 0.01",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="SEED",
+        type=int,
+        default=42,
+        help="seed of random generator, default val: 42",
+    )
+    parser.add_argument(
+        "--archive",
+        dest="ARCHIVE",
+        action="store_true",
+        help="also pack generated csv data into housing.tgz for ingestion",
+    )
+    parser.add_argument(
+        "--force",
+        dest="FORCE",
+        action="store_true",
+        help="overwrite housing data already stored in output directory",
+    )
+    parser.add_argument(
+        "--log-level",
+        dest="LEVEL",
+        type=str,
+        help="provide logging level, default val in setup.cfg: DEBUG",
+    )
+    parser.add_argument(
+        "--log-data",
+        dest="LOG",
+        type=str,
+        help="file to store log data, default val in setup.cfg: logs/main.log if \
+        no console display is opted else default is console display ",
+    )
+    parser.add_argument(
+        "--no-console-log",
+        dest="NOCONSOLE",
+        action="store_true",
+        help="do not display log on console",
+    )
+
+    args = parser.parse_args()
+
+    if not args.NOCONSOLE:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+    else:
+        if not args.LOG:
+            file_handler = logging.FileHandler(str(config["Default"]["log_data"]))
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+
+    if args.LOG:
+        file_handler = logging.FileHandler(args.LOG)
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    if args.LEVEL:
+        logger.setLevel(level=args.LEVEL)
+    else:
+        logger.setLevel(level=str(config["Default"]["log_level"]))
+
+    if args.OUTPUT:
+        OUTPUT_DATA = args.OUTPUT
+    else:
+        OUTPUT_DATA = str(config["Default"]["synthetic_data"])
+
+    if args.FORMAT:
+        DATA_FORMAT = args.FORMAT
+    else:
+        DATA_FORMAT = str(config["Default"]["data_format"])
+
+    write_housing_data(
+        path=OUTPUT_DATA,
+        rows=args.ROWS,
+        data_format=DATA_FORMAT,
+        chunksize=args.CHUNK,
+        missing_rate=args.MISSING,
+        seed=args.SEED,
+        archive=args.ARCHIVE,
+        float_dtype=str(config["Data"]["float_dtype"]),
+        overwrite=args.FORCE,
+    )
@@ -6,8 +6,28 @@ Use this module for data ingestion of the housing data.
 optional arguments:
     -h, --help            show this help message and exit
     --raw-data RAW        directory to save fetched raw data, default val in setup.cfg: data/raw
+    --sources SOURCES [SOURCES ...]
+                          urls, paths or globs of raw data archives to ingest together, default val in setup.cfg:
+                          raw_data_url
+    --workers WORKERS     number of processes parsing several sources, default val in setup.cfg: 0 for number of cpus
     --processed-data PROCESSED
                           directory to save processed data, default val in setup.cfg: data/processed
+    --cache-data CACHE    directory to cache fetched archives, default val in setup.cfg: data/cache
+    --no-cache            fetch and extract raw data without download cache
+    --data-format {csv,parquet,feather}
+                          format to store raw and processed data, default val in setup.cfg: csv
+    --stream-raw          parse raw data straight out of the archive without extracting it, default val in setup.cfg: False
+    --chunk-size CHUNK    number of rows per chunk to ingest and split raw data out of core, default val in setup.cfg: 0 to ingest
+                          whole data in memory
+    --split-strategy {shuffle,systematic,hash}
+                          strategy to split data into train and test data, default val in setup.cfg: shuffle, shuffle falls back
+                          to systematic in chunks
+    --append              append new rows to existing processed data, requires hash split strategy
+    --incremental         ingest only new or changed raw data recorded in a manifest of processed data, default val in setup.cfg:
+                          False
+    --feature-store FEATURE
+                          directory of feature store to write train and test data to, default val in setup.cfg:
+                          data/features if feature_store is True
     --log-level LEVEL     provide logging level, default val in setup.cfg: DEBUG
     --log-data LOG        file to store log data, default val in setup.cfg: logs/main.log if no console display is opted else default is console
                           display
@@ -15,15 +35,48 @@ optional arguments:
 """
 import argparse
 import configparser
+import contextlib
+import glob
+import hashlib
+import io
+import itertools
+import json
 import logging
 import os
+import pathlib
+import shutil
 import tarfile
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
 from six.moves import urllib
 from sklearn.model_selection import StratifiedShuffleSplit
 
+from housing_value.dataset import (
+    DATA_FORMATS,
+    MANIFEST_FILE,
+    DatasetWriter,
+    append_dataset,
+    apply_schema,
+    csv_schema,
+    dataset_files,
+    dataset_path,
+    log_memory_usage,
+    next_part_name,
+    read_dataset,
+    read_dataset_chunks,
+    take_rows,
+    write_dataset,
+)
+from housing_value.feature_store import build_feature_store
+
+SPLIT_STRATEGIES = ("shuffle", "systematic", "hash")
+
+URL_SCHEMES = ("http", "https", "ftp", "file")
+
 logger = logging.getLogger(__name__)
 
 formatter = logging.Formatter(
@@ -32,7 +85,345 @@ formatter = logging.Formatter(
 )
 
 
-def fetch_housing_data(housing_url, housing_path):
+def file_sha256(file_path):
+    """Function to compute the sha256 checksum of a file.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of file to checksum.
+
+    Returns
+    -------
+    digest : str
+        The hexadecimal sha256 digest of file contents.
+
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def url_validators(housing_url):
+    """Function to read cache validators of a url without downloading its body.
+
+    Parameters
+    ----------
+    housing_url : str
+        The url to fetch data.
+
+    Returns
+    -------
+    validators : dictionary
+        The ETag, Last-Modified and Content-Length headers sent for the url,
+        empty when the server sends none of them or cannot be reached.
+
+    """
+    request = urllib.request.Request(housing_url, method="HEAD")
+    try:
+        with urllib.request.urlopen(request) as response:
+            headers = response.headers
+    except (OSError, ValueError) as error:
+        logger.debug(f"No validators for {housing_url} : {error}")
+        return {}
+    validators = {
+        key: headers.get(key)
+        for key in ("ETag", "Last-Modified", "Content-Length")
+        if headers.get(key)
+    }
+    return validators
+
+
+def archive_members(archive):
+    """Function to list the files of a tar archive after checking every member is safe.
+
+    Parameters
+    ----------
+    archive : object
+        The open tarfile.TarFile.
+
+    Returns
+    -------
+    members : list
+        The names of file members of archive.
+
+    """
+    for member in archive.getmembers():
+        name = os.path.normpath(member.name)
+        if (
+            os.path.isabs(member.name)
+            or name == os.pardir
+            or name.startswith(os.pardir + os.sep)
+            or not (member.isfile() or member.isdir())
+        ):
+            raise ValueError(f"Unsafe member of archive : {member.name}")
+    return [member.name for member in archive.getmembers() if member.isfile()]
+
+
+def extract_archive(archive, path):
+    """Function to extract a tar archive without writing anything outside of path.
+
+    Members with absolute paths or .. components, links and devices are rejected,
+    and the data filter of tarfile is applied where python provides it.
+
+    Parameters
+    ----------
+    archive : object
+        The open tarfile.TarFile.
+    path : str
+        The directory to extract members into.
+
+    Returns
+    -------
+    members : list
+        The names of extracted file members.
+
+    """
+    members = archive_members(archive)
+    if hasattr(tarfile, "data_filter"):
+        archive.extractall(path=path, filter="data")
+    else:
+        archive.extractall(path=path)
+    return members
+
+
+def cached_archive(housing_url, cache_path, checksum=None, extract=True):
+    """Function to fetch an archive through a content-addressed local cache.
+
+    Archives are stored once per sha256 checksum under ``objects`` together with
+    their extracted members, while ``urls`` maps a url and its ETag,
+    Last-Modified and Content-Length validators to a checksum. A url whose
+    validators are unchanged, or a known ``checksum``, is served without any
+    download or extraction.
+
+    Parameters
+    ----------
+    housing_url : str
+        The url to fetch data.
+    cache_path : str
+        The directory of the cache.
+    checksum : str
+        The expected sha256 checksum of archive, checked after download.
+    extract : bool
+        Whether members of archive are extracted into the cache entry.
+
+    Returns
+    -------
+    entry_path : str
+        The cache directory holding the archive and its extracted members.
+
+    """
+    objects_path = os.path.join(cache_path, "objects")
+    urls_path = os.path.join(cache_path, "urls")
+    os.makedirs(objects_path, exist_ok=True)
+    os.makedirs(urls_path, exist_ok=True)
+
+    url_key = hashlib.sha256(housing_url.encode("utf-8")).hexdigest()
+    record_path = os.path.join(urls_path, f"{url_key}.json")
+    entry_path = None
+    if checksum and os.path.exists(os.path.join(objects_path, checksum, "entry.json")):
+        logger.info(f"Cache hit for checksum : {checksum}")
+        entry_path = os.path.join(objects_path, checksum)
+    else:
+        validators = url_validators(housing_url)
+        if validators and os.path.exists(record_path):
+            with open(record_path) as file:
+                record = json.load(file)
+            if (
+                record["validators"] == validators
+                and (not checksum or record["sha256"] == checksum)
+                and os.path.exists(
+                    os.path.join(objects_path, record["sha256"], "entry.json")
+                )
+            ):
+                logger.info(f"Cache hit for url : {housing_url}")
+                entry_path = os.path.join(objects_path, record["sha256"])
+
+    if not entry_path:
+        entry_path, headers = download_to_cache(housing_url, cache_path, checksum)
+        validators = validators or {
+            key: headers.get(key)
+            for key in ("ETag", "Last-Modified", "Content-Length")
+            if headers.get(key)
+        }
+        with open(record_path, "w") as file:
+            json.dump(
+                {
+                    "url": housing_url,
+                    "validators": validators,
+                    "sha256": os.path.basename(entry_path),
+                },
+                file,
+            )
+
+    with open(os.path.join(entry_path, "entry.json")) as file:
+        entry = json.load(file)
+    if extract and not entry.get("extracted", True):
+        with tarfile.open(os.path.join(entry_path, entry["archive"])) as archive:
+            extract_archive(archive, entry_path)
+        entry["extracted"] = True
+        with open(os.path.join(entry_path, "entry.json"), "w") as file:
+            json.dump(entry, file)
+        logger.info(f"Extracted cached archive at : {entry_path}")
+    return entry_path
+
+
+def download_to_cache(housing_url, cache_path, checksum=None):
+    """Function to download an archive into the cache without extracting it.
+
+    Parameters
+    ----------
+    housing_url : str
+        The url to fetch data.
+    cache_path : str
+        The directory of the cache.
+    checksum : str
+        The expected sha256 checksum of archive.
+
+    Returns
+    -------
+    entry_path : str
+        The cache directory holding the archive.
+    headers : object
+        The response headers of download.
+
+    """
+    objects_path = os.path.join(cache_path, "objects")
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path, suffix=".download")
+    os.close(fd)
+    try:
+        _, headers = urllib.request.urlretrieve(housing_url, tmp_path)
+        sha256 = file_sha256(tmp_path)
+        if checksum and sha256 != checksum:
+            raise ValueError(
+                f"Checksum mismatch for {housing_url} : expected {checksum}, got {sha256}"
+            )
+        entry_path = os.path.join(objects_path, sha256)
+        if os.path.exists(os.path.join(entry_path, "entry.json")):
+            logger.info(f"Cache hit for content of url : {housing_url}")
+            return entry_path, headers
+        staging_path = tempfile.mkdtemp(dir=cache_path, suffix=".staging")
+        archive_name = (
+            os.path.basename(urllib.parse.urlparse(housing_url).path) or "archive"
+        )
+        shutil.move(tmp_path, os.path.join(staging_path, archive_name))
+        if tarfile.is_tarfile(os.path.join(staging_path, archive_name)):
+            with tarfile.open(os.path.join(staging_path, archive_name)) as archive:
+                members = archive_members(archive)
+            extracted = False
+        else:
+            # a plain csv source is its own single member, with nothing to extract
+            members, extracted = [archive_name], True
+        with open(os.path.join(staging_path, "entry.json"), "w") as file:
+            json.dump(
+                {
+                    "url": housing_url,
+                    "sha256": sha256,
+                    "archive": archive_name,
+                    "members": members,
+                    "extracted": extracted,
+                },
+                file,
+            )
+        if not os.path.exists(os.path.join(entry_path, "entry.json")):
+            # left over by an interrupted eviction
+            shutil.rmtree(entry_path, ignore_errors=True)
+        try:
+            os.replace(staging_path, entry_path)
+        except OSError:
+            # another thread or process cached the same content first
+            shutil.rmtree(staging_path, ignore_errors=True)
+            if not os.path.exists(os.path.join(entry_path, "entry.json")):
+                raise
+        logger.info(f"Cached {housing_url} at : {entry_path}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return entry_path, headers
+
+
+def evict_cache(cache_path, max_size=None, max_age=None, keep=None):
+    """Function to evict stale entries of the download cache.
+
+    Entries not used for more than ``max_age`` seconds are removed first, then
+    the least recently used entries until the cache fits in ``max_size`` bytes.
+
+    Parameters
+    ----------
+    cache_path : str
+        The directory of the cache.
+    max_size : int
+        The maximum size of cache in bytes.
+    max_age : float
+        The maximum age of an unused entry in seconds.
+    keep : str or list
+        The entry directory, or directories, which must not be evicted.
+
+    Returns
+    -------
+    evicted : list
+        The checksums of evicted entries.
+
+    """
+    objects_path = os.path.join(cache_path, "objects")
+    if (max_size is None and max_age is None) or not os.path.isdir(objects_path):
+        return []
+    if isinstance(keep, (str, os.PathLike)):
+        keep = [keep]
+    keep = {os.path.abspath(entry_path) for entry_path in keep or []}
+    entries = []
+    for sha256 in os.listdir(objects_path):
+        entry_path = os.path.join(objects_path, sha256)
+        try:
+            size = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(entry_path)
+                for name in names
+            )
+            entries.append((os.path.getmtime(entry_path), size, sha256, entry_path))
+        except OSError:
+            # evicted by another process meanwhile
+            continue
+    entries.sort()
+    now = time.time()
+    total_size = sum(entry[1] for entry in entries)
+    evicted = []
+    for last_used, size, sha256, entry_path in entries:
+        if os.path.abspath(entry_path) in keep:
+            continue
+        expired = max_age is not None and now - last_used > max_age
+        oversized = max_size is not None and total_size > max_size
+        if expired or oversized:
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+            evicted.append(sha256)
+    if evicted:
+        urls_path = os.path.join(cache_path, "urls")
+        for name in os.listdir(urls_path):
+            try:
+                with open(os.path.join(urls_path, name)) as file:
+                    sha256 = json.load(file)["sha256"]
+            except (OSError, ValueError):
+                # removed or being rewritten by another process
+                continue
+            if sha256 in evicted:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(urls_path, name))
+        logger.info(f"Evicted {len(evicted)} entries from cache : {cache_path}")
+    return evicted
+
+
+def fetch_housing_data(
+    housing_url,
+    housing_path,
+    cache_path=None,
+    max_cache_size=None,
+    max_cache_age=None,
+    checksum=None,
+    extract=True,
+):
     """Function to fetch data from link and store data.
 
     Parameters
@@ -41,30 +432,193 @@ def fetch_housing_data(housing_url, housing_path):
         The url to fetch data.
     housing_path : str
         The directory to store data.
+    cache_path : str
+        The directory of download cache, data is downloaded and extracted on every
+        call if not provided.
+    max_cache_size : int
+        The maximum size of download cache in bytes.
+    max_cache_age : float
+        The maximum age of an unused cache entry in seconds.
+    checksum : str
+        The expected sha256 checksum of fetched archive.
+    extract : bool
+        Whether members of fetched archive are extracted into housing_path.
 
     Returns
     -------
-    none : None
-        Only fetches and stores data.
+    archive_path : str
+        The path of fetched archive.
 
     """
     logger.debug("At this function")
     os.makedirs(housing_path, exist_ok=True)
-    tgz_path = os.path.join(housing_path, "housing.tgz")
-    urllib.request.urlretrieve(housing_url, tgz_path)
-    housing_tgz = tarfile.open(tgz_path)
-    housing_tgz.extractall(path=housing_path)
-    housing_tgz.close()
-    return None
+    if not cache_path:
+        tgz_path = os.path.join(housing_path, "housing.tgz")
+        urllib.request.urlretrieve(housing_url, tgz_path)
+        if extract and tarfile.is_tarfile(tgz_path):
+            with tarfile.open(tgz_path) as housing_tgz:
+                extract_archive(housing_tgz, housing_path)
+        return tgz_path
 
+    entry_path = cached_archive(
+        housing_url, cache_path, checksum=checksum, extract=extract
+    )
+    os.utime(entry_path)
+    with open(os.path.join(entry_path, "entry.json")) as file:
+        entry = json.load(file)
+    marker_path = os.path.join(housing_path, ".housing_cache")
+    materialized = not extract or (
+        os.path.exists(marker_path)
+        and all(
+            os.path.exists(os.path.join(housing_path, member))
+            for member in entry["members"]
+        )
+    )
+    if extract and materialized:
+        with open(marker_path) as file:
+            materialized = file.read() == entry["sha256"]
+    if not materialized:
+        for member in entry["members"]:
+            target = os.path.join(housing_path, member)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # copied, as edits of a link would change the cached object for later runs
+            staging = f"{target}.staging"
+            shutil.copyfile(os.path.join(entry_path, member), staging)
+            os.replace(staging, target)
+        with open(marker_path, "w") as file:
+            file.write(entry["sha256"])
+    evict_cache(
+        cache_path, max_size=max_cache_size, max_age=max_cache_age, keep=entry_path
+    )
+    return os.path.join(entry_path, entry["archive"])
 
-def load_housing_data(housing_path):
+
+class ArchiveStream(io.RawIOBase):
+    """Class to expose a member of a sequentially read tar archive as a forward-only
+    binary stream.
+
+    """
+
+    def __init__(self, member):
+        self.member = member
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.member.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+@contextlib.contextmanager
+def open_archive_member(archive, member="housing.csv"):
+    """Function to open a member of a tar archive as a stream.
+
+    The archive is read sequentially, so it can be a local file or a url and is
+    never extracted to disk.
+
+    Parameters
+    ----------
+    archive : str
+        The path or url of tar archive.
+    member : str
+        The name of member to open.
+
+    Returns
+    -------
+    file : object
+        The binary file object of archive member.
+
+    """
+    if urllib.parse.urlparse(str(archive)).scheme in ("http", "https", "ftp", "file"):
+        source = urllib.request.urlopen(archive)
+    else:
+        source = open(archive, "rb")
+    with source, tarfile.open(fileobj=source, mode="r|*") as housing_tgz:
+        for info in housing_tgz:
+            if info.isfile() and os.path.normpath(info.name) == member:
+                yield io.BufferedReader(ArchiveStream(housing_tgz.extractfile(info)))
+                return
+    raise KeyError(f"{member} not found in : {archive}")
+
+
+def stream_housing_data(
+    archive, member="housing.csv", chunksize=None, float_dtype="float64"
+):
+    """Function to parse raw data straight out of a tar archive.
+
+    Parameters
+    ----------
+    archive : str
+        The path or url of tar archive.
+    member : str
+        The name of csv member in archive.
+    chunksize : int
+        The number of rows per chunk, whole data is parsed at once if not provided.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe of raw data, or an iterator of pandas dataframes
+        with at most chunksize rows each if chunksize is provided.
+
+    """
+    logger.debug(f"Streaming {member} from : {archive}")
+    if chunksize:
+        return stream_housing_chunks(archive, member, chunksize, float_dtype)
+    with open_archive_member(archive, member) as file:
+        df = pd.read_csv(file, dtype=csv_schema(float_dtype))
+    return apply_schema(df, float_dtype)
+
+
+def stream_housing_chunks(
+    archive, member="housing.csv", chunksize=100000, float_dtype="float64"
+):
+    """Function to parse raw data out of a tar archive in chunks.
+
+    Parameters
+    ----------
+    archive : str
+        The path or url of tar archive.
+    member : str
+        The name of csv member in archive.
+    chunksize : int
+        The number of rows per chunk.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Yields
+    ------
+    df : object
+        The pandas dataframe of next chunk of raw data.
+
+    """
+    with open_archive_member(archive, member) as file:
+        with pd.read_csv(
+            file, chunksize=chunksize, dtype=csv_schema(float_dtype)
+        ) as reader:
+            for df in reader:
+                yield apply_schema(df, float_dtype)
+
+
+def load_housing_data(
+    housing_path, data_format="csv", columns=None, float_dtype="float64"
+):
     """Function to read raw data from directory.
 
     Parameters
     ----------
     housing_path : str
         The directory to read raw data.
+    data_format : str
+        The format of raw data, one of csv, parquet or feather.
+    columns : list
+        The columns to read, all columns are read if not provided.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
 
     Returns
     -------
@@ -73,20 +627,53 @@ def load_housing_data(housing_path):
 
     """
     logger.debug("At this function")
-    csv_path = os.path.join(housing_path, "housing.csv")
-    df = pd.read_csv(csv_path)
+    df = read_dataset(
+        housing_path,
+        "housing",
+        data_format=data_format,
+        columns=columns,
+        float_dtype=float_dtype,
+    )
     return df
 
 
-def data_ingestion(housing_url, housing_path):
+def data_ingestion(
+    housing_url,
+    housing_path,
+    cache_path=None,
+    max_cache_size=None,
+    max_cache_age=None,
+    stream=False,
+    data_format="csv",
+    float_dtype="float64",
+    max_workers=None,
+):
     """Function to fetch, store and read raw data.
 
     Parameters
     ----------
-    housing_url : str
-        The url to fetch data.
+    housing_url : str or list
+        The url to fetch data, or a list or glob of urls and local paths which are
+        fetched and parsed concurrently by multi_source_ingestion.
     housing_path : str
         The directory to store and read raw data.
+    cache_path : str
+        The directory of download cache, no cache is used if not provided.
+    max_cache_size : int
+        The maximum size of download cache in bytes.
+    max_cache_age : float
+        The maximum age of an unused cache entry in seconds.
+    stream : bool
+        Whether raw data is parsed straight out of the archive instead of being
+        extracted to housing_path first.
+    data_format : str
+        The format to additionally store raw data in housing_path if not csv, one of
+        parquet or feather.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+    max_workers : int
+        The number of parsing processes for several sources, number of cpus if not
+        provided.
 
     Returns
     -------
@@ -94,12 +681,131 @@ def data_ingestion(housing_url, housing_path):
         The pandas dataframe of raw data.
 
     """
-    fetch_housing_data(housing_url, housing_path)
-    logger.info(f"Stored raw data at : {housing_path}")
-    df = load_housing_data(housing_path)
+    if is_multi_source(housing_url):
+        df = multi_source_ingestion(
+            housing_url,
+            housing_path,
+            cache_path=cache_path,
+            max_cache_size=max_cache_size,
+            max_cache_age=max_cache_age,
+            max_workers=max_workers,
+            float_dtype=float_dtype,
+        )
+    elif stream:
+        if cache_path:
+            archive = fetch_housing_data(
+                housing_url,
+                housing_path,
+                cache_path=cache_path,
+                max_cache_size=max_cache_size,
+                max_cache_age=max_cache_age,
+                extract=False,
+            )
+        else:
+            archive = housing_url
+        df = stream_housing_data(archive, float_dtype=float_dtype)
+        logger.info(f"Streamed raw data from : {archive}")
+    else:
+        fetch_housing_data(
+            housing_url,
+            housing_path,
+            cache_path=cache_path,
+            max_cache_size=max_cache_size,
+            max_cache_age=max_cache_age,
+        )
+        logger.info(f"Stored raw data at : {housing_path}")
+        df = load_housing_data(housing_path, float_dtype=float_dtype)
+    log_memory_usage(df, "ingest")
+    if data_format != "csv":
+        os.makedirs(housing_path, exist_ok=True)
+        write_dataset(df, housing_path, "housing", data_format=data_format)
+        logger.info(f"Stored {data_format} raw data at : {housing_path}")
     return df
 
 
+def data_ingestion_chunks(
+    housing_url,
+    housing_path,
+    chunksize=100000,
+    cache_path=None,
+    max_cache_size=None,
+    max_cache_age=None,
+    stream=False,
+    float_dtype="float64",
+):
+    """Function to fetch and store raw data and read it back in bounded-size chunks.
+
+    Parameters
+    ----------
+    housing_url : str or list
+        The url to fetch data, or a list or glob of urls and local paths which are
+        streamed one after another.
+    housing_path : str
+        The directory to store and read raw data.
+    chunksize : int
+        The maximum number of rows per chunk.
+    cache_path : str
+        The directory of download cache, no cache is used if not provided.
+    max_cache_size : int
+        The maximum size of download cache in bytes.
+    max_cache_age : float
+        The maximum age of an unused cache entry in seconds.
+    stream : bool
+        Whether raw data is parsed straight out of the archive instead of being
+        extracted to housing_path first.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    chunks : object
+        The iterator of pandas dataframes of raw data.
+
+    """
+    if is_multi_source(housing_url):
+        archives = [
+            fetch_source(url, housing_path, cache_path)
+            for url in expand_sources(housing_url)
+        ]
+        evict_sources(archives, cache_path, max_cache_size, max_cache_age)
+        logger.info(
+            f"Streaming raw data in chunks of {chunksize} rows from : {archives}"
+        )
+        return itertools.chain.from_iterable(
+            stream_housing_data(archive, chunksize=chunksize, float_dtype=float_dtype)
+            for archive in archives
+        )
+    if stream:
+        if cache_path:
+            archive = fetch_housing_data(
+                housing_url,
+                housing_path,
+                cache_path=cache_path,
+                max_cache_size=max_cache_size,
+                max_cache_age=max_cache_age,
+                extract=False,
+            )
+        else:
+            archive = housing_url
+        logger.info(
+            f"Streaming raw data in chunks of {chunksize} rows from : {archive}"
+        )
+        return stream_housing_data(
+            archive, chunksize=chunksize, float_dtype=float_dtype
+        )
+    fetch_housing_data(
+        housing_url,
+        housing_path,
+        cache_path=cache_path,
+        max_cache_size=max_cache_size,
+        max_cache_age=max_cache_age,
+    )
+    logger.info(f"Stored raw data at : {housing_path}")
+    return read_dataset_chunks(
+        housing_path, "housing", chunksize=chunksize, float_dtype=float_dtype
+    )
+
+
 def data_labeling(df):
     """Function to add a label of income category based on median income to raw data.
 
@@ -122,7 +828,15 @@ def data_labeling(df):
     return df
 
 
-def save_split_data(df, processed_path=None, split_size=0.2):
+def save_split_data(
+    df,
+    processed_path=None,
+    split_size=0.2,
+    data_format="csv",
+    strategy="shuffle",
+    append=False,
+    return_indices=False,
+):
     """Function to split data into train & test datasets.
 
     Parameters
@@ -130,31 +844,585 @@ def save_split_data(df, processed_path=None, split_size=0.2):
     df : object
         The pandas dataframe of labelled raw data with income categories.
     processed_path : str
-        The directory to store train and test csv files.
+        The directory to store train and test files.
     split_size : float
         The test_size.
+    data_format : str
+        The format of train and test files, one of csv, parquet or feather.
+    strategy : str
+        The split strategy, shuffle for a stratified shuffle split of whole data,
+        systematic for systematic sampling within income categories or hash for a
+        stable hash of each row within its income category.
+    append : bool
+        Whether train and test data are appended to existing train and test files
+        as new parts instead of replacing them, only with hash strategy which keeps
+        the assignment of existing rows.
+    return_indices : bool
+        Whether row positions of train and test data in df are returned instead of
+        dataframes, so that callers gather rows only when needed (for e.g - with
+        load_training_data).
 
     Returns
     -------
     strat_train_set : object
-        The pandas dataframe of train data without income categories.
+        The pandas dataframe of train data without income categories, or the numpy
+        array of its row positions if return_indices is True.
     strat_test_set : object
-        The pandas dataframe of test data without income categories.
+        The pandas dataframe of test data without income categories, or the numpy
+        array of its row positions if return_indices is True.
 
     """
-    split = StratifiedShuffleSplit(n_splits=1, test_size=split_size, random_state=42)
-    for train_index, test_index in split.split(df, df["income_cat"]):
-        strat_train_set = df.loc[train_index]
-        strat_test_set = df.loc[test_index]
-    for set_ in (strat_train_set, strat_test_set):
-        set_.drop("income_cat", axis=1, inplace=True)
-    if processed_path:
-        strat_train_set.to_csv(path_or_buf=f"{processed_path}/train.csv", index=False)
-        strat_test_set.to_csv(path_or_buf=f"{processed_path}/test.csv", index=False)
-        logger.info(f"Stored processed data at : {processed_path}")
-        return strat_train_set, strat_test_set
+    if append and strategy != "hash":
+        raise ValueError(f"Cannot append with {strategy} split strategy, use hash")
+    if strategy == "shuffle":
+        split = StratifiedShuffleSplit(
+            n_splits=1, test_size=split_size, random_state=42
+        )
+        train_index, test_index = next(split.split(df, df["income_cat"]))
     else:
-        return strat_train_set, strat_test_set
+        test_mask = split_test_mask(df, split_size=split_size, strategy=strategy)
+        train_index = np.flatnonzero(~test_mask)
+        test_index = np.flatnonzero(test_mask)
+    if return_indices and not processed_path:
+        return train_index, test_index
+    strat_train_set = take_rows(df, train_index, exclude=["income_cat"])
+    strat_test_set = take_rows(df, test_index, exclude=["income_cat"])
+    if processed_path:
+        if append:
+            append_dataset(strat_train_set, processed_path, "train", data_format)
+            append_dataset(strat_test_set, processed_path, "test", data_format)
+            logger.info(f"Appended processed data at : {processed_path}")
+        else:
+            write_dataset(
+                strat_train_set, processed_path, "train", data_format=data_format
+            )
+            write_dataset(
+                strat_test_set, processed_path, "test", data_format=data_format
+            )
+            logger.info(f"Stored processed data at : {processed_path}")
+    if return_indices:
+        return train_index, test_index
+    return strat_train_set, strat_test_set
+
+
+def hash_split_mask(df, split_size=0.2, key_columns=None):
+    """Function to route rows to the test set by a stable hash of each row.
+
+    The key columns, the raw features of a row without the label or the income_cat
+    derived from them, are hashed at float32 precision so that a row gets the same
+    assignment whatever the row order, the rows around it, the float dtype it was
+    loaded with or the bins of income_cat. The same threshold applies to the rows of
+    every income category, which is therefore sampled at split_size independently,
+    and new rows never move existing rows, which a quota per income category would.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe of labelled raw data with income categories.
+    split_size : float
+        The test_size.
+    key_columns : list
+        The columns identifying a row, all columns but median_house_value and
+        income_cat if not provided.
+
+    Returns
+    -------
+    test_mask : object
+        The numpy boolean array, True for rows of the test set.
+
+    """
+    if key_columns is None:
+        key_columns = [
+            col for col in df.columns if col not in ("median_house_value", "income_cat")
+        ]
+    keys = df[key_columns]
+    keys = keys.astype(
+        {
+            col: "float32"
+            for col in key_columns
+            if pd.api.types.is_float_dtype(keys[col])
+        }
+    )
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return hashes / 2.0**64 < split_size
+
+
+def split_test_mask(df, split_size=0.2, strategy="hash", counts=None):
+    """Function to route rows of labelled data to the test set with a row-wise
+    split strategy.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe of labelled raw data with income categories.
+    split_size : float
+        The test_size.
+    strategy : str
+        The split strategy, systematic or hash.
+    counts : dictionary
+        The number of rows seen so far per income category for systematic strategy,
+        updated in place.
+
+    Returns
+    -------
+    test_mask : object
+        The numpy boolean array, True for rows of the test set.
+
+    """
+    if strategy == "hash":
+        return hash_split_mask(df, split_size=split_size)
+    elif strategy == "systematic":
+        return systematic_split_mask(df["income_cat"], split_size, counts)
+    raise ValueError(f"Unsupported split strategy : {strategy}")
+
+
+def systematic_split_mask(strata, split_size=0.2, counts=None):
+    """Function to route rows to the test set by systematic sampling within strata.
+
+    The k-th row seen of a stratum goes to the test set whenever
+    round((k + 1) * split_size) exceeds round(k * split_size), so every stratum is
+    split in the requested proportion whatever the chunk boundaries are.
+
+    Parameters
+    ----------
+    strata : object
+        The pandas series of stratum labels (for e.g - income_cat) of a chunk.
+    split_size : float
+        The test_size.
+    counts : dictionary
+        The number of rows seen so far per stratum, updated in place.
+
+    Returns
+    -------
+    test_mask : object
+        The numpy boolean array, True for rows of the test set.
+
+    """
+    counts = {} if counts is None else counts
+    labels = pd.Series(strata.astype(str).to_numpy())
+    positions = labels.groupby(labels, sort=False).cumcount().to_numpy()
+    positions = positions + labels.map(counts).fillna(0).to_numpy()
+    for label, size in labels.value_counts(sort=False).items():
+        counts[label] = counts.get(label, 0) + size
+    test_mask = np.floor((positions + 1) * split_size) > np.floor(
+        positions * split_size
+    )
+    return test_mask
+
+
+def chunked_split_data(
+    chunks,
+    processed_path,
+    split_size=0.2,
+    data_format="csv",
+    strategy="systematic",
+    append=False,
+):
+    """Function to label and split raw data chunk by chunk into train & test datasets.
+
+    Each chunk is labelled with income categories, routed to the train or test
+    dataset with a row-wise split strategy and appended to the train and test
+    files, so memory use is bounded by the chunk size.
+
+    Parameters
+    ----------
+    chunks : object
+        The iterator of pandas dataframes of raw data.
+    processed_path : str
+        The directory to store train and test files.
+    split_size : float
+        The test_size.
+    data_format : str
+        The format of train and test files, one of csv, parquet or feather.
+    strategy : str
+        The split strategy, systematic or hash.
+    append : bool
+        Whether train and test data are appended to existing train and test files
+        as new parts instead of replacing them, only with hash strategy.
+
+    Returns
+    -------
+    train_rows : int
+        The number of rows in train dataset.
+    test_rows : int
+        The number of rows in test dataset.
+
+    """
+    if append and strategy != "hash":
+        raise ValueError(f"Cannot append with {strategy} split strategy, use hash")
+    os.makedirs(processed_path, exist_ok=True)
+    train_name, test_name = "train", "test"
+    if append:
+        train_name = next_part_name(processed_path, "train", data_format)
+        test_name = next_part_name(processed_path, "test", data_format)
+    counts = {}
+    with DatasetWriter(processed_path, train_name, data_format) as train_writer:
+        with DatasetWriter(processed_path, test_name, data_format) as test_writer:
+            for df in chunks:
+                df = data_labeling(df)
+                test_mask = split_test_mask(df, split_size, strategy, counts)
+                train_writer.write(take_rows(df, ~test_mask, exclude=["income_cat"]))
+                test_writer.write(take_rows(df, test_mask, exclude=["income_cat"]))
+                logger.debug(f"Split chunk of {len(df)} rows")
+    logger.info(
+        f"Stored {train_writer.rows} train and {test_writer.rows} test rows at : "
+        f"{processed_path}"
+    )
+    return train_writer.rows, test_writer.rows
+
+
+def source_url(source):
+    """Function to turn a source of raw data into a url.
+
+    Parameters
+    ----------
+    source : str
+        The url or local path of an archive of raw data.
+
+    Returns
+    -------
+    url : str
+        The url of source, local paths become file urls.
+
+    """
+    if urllib.parse.urlparse(str(source)).scheme in URL_SCHEMES:
+        return str(source)
+    return pathlib.Path(source).resolve().as_uri()
+
+
+def source_key(url):
+    """Function to name the directory of raw data of a source.
+
+    Parameters
+    ----------
+    url : str
+        The url of source.
+
+    Returns
+    -------
+    key : str
+        The first 16 hex digits of sha256 of url.
+
+    """
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def is_multi_source(sources):
+    """Function to check whether sources name more than a single url.
+
+    Parameters
+    ----------
+    sources : str or list
+        The url of raw data, or a list or glob of urls and local paths.
+
+    Returns
+    -------
+    multi_source : bool
+        True if sources is a list or a local glob pattern.
+
+    """
+    if not isinstance(sources, (str, os.PathLike)):
+        return True
+    sources = str(sources)
+    return urllib.parse.urlparse(sources).scheme not in URL_SCHEMES and any(
+        char in sources for char in "*?["
+    )
+
+
+def expand_sources(sources):
+    """Function to expand a list or glob of sources into a list of urls.
+
+    Parameters
+    ----------
+    sources : str or list
+        The url of raw data, or a list or glob of urls and local paths.
+
+    Returns
+    -------
+    urls : list
+        The urls of sources, local paths become file urls.
+
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    urls = []
+    for source in sources:
+        if not is_multi_source(source):
+            urls.append(source_url(source))
+            continue
+        matches = sorted(glob.glob(str(source)))
+        if not matches:
+            raise FileNotFoundError(f"No raw data matches : {source}")
+        urls.extend(source_url(match) for match in matches)
+    return urls
+
+
+def fetch_source(url, housing_path, cache_path=None):
+    """Function to fetch the archive of a source into its own directory.
+
+    The download cache is not evicted here, as other sources fetched at the same time
+    may still need their entries, evict_sources evicts it once they are parsed.
+
+    Parameters
+    ----------
+    url : str
+        The url of source.
+    housing_path : str
+        The directory to store raw data, the archive is stored in a subdirectory
+        named by source_key.
+    cache_path : str
+        The directory of download cache, no cache is used if not provided.
+
+    Returns
+    -------
+    archive : str
+        The path of fetched archive.
+
+    """
+    return fetch_housing_data(
+        url,
+        os.path.join(housing_path, source_key(url)),
+        cache_path=cache_path,
+        extract=False,
+    )
+
+
+def evict_sources(archives, cache_path=None, max_cache_size=None, max_cache_age=None):
+    """Function to evict the download cache once fetched sources are parsed.
+
+    Parameters
+    ----------
+    archives : list
+        The paths of fetched archives, whose cache entries are kept.
+    cache_path : str
+        The directory of download cache, nothing is evicted if not provided.
+    max_cache_size : int
+        The maximum size of download cache in bytes.
+    max_cache_age : float
+        The maximum age of an unused cache entry in seconds.
+
+    Returns
+    -------
+    evicted : list
+        The checksums of evicted entries.
+
+    """
+    if not cache_path:
+        return []
+    return evict_cache(
+        cache_path,
+        max_size=max_cache_size,
+        max_age=max_cache_age,
+        keep=[os.path.dirname(archive) for archive in archives],
+    )
+
+
+def parse_source(archive, float_dtype="float64"):
+    """Function to parse the raw data of a fetched source.
+
+    Parameters
+    ----------
+    archive : str
+        The path of a tar archive holding housing.csv, or of a csv file.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe of raw data.
+
+    """
+    if tarfile.is_tarfile(archive):
+        return stream_housing_data(archive, float_dtype=float_dtype)
+    df = pd.read_csv(archive, dtype=csv_schema(float_dtype))
+    return apply_schema(df, float_dtype)
+
+
+def multi_source_ingestion(
+    sources,
+    housing_path,
+    cache_path=None,
+    max_cache_size=None,
+    max_cache_age=None,
+    max_workers=None,
+    float_dtype="float64",
+):
+    """Function to fetch and parse several sources of raw data concurrently.
+
+    Sources are fetched by a pool of threads and each fetched archive is handed to a
+    pool of processes, which decompress and parse it while other sources are still
+    being fetched. The parsed sources are concatenated in the order of sources.
+
+    Parameters
+    ----------
+    sources : str or list
+        The url of raw data, or a list or glob of urls and local paths.
+    housing_path : str
+        The directory to store raw data.
+    cache_path : str
+        The directory of download cache, no cache is used if not provided.
+    max_cache_size : int
+        The maximum size of download cache in bytes.
+    max_cache_age : float
+        The maximum age of an unused cache entry in seconds.
+    max_workers : int
+        The number of parsing processes, number of cpus if not provided.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    df : object
+        The pandas dataframe of raw data of all sources.
+
+    """
+    urls = expand_sources(sources)
+    with ThreadPoolExecutor(max_workers=min(len(urls), 8)) as fetch_pool:
+        fetched = {
+            fetch_pool.submit(fetch_source, url, housing_path, cache_path): position
+            for position, url in enumerate(urls)
+        }
+        with ProcessPoolExecutor(max_workers=max_workers) as parse_pool:
+            parsed = [None] * len(urls)
+            archives = []
+            for future in as_completed(fetched):
+                archives.append(future.result())
+                parsed[fetched[future]] = parse_pool.submit(
+                    parse_source, archives[-1], float_dtype
+                )
+            frames = [future.result() for future in parsed]
+    evict_sources(archives, cache_path, max_cache_size, max_cache_age)
+    logger.info(f"Ingested {len(urls)} sources of raw data")
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_manifest(manifest, manifest_path):
+    """Function to write the manifest of incremental ingestion atomically.
+
+    Parameters
+    ----------
+    manifest : dictionary
+        The manifest of processed sources.
+    manifest_path : str
+        The json file of manifest.
+
+    Returns
+    -------
+    none : None
+        Only writes manifest.
+
+    """
+    with open(f"{manifest_path}.tmp", "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return None
+
+
+def incremental_ingestion(
+    sources,
+    housing_path,
+    processed_path,
+    split_size=0.2,
+    data_format="csv",
+    cache_path=None,
+    max_cache_size=None,
+    max_cache_age=None,
+    float_dtype="float64",
+):
+    """Function to ingest only new or changed sources of raw data.
+
+    A manifest in processed_path records the sha256 checksum and row counts of each
+    processed source. Sources whose checksum is unchanged are skipped, while new or
+    changed sources, tar archives or csv files, are labelled, split with the hash
+    strategy and written as their own train and test parts, so a changed source
+    replaces only its own rows. The parts of sources recorded in the manifest but no
+    longer in sources are removed with a warning. A missing manifest, which a full rewrite of train or test
+    removes, or a change of split_size or data_format, rebuilds the processed data
+    from scratch.
+
+    Parameters
+    ----------
+    sources : str or list
+        The url of raw data, or a list or glob of urls and local paths.
+    housing_path : str
+        The directory to store raw data.
+    processed_path : str
+        The directory to store train and test files and the manifest.
+    split_size : float
+        The test_size.
+    data_format : str
+        The format of train and test files, one of csv, parquet or feather.
+    cache_path : str
+        The directory of download cache, no cache is used if not provided.
+    max_cache_size : int
+        The maximum size of download cache in bytes.
+    max_cache_age : float
+        The maximum age of an unused cache entry in seconds.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+
+    Returns
+    -------
+    manifest : dictionary
+        The manifest of processed sources.
+
+    """
+    os.makedirs(processed_path, exist_ok=True)
+    manifest_path = os.path.join(processed_path, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+    if (
+        manifest.get("split_size") != split_size
+        or manifest.get("data_format") != data_format
+    ):
+        logger.info(f"Rebuilding processed data at : {processed_path}")
+        for name in ("train", "test"):
+            for file_path in dataset_files(processed_path, name, data_format):
+                os.remove(file_path)
+        manifest = {"split_size": split_size, "data_format": data_format, "sources": {}}
+
+    urls = expand_sources(sources)
+    for url in [url for url in manifest["sources"] if url not in urls]:
+        record = manifest["sources"].pop(url)
+        logger.warning(f"Removing rows of source no longer configured : {url}")
+        for name in ("train", "test"):
+            file_path = dataset_path(
+                processed_path, f"{name}.part-{record['part']}", data_format
+            )
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        write_manifest(manifest, manifest_path)
+
+    archives = []
+    for url in urls:
+        part = source_key(url)
+        archive = fetch_source(url, housing_path, cache_path)
+        archives.append(archive)
+        sha256 = file_sha256(archive)
+        record = manifest["sources"].get(url)
+        if record and record["sha256"] == sha256:
+            logger.info(f"Skipping unchanged source : {url}")
+            continue
+        df = data_labeling(parse_source(archive, float_dtype=float_dtype))
+        test_mask = hash_split_mask(df, split_size=split_size)
+        for name, mask in (("train", ~test_mask), ("test", test_mask)):
+            rows = take_rows(df, mask, exclude=["income_cat"])
+            append_dataset(rows, processed_path, name, data_format, part=part)
+        manifest["sources"][url] = {
+            "sha256": sha256,
+            "rows": len(df),
+            "train_rows": int((~test_mask).sum()),
+            "test_rows": int(test_mask.sum()),
+            "part": part,
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        write_manifest(manifest, manifest_path)
+        logger.info(f"Ingested {'changed' if record else 'new'} source : {url}")
+    evict_sources(archives, cache_path, max_cache_size, max_cache_age)
+    return manifest
 
 
 if __name__ == "__main__":
@@ -168,12 +1436,88 @@ if __name__ == "__main__":
         type=str,
         help="directory to save fetched raw data, default val in setup.cfg: data/raw",
     )
+    parser.add_argument(
+        "--sources",
+        dest="SOURCES",
+        type=str,
+        nargs="+",
+        help="urls, paths or globs of raw data archives to ingest together, default \
+        val in setup.cfg: raw_data_url",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="WORKERS",
+        type=int,
+        help="number of processes parsing several sources, default val in setup.cfg: \
+        0 for number of cpus",
+    )
     parser.add_argument(
         "--processed-data",
         dest="PROCESSED",
         type=str,
         help="directory to save processed data, default val in setup.cfg: data/processed",
     )
+    parser.add_argument(
+        "--cache-data",
+        dest="CACHE",
+        type=str,
+        help="directory to cache fetched archives, default val in setup.cfg: data/cache",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="NOCACHE",
+        action="store_true",
+        help="fetch and extract raw data without download cache",
+    )
+    parser.add_argument(
+        "--stream-raw",
+        dest="STREAM",
+        action="store_true",
+        help="parse raw data straight out of the archive without extracting it, \
+        default val in setup.cfg: False",
+    )
+    parser.add_argument(
+        "--data-format",
+        dest="FORMAT",
+        type=str,
+        choices=DATA_FORMATS,
+        help="format to store raw and processed data, default val in setup.cfg: csv",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="CHUNK",
+        type=int,
+        help="number of rows per chunk to ingest and split raw data out of core, \
+        default val in setup.cfg: 0 to ingest whole data in memory",
+    )
+    parser.add_argument(
+        "--split-strategy",
+        dest="STRATEGY",
+        type=str,
+        choices=SPLIT_STRATEGIES,
+        help="strategy to split data into train and test data, default val in \
+        setup.cfg: shuffle, shuffle falls back to systematic in chunks",
+    )
+    parser.add_argument(
+        "--append",
+        dest="APPEND",
+        action="store_true",
+        help="append new rows to existing processed data, requires hash split strategy",
+    )
+    parser.add_argument(
+        "--incremental",
+        dest="INCREMENTAL",
+        action="store_true",
+        help="ingest only new or changed raw data recorded in a manifest of processed \
+        data, default val in setup.cfg: False",
+    )
+    parser.add_argument(
+        "--feature-store",
+        dest="FEATURE",
+        type=str,
+        help="directory of feature store to write train and test data to, default val \
+        in setup.cfg: data/features if feature_store is True",
+    )
     parser.add_argument(
         "--log-level",
         dest="LEVEL",
@@ -216,7 +1560,15 @@ if __name__ == "__main__":
     else:
         logger.setLevel(level=str(config["Default"]["log_level"]))
 
-    HOUSING_URL = str(config["Default"]["raw_data_url"])
+    if args.SOURCES:
+        HOUSING_URL = args.SOURCES if len(args.SOURCES) > 1 else args.SOURCES[0]
+    else:
+        HOUSING_URL = str(config["Default"]["raw_data_url"])
+
+    if args.WORKERS is not None:
+        WORKERS = args.WORKERS or None
+    else:
+        WORKERS = int(config["Default"]["ingest_workers"]) or None
 
     if args.RAW:
         HOUSING_PATH = args.RAW
@@ -228,8 +1580,95 @@ if __name__ == "__main__":
     else:
         PROCESSED_DATA = str(config["Default"]["processed_data"])
 
-    housing = data_ingestion(housing_url=HOUSING_URL, housing_path=HOUSING_PATH)
-    housing = data_labeling(df=housing)
-    strat_train_set, strat_test_set = save_split_data(
-        df=housing, processed_path=PROCESSED_DATA, split_size=0.2
-    )
+    if args.FORMAT:
+        DATA_FORMAT = args.FORMAT
+    else:
+        DATA_FORMAT = str(config["Default"]["data_format"])
+
+    if args.NOCACHE:
+        CACHE_DATA = None
+    elif args.CACHE:
+        CACHE_DATA = args.CACHE
+    else:
+        CACHE_DATA = str(config["Default"]["cache_data"])
+
+    CACHE_SIZE = int(float(config["Default"]["cache_size_mb"]) * 1024**2)
+    CACHE_AGE = float(config["Default"]["cache_age_days"]) * 24 * 60 * 60
+
+    if args.CHUNK is not None:
+        CHUNK_SIZE = args.CHUNK
+    else:
+        CHUNK_SIZE = int(config["Default"]["chunk_size"])
+
+    if args.STRATEGY:
+        SPLIT_STRATEGY = args.STRATEGY
+    else:
+        SPLIT_STRATEGY = str(config["Default"]["split_strategy"])
+
+    if args.FEATURE:
+        FEATURE_DATA = args.FEATURE
+    elif config.getboolean("Default", "feature_store"):
+        FEATURE_DATA = str(config["Default"]["feature_data"])
+    else:
+        FEATURE_DATA = None
+
+    if args.INCREMENTAL or config.getboolean("Default", "incremental_ingestion"):
+        manifest = incremental_ingestion(
+            sources=HOUSING_URL,
+            housing_path=HOUSING_PATH,
+            processed_path=PROCESSED_DATA,
+            split_size=0.2,
+            data_format=DATA_FORMAT,
+            cache_path=CACHE_DATA,
+            max_cache_size=CACHE_SIZE,
+            max_cache_age=CACHE_AGE,
+            float_dtype=str(config["Data"]["float_dtype"]),
+        )
+    elif CHUNK_SIZE:
+        housing_chunks = data_ingestion_chunks(
+            housing_url=HOUSING_URL,
+            housing_path=HOUSING_PATH,
+            chunksize=CHUNK_SIZE,
+            cache_path=CACHE_DATA,
+            max_cache_size=CACHE_SIZE,
+            max_cache_age=CACHE_AGE,
+            stream=args.STREAM or config.getboolean("Default", "stream_raw_data"),
+            float_dtype=str(config["Data"]["float_dtype"]),
+        )
+        train_rows, test_rows = chunked_split_data(
+            chunks=housing_chunks,
+            processed_path=PROCESSED_DATA,
+            split_size=0.2,
+            data_format=DATA_FORMAT,
+            strategy="systematic" if SPLIT_STRATEGY == "shuffle" else SPLIT_STRATEGY,
+            append=args.APPEND,
+        )
+    else:
+        housing = data_ingestion(
+            housing_url=HOUSING_URL,
+            housing_path=HOUSING_PATH,
+            cache_path=CACHE_DATA,
+            max_cache_size=CACHE_SIZE,
+            max_cache_age=CACHE_AGE,
+            stream=args.STREAM or config.getboolean("Default", "stream_raw_data"),
+            data_format=DATA_FORMAT,
+            float_dtype=str(config["Data"]["float_dtype"]),
+            max_workers=WORKERS,
+        )
+        housing = data_labeling(df=housing)
+        strat_train_set, strat_test_set = save_split_data(
+            df=housing,
+            processed_path=PROCESSED_DATA,
+            split_size=0.2,
+            data_format=DATA_FORMAT,
+            strategy=SPLIT_STRATEGY,
+            append=args.APPEND,
+        )
+
+    if FEATURE_DATA:
+        build_feature_store(
+            processed_path=PROCESSED_DATA,
+            feature_path=FEATURE_DATA,
+            data_format=DATA_FORMAT,
+            float_dtype=str(config["Data"]["float_dtype"]),
+        )
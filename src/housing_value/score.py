@@ -9,6 +9,15 @@ optional arguments:
                           directory to read testing data, default val in setup.cfg: data/processed
     --pickle-data PICKLE  directory to read pickle files, default val in setup.cfg: artifacts
     --output-data OUTPUT  directory to store scored data, default val in setup.cfg: data/processed
+    --data-format {csv,parquet,feather}
+                          format of processed data, default val in setup.cfg: csv
+    --feature-store FEATURE
+                          directory of feature store to open test data from, default val in setup.cfg: data/features if
+                          feature_store is True
+    --predict-engine {pipeline,vectorized}
+                          engine predicting with pipe, vectorized walks trees of random forests with a pool of threads,
+                          default val in setup.cfg: pipeline
+    --predict-jobs JOBS   number of threads of vectorized engine, -1 for all processors, default val in setup.cfg: -1
     --log-level LEVEL     provide logging level, default val in setup.cfg: DEBUG
     --log-data LOG        file to store log data, default val in setup.cfg: logs/main.log if no console display is opted else default is console
                           display
@@ -23,6 +32,17 @@ import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_squared_error
 
+from housing_value.dataset import (
+    DATA_FORMATS,
+    apply_schema,
+    drop_columns,
+    log_memory_usage,
+    read_dataset,
+    take_rows,
+)
+from housing_value.feature_store import read_feature_store
+from housing_value.forest import PREDICT_ENGINES, vectorized_pipeline
+
 logger = logging.getLogger(__name__)
 
 formatter = logging.Formatter(
@@ -31,7 +51,15 @@ formatter = logging.Formatter(
 )
 
 
-def load_scoring_data(df=None, processed_path=None):
+def load_scoring_data(
+    df=None,
+    processed_path=None,
+    data_format="csv",
+    columns=None,
+    float_dtype="float64",
+    feature_path=None,
+    index=None,
+):
     """Function to read testing data and return features and actuals.
 
     Parameters
@@ -40,6 +68,20 @@ def load_scoring_data(df=None, processed_path=None):
         The pandas dataframe of testing data to bypass reading data from directory.
     processed_path : str
         The directory to read testing data.
+    data_format : str
+        The format of testing data, one of csv, parquet or feather.
+    columns : list
+        The feature columns to read along with labels, all columns are read if not
+        provided.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+    feature_path : str
+        The directory of feature store to open test data as memory-mapped arrays
+        instead of reading processed_path.
+    index : object
+        The numpy array of row positions of testing data in df (for e.g - returned by
+        save_split_data with return_indices), rows are gathered in a single copy
+        leaving out income categories.
 
     Returns
     -------
@@ -50,13 +92,34 @@ def load_scoring_data(df=None, processed_path=None):
 
     """
     logger.debug("Reading testing data")
+    if feature_path:
+        X_test, y_test = read_feature_store(feature_path, "test")
+        if columns:
+            X_test = drop_columns(
+                X_test, [column for column in X_test.columns if column not in columns]
+            )
+        log_memory_usage(X_test, "score")
+        return X_test, y_test
     if processed_path:
-        strat_test_set = pd.read_csv(filepath_or_buffer=f"{processed_path}/test.csv")
+        if columns:
+            columns = list(columns) + ["median_house_value"]
+        strat_test_set = read_dataset(
+            processed_path,
+            "test",
+            data_format=data_format,
+            columns=columns,
+            float_dtype=float_dtype,
+        )
         logger.info(f"Read testing data from : {processed_path}")
+    elif index is not None:
+        strat_test_set = apply_schema(
+            take_rows(df, index, exclude=["income_cat"]), float_dtype
+        )
     else:
-        strat_test_set = df
-    X_test = strat_test_set.drop("median_house_value", axis=1)
-    y_test = strat_test_set["median_house_value"].copy()
+        strat_test_set = apply_schema(df, float_dtype)
+    log_memory_usage(strat_test_set, "score")
+    y_test = strat_test_set["median_house_value"]
+    X_test = drop_columns(strat_test_set, ["median_house_value"])
     return X_test, y_test
 
 
@@ -78,7 +141,7 @@ def replicate_feature_engineering(df, pickle_path=None, imputer_file=None):
         The pandas dataframe of features after imputation and feature engineering.
 
     """
-    df_num = df.drop("ocean_proximity", axis=1)
+    df_num = drop_columns(df, ["ocean_proximity"])
     logger.debug("Imputing test Data")
     if pickle_path and imputer_file:
         file = open(f"{pickle_path}/{imputer_file}", "rb")
@@ -92,8 +155,10 @@ def replicate_feature_engineering(df, pickle_path=None, imputer_file=None):
     df_tr["rooms_per_household"] = df_tr["total_rooms"] / df_tr["households"]
     df_tr["bedrooms_per_room"] = df_tr["total_bedrooms"] / df_tr["total_rooms"]
     df_tr["population_per_household"] = df_tr["population"] / df_tr["households"]
-    df_cat = df[["ocean_proximity"]]
-    df_prepared = df_tr.join(pd.get_dummies(df_cat, drop_first=True))
+    dummies = pd.get_dummies(df[["ocean_proximity"]], drop_first=True)
+    for column in dummies.columns:
+        df_tr[column] = dummies[column]
+    df_prepared = df_tr
     return df_prepared
 
 
@@ -159,7 +224,14 @@ def scoring_test_data(
 
 
 def scoring_with_pipeline(
-    df, actuals, pickle_path=None, pipe_file=None, output_path=None, output_file=None,
+    df,
+    actuals,
+    pickle_path=None,
+    pipe_file=None,
+    output_path=None,
+    output_file=None,
+    engine="pipeline",
+    n_jobs=None,
 ):
     """Function to score predictions based on inputs/features provided to trained pipeline.
 
@@ -177,6 +249,12 @@ def scoring_with_pipeline(
         The directory to store actuals & predictions.
     output_file : str
         The name of output file (for e.g - something.csv).
+    engine : str
+        The engine predicting with pipe, pipeline calls pipe.predict while vectorized
+        walks the trees of random forests level by level over flat node arrays.
+    n_jobs : int
+        The number of threads walking trees with vectorized engine, -1 uses all
+        processors.
 
     Returns
     -------
@@ -187,6 +265,8 @@ def scoring_with_pipeline(
 
     """
     logger.debug("Scoring with Pipeline")
+    if engine not in PREDICT_ENGINES:
+        raise ValueError(f"Unsupported predict engine : {engine}")
     if pickle_path and pipe_file:
         file = open(f"{pickle_path}/{pipe_file}", "rb")
         pipe = pickle.load(file)
@@ -195,6 +275,9 @@ def scoring_with_pipeline(
         pipe = pickle.load(file)
     else:
         pass
+    if engine == "vectorized":
+        pipe = vectorized_pipeline(pipe, n_jobs)
+        logger.debug(f"Predicting with vectorized engine on {n_jobs} threads")
     predictions = pipe.predict(df)
     output = pd.DataFrame()
     output["Actual"] = actuals
@@ -237,6 +320,35 @@ if __name__ == "__main__":
         type=str,
         help="directory to store scored data, default val in setup.cfg: data/processed",
     )
+    parser.add_argument(
+        "--data-format",
+        dest="FORMAT",
+        type=str,
+        choices=DATA_FORMATS,
+        help="format of processed data, default val in setup.cfg: csv",
+    )
+    parser.add_argument(
+        "--feature-store",
+        dest="FEATURE",
+        type=str,
+        help="directory of feature store to open test data from, default val in \
+        setup.cfg: data/features if feature_store is True",
+    )
+    parser.add_argument(
+        "--predict-engine",
+        dest="PREDICT_ENGINE",
+        type=str,
+        choices=PREDICT_ENGINES,
+        help="engine predicting with pipe, vectorized walks trees of random forests \
+        with a pool of threads, default val in setup.cfg: pipeline",
+    )
+    parser.add_argument(
+        "--predict-jobs",
+        dest="PREDICT_JOBS",
+        type=int,
+        help="number of threads of vectorized engine, -1 for all processors, default \
+        val in setup.cfg: -1",
+    )
     parser.add_argument(
         "--log-level",
         dest="LEVEL",
@@ -284,6 +396,18 @@ if __name__ == "__main__":
     else:
         PROCESSED_DATA = str(config["Default"]["processed_data"])
 
+    if args.FORMAT:
+        DATA_FORMAT = args.FORMAT
+    else:
+        DATA_FORMAT = str(config["Default"]["data_format"])
+
+    if args.FEATURE:
+        FEATURE_DATA = args.FEATURE
+    elif config.getboolean("Default", "feature_store"):
+        FEATURE_DATA = str(config["Default"]["feature_data"])
+    else:
+        FEATURE_DATA = None
+
     if args.PICKLE:
         PICKLE_DATA = args.PICKLE
     else:
@@ -294,6 +418,16 @@ if __name__ == "__main__":
     else:
         OUTPUT_DATA = str(config["Default"]["output_data"])
 
+    if args.PREDICT_ENGINE:
+        PREDICT_ENGINE = args.PREDICT_ENGINE
+    else:
+        PREDICT_ENGINE = str(config["Score"]["predict_engine"])
+
+    if args.PREDICT_JOBS is not None:
+        PREDICT_JOBS = args.PREDICT_JOBS
+    else:
+        PREDICT_JOBS = int(config["Score"]["predict_jobs"])
+
     # IMPUTER_FILE = str(config["Default"]["imputer_file"])
 
     # MODEL_FILE = str(config["Default"]["model_file"])
@@ -302,7 +436,12 @@ if __name__ == "__main__":
 
     OUTPUT_FILE = str(config["Default"]["output_file"])
 
-    X_test, y_test = load_scoring_data(processed_path=PROCESSED_DATA)
+    X_test, y_test = load_scoring_data(
+        processed_path=PROCESSED_DATA,
+        data_format=DATA_FORMAT,
+        float_dtype=str(config["Data"]["float_dtype"]),
+        feature_path=FEATURE_DATA,
+    )
 
     # X_test_prepared = replicate_feature_engineering(
     #     df=X_test, pickle_path=PICKLE_DATA, imputer_file=IMPUTER_FILE
@@ -324,4 +463,6 @@ if __name__ == "__main__":
         pipe_file=PIPE_FILE,
         output_path=PROCESSED_DATA,
         output_file=OUTPUT_FILE,
+        engine=PREDICT_ENGINE,
+        n_jobs=PREDICT_JOBS,
     )
@@ -0,0 +1,567 @@
+"""
+Notes
+-----
+Use this module to search random forest parameters growing one forest per fold for
+candidates that differ only in n_estimators.
+A random forest with warm_start keeps its trees and adds new ones when it is fitted
+again with a larger n_estimators, and the new trees are the same as those of a forest
+fitted from scratch. ForestSearchCV therefore fits the candidates of a group in
+increasing n_estimators on each fold, scoring every size as it goes, and reports the
+same scores, ranks and best parameters as GridSearchCV.
+The score of each candidate on each fold can be kept in a ResultsStore keyed by a
+fingerprint of the data, estimator, folds and library versions, so that a search which is rerun or
+resumed after being killed only fits the candidates and folds not stored yet.
+The models of the best candidate on each fold can be kept as fold_estimators_ and
+averaged by FoldEnsembleRegressor instead of refitting the best candidate.
+"""
+import contextlib
+import importlib.metadata
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import joblib
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+
+from housing_value.utility import ResourceProfiler, pickled_size
+
+logger = logging.getLogger(__name__)
+
+RESULT_KEYS = ("test_score", "train_score", "fit_time", "score_time", "profile")
+
+# parameters of an estimator that do not change its scores, left out of fingerprint
+NON_SEMANTIC_PARAMS = ("n_jobs", "memory", "verbose")
+
+
+class ResultsStore:
+    """Class to keep the score of each candidate on each fold as a json file.
+
+    Results are stored at path/fingerprint/param_hash-fold.json, where fingerprint
+    identifies the data, estimator and folds of a search and param_hash the
+    parameters of a candidate. Files are written atomically as soon as a fit is
+    scored, so a killed search keeps every completed fit.
+
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = os.path.join(path, fingerprint)
+        self.fingerprint = fingerprint
+
+    def file_path(self, params, fold):
+        return os.path.join(self.path, f"{joblib.hash(params)}-{fold}.json")
+
+    def load(self, params, fold):
+        try:
+            with open(self.file_path(params, fold)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, params, fold, result):
+        os.makedirs(self.path, exist_ok=True)
+        file_path = self.file_path(params, fold)
+        with open(f"{file_path}.{os.getpid()}.tmp", "w") as file:
+            json.dump(dict(result, params=repr(params), fold=fold), file)
+        os.replace(f"{file_path}.{os.getpid()}.tmp", file_path)
+
+
+class BestModelStore:
+    """Class to keep the model of the best candidate scored so far on each fold.
+
+    Models are dumped at path/fold-index.joblib next to fold-index.json holding their
+    test score. A model is dumped only when it scores better than the model kept for
+    its fold, ties going to the lower candidate index as in the ranks of search, and
+    the models it beats are removed after it is dumped, so that processes keeping
+    models of the same fold at the same time leave one model per fold.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def file_path(self, fold, index):
+        return os.path.join(self.path, f"{fold}-{index}")
+
+    def scores(self, fold):
+        scores = {}
+        for name in os.listdir(self.path):
+            stem, extension = os.path.splitext(name)
+            prefix, _, index = stem.partition("-")
+            if extension != ".json" or prefix != str(fold):
+                continue
+            try:
+                with open(os.path.join(self.path, name)) as file:
+                    scores[int(index)] = json.load(file)["test_score"]
+            except (OSError, ValueError):
+                # removed by a process keeping a better model
+                continue
+        return scores
+
+    @staticmethod
+    def best(scores):
+        return min(scores, key=lambda index: (-scores[index], index), default=None)
+
+    def save(self, fold, index, test_score, model):
+        scores = self.scores(fold)
+        if np.isnan(test_score) or self.best({**scores, index: test_score}) != index:
+            return False
+        file_path = self.file_path(fold, index)
+        joblib.dump(model, f"{file_path}.{os.getpid()}.tmp")
+        os.replace(f"{file_path}.{os.getpid()}.tmp", f"{file_path}.joblib")
+        with open(f"{file_path}.{os.getpid()}.tmp", "w") as file:
+            json.dump({"test_score": test_score}, file)
+        os.replace(f"{file_path}.{os.getpid()}.tmp", f"{file_path}.json")
+        scores = self.scores(fold)
+        best = self.best(scores)
+        for other in scores:
+            if other != best:
+                for extension in (".json", ".joblib"):
+                    with contextlib.suppress(OSError):
+                        os.remove(f"{self.file_path(fold, other)}{extension}")
+        return True
+
+    def load(self, fold, index):
+        try:
+            return joblib.load(f"{self.file_path(fold, index)}.joblib")
+        except OSError:
+            return None
+
+
+def search_fingerprint(estimator, X, y, folds, scoring=None):
+    """Function to fingerprint the data, estimator and folds of a search.
+
+    The versions of housing_value, scikit-learn and numpy are part of the fingerprint,
+    as the scores of the same parameters may change with them.
+
+    Parameters
+    ----------
+    estimator : object
+        The unfitted estimator of search, its parameters in NON_SEMANTIC_PARAMS (for
+        e.g - rf__n_jobs or the memory of a pipeline) are left out so that changing
+        parallelism or cache directory keeps stored results.
+    X : object
+        The features.
+    y : object
+        The labels.
+    folds : list
+        The train and test row positions of each fold.
+    scoring : str
+        The scoring of search.
+
+    Returns
+    -------
+    fingerprint : str
+        The hex digest identifying the search.
+
+    """
+    estimator = clone(estimator)
+    estimator.set_params(
+        **{
+            name: None
+            for name in estimator.get_params()
+            if name.rpartition("__")[2] in NON_SEMANTIC_PARAMS
+        }
+    )
+    try:
+        version = importlib.metadata.version("housing_value")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+    versions = [version, sklearn.__version__, np.__version__]
+    return joblib.hash([estimator, X, y, folds, scoring, versions])
+
+
+def warm_start_groups(candidate_params, n_estimators_param="n_estimators"):
+    """Function to group candidates that differ only in n_estimators.
+
+    Parameters
+    ----------
+    candidate_params : list
+        The parameters of each candidate.
+    n_estimators_param : str
+        The name of n_estimators parameter (for e.g - rf__n_estimators).
+
+    Returns
+    -------
+    groups : list
+        The candidate indices of each group in increasing n_estimators.
+
+    """
+    groups = defaultdict(list)
+    for index, params in enumerate(candidate_params):
+        key = tuple(
+            sorted(
+                (name, repr(value))
+                for name, value in params.items()
+                if name != n_estimators_param
+            )
+        )
+        groups[key].append(index)
+    return [
+        sorted(
+            indices,
+            key=lambda index: candidate_params[index].get(n_estimators_param, 0),
+        )
+        for indices in groups.values()
+    ]
+
+
+def fold_rows(data, rows):
+    """Function to take rows of a fold from a dataframe, series or array.
+
+    Parameters
+    ----------
+    data : object
+        The pandas dataframe, series or numpy array.
+    rows : object
+        The numpy array of row positions.
+
+    Returns
+    -------
+    data : object
+        The rows of data.
+
+    """
+    if hasattr(data, "iloc"):
+        return data.iloc[rows]
+    return data[rows]
+
+
+def fit_and_score_group(
+    estimator,
+    X,
+    y,
+    train,
+    test,
+    candidate_params,
+    indices,
+    scorer,
+    n_estimators_param="n_estimators",
+    return_train_score=True,
+    store=None,
+    fold=None,
+    model_path=None,
+    profile=False,
+):
+    """Function to grow one forest on a fold through the candidates of a group.
+
+    Parameters
+    ----------
+    estimator : object
+        The random forest, or a pipeline ending with it.
+    X : object
+        The features.
+    y : object
+        The labels.
+    train : object
+        The numpy array of train row positions of fold.
+    test : object
+        The numpy array of test row positions of fold.
+    candidate_params : list
+        The parameters of each candidate.
+    indices : list
+        The candidate indices of group in increasing n_estimators.
+    scorer : object
+        The scorer of fitted candidates.
+    n_estimators_param : str
+        The name of n_estimators parameter (for e.g - rf__n_estimators).
+    return_train_score : bool
+        Whether candidates are scored on train rows too.
+    store : object
+        The ResultsStore to read and write results, candidates already stored are
+        not scored again and the forest is grown only up to the last missing one.
+    fold : int
+        The number of fold in store.
+    model_path : str
+        The directory of a BestModelStore keeping the model of the best candidate
+        scored so far on fold, not kept if not provided.
+    profile : bool
+        Whether to measure the wall time, cpu time and peak resident memory of the
+        fit and the pickled size of the model of each candidate. cpu time and peak
+        resident memory are those of the whole process, so the profile records as
+        concurrent the fits run on a worker thread (for e.g - threading backend of
+        joblib), whose figures include the other fits of the process.
+
+    Returns
+    -------
+    results : list
+        The candidate index, test score, train score, fit time, score time and
+        profile (None if not measured) of each candidate of group.
+
+    """
+    stored = {
+        index: store.load(candidate_params[index], fold) if store else None
+        for index in indices
+    }
+    missing = [index for index in indices if stored[index] is None]
+    results = [
+        (index,) + tuple(stored[index].get(key) for key in RESULT_KEYS)
+        for index in indices
+        if stored[index] is not None
+    ]
+    if not missing:
+        return results
+    indices = indices[: indices.index(missing[-1]) + 1]
+    X_train, y_train = fold_rows(X, train), fold_rows(y, train)
+    X_test, y_test = fold_rows(X, test), fold_rows(y, test)
+    prefix, separator, _ = n_estimators_param.rpartition("__")
+    warm_start_param = f"{prefix}{separator}warm_start"
+    models = BestModelStore(model_path) if model_path else None
+    forest = clone(estimator)
+    forest.set_params(**{warm_start_param: True})
+    for index in indices:
+        forest.set_params(**candidate_params[index])
+        start = time.time()
+        with ResourceProfiler() if profile else contextlib.nullcontext() as profiler:
+            forest.fit(X_train, y_train)
+        fit_time = time.time() - start
+        if stored[index] is not None:
+            continue
+        start = time.time()
+        test_score = scorer(forest, X_test, y_test)
+        score_time = time.time() - start
+        train_score = scorer(forest, X_train, y_train) if return_train_score else np.nan
+        fit_profile = None
+        if profile:
+            fit_profile = {
+                "wall_time": profiler.wall_time,
+                "cpu_time": profiler.cpu_time,
+                "peak_rss": profiler.peak_rss,
+                "rss_growth": profiler.rss_growth,
+                "concurrent": threading.current_thread() is not threading.main_thread(),
+                "model_size": pickled_size(forest),
+            }
+        result = (test_score, train_score, fit_time, score_time, fit_profile)
+        if models:
+            models.save(fold, index, test_score, forest)
+        if store:
+            store.save(candidate_params[index], fold, dict(zip(RESULT_KEYS, result)))
+        results.append((index,) + result)
+    return results
+
+
+class ForestSearchCV(BaseEstimator):
+    """Class to search a grid of random forest parameters with warm-started forests.
+
+    It takes the parameters of GridSearchCV that the training functions use and
+    exposes cv_results_, best_index_, best_params_, best_score_ and best_estimator_
+    like GridSearchCV. The fit and score times of a warm-started candidate are the
+    times to grow and score its forest from the previous size. With n_iter, n_iter
+    candidates are sampled from param_grid like RandomizedSearchCV. Without
+    warm_start every candidate is fitted from scratch, and with results_path the
+    results of each fit are kept in a ResultsStore and reused by later searches.
+    With keep_fold_estimators the model of the best candidate so far on each fold is
+    kept in a BestModelStore in a temporary directory during search, and the models
+    of the best candidate are kept as fold_estimators_, fitted again on the folds
+    where another candidate scored better, and without refit best_estimator_ is not
+    fitted. With profile
+    the wall time, cpu time, peak resident memory and model size of each candidate on
+    each fold are kept in profiles_, the times of a warm-started candidate being those
+    of growing its forest from the previous size. cpu time and peak resident memory
+    are process-wide, and include the other fits of the process for the fits flagged
+    concurrent in their profile.
+
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        n_jobs=None,
+        cv=5,
+        return_train_score=True,
+        n_estimators_param="n_estimators",
+        warm_start=True,
+        n_iter=None,
+        random_state=None,
+        results_path=None,
+        refit=True,
+        keep_fold_estimators=False,
+        profile=False,
+    ):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.cv = cv
+        self.return_train_score = return_train_score
+        self.n_estimators_param = n_estimators_param
+        self.warm_start = warm_start
+        self.n_iter = n_iter
+        self.random_state = random_state
+        self.results_path = results_path
+        self.refit = refit
+        self.keep_fold_estimators = keep_fold_estimators
+        self.profile = profile
+
+    def fit(self, X, y):
+        if self.n_iter:
+            candidate_params = list(
+                ParameterSampler(
+                    self.param_grid, self.n_iter, random_state=self.random_state
+                )
+            )
+        else:
+            candidate_params = list(ParameterGrid(self.param_grid))
+        if self.warm_start:
+            groups = warm_start_groups(candidate_params, self.n_estimators_param)
+        else:
+            groups = [[index] for index in range(len(candidate_params))]
+        cv = check_cv(self.cv, y, classifier=False)
+        folds = list(cv.split(X, y))
+        self.scorer_ = check_scoring(self.estimator, self.scoring)
+        store = None
+        if self.results_path:
+            store = ResultsStore(
+                self.results_path,
+                search_fingerprint(self.estimator, X, y, folds, self.scoring),
+            )
+            logger.info(f"Reusing search results at : {store.path}")
+        logger.debug(
+            f"Fitting {len(groups)} warm-started forests for {len(candidate_params)} "
+            f"candidates on each of {len(folds)} folds"
+        )
+        model_path = self._model_path() if self.keep_fold_estimators else None
+        try:
+            out = self._fit_groups(
+                X, y, candidate_params, groups, folds, store, model_path
+            )
+            self._select_best(candidate_params, out, len(folds))
+            if model_path:
+                self.fold_estimators_ = [
+                    self._fold_estimator(model_path, X, y, train, fold)
+                    for fold, (train, _) in enumerate(folds)
+                ]
+        finally:
+            if model_path:
+                shutil.rmtree(model_path, ignore_errors=True)
+        if not self.refit:
+            return self
+        start = time.time()
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+        self.best_estimator_.fit(X, y)
+        self.refit_time_ = time.time() - start
+        return self
+
+    def _select_best(self, candidate_params, out, n_splits):
+        shape = (len(candidate_params), n_splits)
+        scores = {"test": np.empty(shape), "train": np.empty(shape)}
+        times = {"fit": np.empty(shape), "score": np.empty(shape)}
+        self.profiles_ = []
+        for position, group_results in enumerate(out):
+            split = position % n_splits
+            for result in group_results:
+                index, test_score, train_score, fit_time, score_time, profile = result
+                scores["test"][index, split] = test_score
+                scores["train"][index, split] = train_score
+                times["fit"][index, split] = fit_time
+                times["score"][index, split] = score_time
+                if self.profile and profile:
+                    self.profiles_.append(dict(profile, candidate=index, fold=split))
+        self.profiles_.sort(key=lambda fit: (fit["candidate"], fit["fold"]))
+        self.cv_results_ = self._format_results(candidate_params, scores, times)
+        self.n_splits_ = n_splits
+        self.best_index_ = int(self.cv_results_["rank_test_score"].argmin())
+        self.best_params_ = candidate_params[self.best_index_]
+        self.best_score_ = self.cv_results_["mean_test_score"][self.best_index_]
+
+    def _model_path(self):
+        return tempfile.mkdtemp(prefix="fold-estimators-")
+
+    def _fold_estimator(self, model_path, X, y, train, fold):
+        model = BestModelStore(model_path).load(fold, self.best_index_)
+        if model is not None:
+            return model
+        # the best candidate was beaten on the fold or read from results store
+        estimator = clone(self.estimator).set_params(**self.best_params_)
+        return estimator.fit(fold_rows(X, train), fold_rows(y, train))
+
+    def _fit_groups(self, X, y, candidate_params, groups, folds, store, model_path):
+        # results of each group on each fold, in the order of groups then folds
+        return Parallel(n_jobs=self.n_jobs)(
+            delayed(fit_and_score_group)(
+                self.estimator,
+                X,
+                y,
+                train,
+                test,
+                candidate_params,
+                indices,
+                self.scorer_,
+                self.n_estimators_param,
+                self.return_train_score,
+                store,
+                fold,
+                model_path,
+                self.profile,
+            )
+            for indices in groups
+            for fold, (train, test) in enumerate(folds)
+        )
+
+    def _format_results(self, candidate_params, scores, times):
+        results = {}
+        for name in ("fit", "score"):
+            results[f"mean_{name}_time"] = np.mean(times[name], axis=1)
+            results[f"std_{name}_time"] = np.std(times[name], axis=1)
+        param_results = defaultdict(
+            lambda: np.ma.MaskedArray(
+                np.empty(len(candidate_params)), mask=True, dtype=object
+            )
+        )
+        for index, params in enumerate(candidate_params):
+            for name, value in params.items():
+                param_results[f"param_{name}"][index] = value
+        results.update(param_results)
+        results["params"] = candidate_params
+        for name in ("test", "train") if self.return_train_score else ("test",):
+            for split in range(scores[name].shape[1]):
+                results[f"split{split}_{name}_score"] = scores[name][:, split]
+            means = np.average(scores[name], axis=1)
+            stds = np.sqrt(
+                np.average((scores[name] - means[:, np.newaxis]) ** 2, axis=1)
+            )
+            results[f"mean_{name}_score"] = means
+            results[f"std_{name}_score"] = stds
+            if name == "test":
+                results["rank_test_score"] = np.asarray(
+                    rankdata(-means, method="min"), dtype=np.int32
+                )
+        return results
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def score(self, X, y):
+        return self.scorer_(self.best_estimator_, X, y)
+
+
+class FoldEnsembleRegressor(BaseEstimator, RegressorMixin):
+    """Class to average the predictions of the models of a candidate on each fold.
+
+    The models fitted on the train rows of each fold during search are used as they
+    are, so that no model is fitted on all rows after search.
+
+    """
+
+    def __init__(self, estimators):
+        self.estimators = estimators
+
+    def fit(self, X, y):
+        self.estimators_ = [clone(estimator).fit(X, y) for estimator in self.estimators]
+        return self
+
+    def predict(self, X):
+        estimators = getattr(self, "estimators_", self.estimators)
+        return np.mean([estimator.predict(X) for estimator in estimators], axis=0)
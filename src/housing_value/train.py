@@ -8,25 +8,130 @@ optional arguments:
     --processed-data PROCESSED
                           directory to read training data, default val in setup.cfg: data/processed
     --pickle-data PICKLE  directory to save pickle files, default val in setup.cfg: artifacts
+    --data-format {csv,parquet,feather}
+                          format of processed data, default val in setup.cfg: csv
+    --feature-store FEATURE
+                          directory of feature store to open train data from, default val in setup.cfg: data/features if
+                          feature_store is True
+    --preprocessor {column,fused}
+                          preprocessor of pipeline, default val in setup.cfg: column
+    --engine {forest,boosting}
+                          model engine of pipeline, default val in setup.cfg: forest
+    --engine-report REPORT
+                          json file to compare train time, model size and predict time of engines, default val in setup.cfg:
+                          artifacts/engine_report.json
+    --pipeline-cache PIPECACHE
+                          directory to cache preprocessing across candidates of search, default val in setup.cfg:
+                          data/pipeline_cache
+    --no-pipeline-cache   refit preprocessing for every candidate of search
+    --n-jobs JOBS         number of candidate fits run in parallel, -1 for all cores, default val in setup.cfg: 1
+    --backend {loky,threading,multiprocessing}
+                          joblib backend of parallel fits, default val in setup.cfg: loky
+    --forest-jobs FORESTJOBS
+                          number of trees of each random forest built in parallel, default val in setup.cfg: 1
+    --search-strategy {grid,random,halving}
+                          strategy of hyperparameter search, default val in setup.cfg: grid
+    --n-iter ITER         number of candidates sampled by random search, default val in setup.cfg: 10
+    --halving-resource {n_samples,n_estimators}
+                          resource of halving search, default val in setup.cfg: n_samples
+    --warm-start          grow one forest per fold across n_estimators instead of fitting every candidate of grid search
+                          from scratch, default val in setup.cfg: False
+    --results-data RESULTS
+                          directory to store the score of each candidate on each fold of search and resume from, default
+                          val in setup.cfg: empty, no results are stored
+    --resume              reuse and store search results in data/search_results if no results directory is provided
+    --distributed         hand the fits of search to worker processes of a coordinator, default val in setup.cfg: False
+    --address ADDRESS     host:port of search coordinator, default val in setup.cfg: localhost:50000
+    --local-workers WORKERS
+                          number of worker processes started on this host by distributed search, default val in setup.cfg: 2
+    --final-strategy {refit,background,fold_ensemble}
+                          how the saved pipe is built after search, background refits in place as nothing follows training
+                          in this script, default val in setup.cfg: refit
+    --profile             profile every fit of search, default val in setup.cfg: False
+    --profile-report PROFILEREPORT
+                          json file to store the profile of every fit of search, default val in setup.cfg:
+                          artifacts/profile_report.json
+    --compact {float64,float32}
+                          dtype of thresholds and leaf values of compact forest saved in pipe, smaller and faster to load but
+                          slower to predict large batches, default val in setup.cfg: float32 if compact is True
+    --no-compact          save random forests of pipe as they are
+    --refresh-data REFRESH
+                          directory of new rows to add trees for to the trained pipe instead of training it again, keeping
+                          its imputer medians
+    --refresh-trees TREES
+                          number of trees added by refresh, default val: in proportion of new rows
     --log-level LEVEL     provide logging level, default val in setup.cfg: DEBUG
     --log-data LOG        file to store log data, default val in setup.cfg: logs/main.log if no console display is opted else default is console
                           display
     --no-console-log      do not display log on console
 """
 import argparse
+import concurrent.futures
 import configparser
+import contextlib
+import json
 import logging
+import os
 import pickle
+import time
 
+import numpy as np
 import pandas as pd
+from joblib import Memory, effective_n_jobs, parallel_backend
+from sklearn.base import clone
 from sklearn.compose import ColumnTransformer
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
 from sklearn.impute import SimpleImputer
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    RandomizedSearchCV,
+)
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder
 
-from housing_value.utility import AdditionalAttributes
+from housing_value.dataset import (
+    DATA_FORMATS,
+    apply_schema,
+    drop_columns,
+    log_memory_usage,
+    read_dataset,
+    take_rows,
+)
+from housing_value.distributed import DistributedSearchCV
+from housing_value.feature_store import read_feature_store
+from housing_value.forest import COMPACT_DTYPES, compact_pipeline
+from housing_value.search import FoldEnsembleRegressor, ForestSearchCV
+from housing_value.utility import (
+    AdditionalAttributes,
+    FusedPreprocessor,
+    pickled_size,
+)
+
+PREPROCESSORS = ("column", "fused")
+
+BACKENDS = ("loky", "threading", "multiprocessing")
+
+SEARCH_STRATEGIES = ("grid", "random", "halving")
+
+HALVING_RESOURCES = ("n_samples", "n_estimators")
+
+MODEL_ENGINES = ("forest", "boosting")
+
+FINAL_STRATEGIES = ("refit", "background", "fold_ensemble")
+
+DEFAULT_PARAM_GRID = [
+    # try 12 (3×4) combinations of hyperparameters
+    {"n_estimators": [3, 10, 30], "max_features": [2, 4, 6, 8]},
+    # then try 6 (2×3) combinations with bootstrap set as False
+    {"bootstrap": [False], "n_estimators": [3, 10], "max_features": [2, 3, 4]},
+]
+
+DEFAULT_BOOSTING_PARAM_GRID = [
+    # try 9 (3×3) combinations, each adding trees until validation loss stalls
+    {"learning_rate": [0.05, 0.1, 0.2], "max_leaf_nodes": [15, 31, 63]},
+]
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +141,15 @@ formatter = logging.Formatter(
 )
 
 
-def load_training_data(df=None, processed_path=None):
+def load_training_data(
+    df=None,
+    processed_path=None,
+    data_format="csv",
+    columns=None,
+    float_dtype="float64",
+    feature_path=None,
+    index=None,
+):
     """Function to read training data and return features and labels.
 
     Parameters
@@ -45,6 +158,20 @@ def load_training_data(df=None, processed_path=None):
         The pandas dataframe of training data to bypass reading data from directory.
     processed_path : str
         The directory to read training data.
+    data_format : str
+        The format of training data, one of csv, parquet or feather.
+    columns : list
+        The feature columns to read along with labels, all columns are read if not
+        provided.
+    float_dtype : str
+        The dtype of numeric columns, float64 or float32.
+    feature_path : str
+        The directory of feature store to open train data as memory-mapped arrays
+        instead of reading processed_path.
+    index : object
+        The numpy array of row positions of training data in df (for e.g - returned by
+        save_split_data with return_indices), rows are gathered in a single copy
+        leaving out income categories.
 
     Returns
     -------
@@ -55,15 +182,37 @@ def load_training_data(df=None, processed_path=None):
 
     """
     logger.debug("Reading training data")
+    if feature_path:
+        features, labels = read_feature_store(feature_path, "train")
+        if columns:
+            features = drop_columns(
+                features,
+                [column for column in features.columns if column not in columns],
+            )
+        log_memory_usage(features, "train")
+        return features, labels
     if processed_path:
-        strat_train_set = pd.read_csv(filepath_or_buffer=f"{processed_path}/train.csv")
+        if columns:
+            columns = list(columns) + ["median_house_value"]
+        strat_train_set = read_dataset(
+            processed_path,
+            "train",
+            data_format=data_format,
+            columns=columns,
+            float_dtype=float_dtype,
+        )
         logger.info(f"Read trained data from : {processed_path}")
+    elif index is not None:
+        strat_train_set = apply_schema(
+            take_rows(df, index, exclude=["income_cat"]), float_dtype
+        )
     else:
-        strat_train_set = df
-    features = strat_train_set.drop(
-        "median_house_value", axis=1
-    )  # drop labels for training set
-    labels = strat_train_set["median_house_value"].copy()
+        strat_train_set = apply_schema(df, float_dtype)
+    log_memory_usage(strat_train_set, "train")
+    labels = strat_train_set["median_house_value"]
+    features = drop_columns(
+        strat_train_set, ["median_house_value"]
+    )  # drop labels for training set without copying features
     return features, labels
 
 
@@ -87,7 +236,7 @@ def original_feature_engineering(df, pickle_path=None, imputer_file=None):
         The pandas dataframe of features after imputation and feature engineering.
 
     """
-    df_num = df.drop("ocean_proximity", axis=1)
+    df_num = drop_columns(df, ["ocean_proximity"])
     logger.debug("Training imputer")
     imputer = SimpleImputer(strategy="median")
     imputer.fit(df_num)
@@ -104,12 +253,249 @@ def original_feature_engineering(df, pickle_path=None, imputer_file=None):
     df_tr["rooms_per_household"] = df_tr["total_rooms"] / df_tr["households"]
     df_tr["bedrooms_per_room"] = df_tr["total_bedrooms"] / df_tr["total_rooms"]
     df_tr["population_per_household"] = df_tr["population"] / df_tr["households"]
-    df_cat = df[["ocean_proximity"]]
-    df_prepared = df_tr.join(pd.get_dummies(df_cat, drop_first=True))
+    dummies = pd.get_dummies(df[["ocean_proximity"]], drop_first=True)
+    for column in dummies.columns:
+        df_tr[column] = dummies[column]
+    df_prepared = df_tr
     return imputer, df_prepared
 
 
-def rf_regressor_model_training(df_prepared, labels, pickle_path=None, model_file=None):
+def search_cv(
+    estimator,
+    param_grid=None,
+    strategy="grid",
+    prefix="",
+    n_iter=10,
+    resource="n_samples",
+    factor=3,
+    n_jobs=None,
+    warm_start=False,
+    results_path=None,
+    distributed=None,
+    n_estimators="n_estimators",
+    final="refit",
+    profile=False,
+):
+    """Function to build the cross-validated search of random forest parameters.
+
+    Parameters
+    ----------
+    estimator : object
+        The random forest, or a pipeline ending with it.
+    param_grid : list
+        The search space of random forest parameters without prefix, for e.g -
+        DEFAULT_PARAM_GRID which is used if not provided.
+    strategy : str
+        The search strategy, grid for every candidate, random for n_iter sampled
+        candidates or halving for successive halving of candidates.
+    prefix : str
+        The prefix of random forest parameters in estimator (for e.g - rf__).
+    n_iter : int
+        The number of candidates sampled by random strategy.
+    resource : str
+        The resource of halving strategy, n_samples to train early rounds on a
+        subsample of rows or n_estimators to train them with fewer trees.
+    factor : int
+        The proportion of candidates kept in each round of halving strategy.
+    n_jobs : int
+        The number of candidate fits run in parallel.
+    warm_start : bool
+        Whether grid strategy grows one forest per fold for candidates that differ
+        only in n_estimators with ForestSearchCV, which gives the same cv_results_
+        scores and best_params_ as GridSearchCV.
+    results_path : str
+        The directory of a ResultsStore keeping the score of each candidate on each
+        fold, so that grid or random strategy rerun on the same data fits only new
+        candidates, no store is used if not provided. Halving strategy does not
+        use it as the rows of its rounds depend on the candidates kept.
+    distributed : dictionary
+        The address, authkey, local_workers, shared_path and task_timeout of
+        DistributedSearchCV to spread the fits of grid or random strategy over worker
+        processes, the search runs on this host if not provided.
+    n_estimators : str
+        The name of the number of trees parameter of model without prefix, used as
+        n_estimators resource of halving strategy (for e.g - max_iter of boosting).
+    final : str
+        The final model strategy, refit to fit the best candidate on all rows in
+        search, background to leave the refit to the caller or fold_ensemble to keep
+        the models of the best candidate on each fold as fold_estimators_, which
+        grid and random strategies support.
+    profile : bool
+        Whether grid and random strategies measure the wall time, cpu time, peak
+        resident memory, its growth and model size of each candidate on each fold as
+        profiles_ of ForestSearchCV, halving strategy keeps its cv_results_ times
+        only. The peak of the process is read, never reset.
+
+    Returns
+    -------
+    search : object
+        The unfitted sklearn.model_selection search object.
+
+    """
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unsupported search strategy : {strategy}")
+    if resource not in HALVING_RESOURCES:
+        raise ValueError(f"Unsupported halving resource : {resource}")
+    param_grid = [
+        {f"{prefix}{name}": values for name, values in grid.items()}
+        for grid in (param_grid or DEFAULT_PARAM_GRID)
+    ]
+    if final not in FINAL_STRATEGIES:
+        raise ValueError(f"Unsupported final strategy : {final}")
+    kwargs = dict(
+        cv=5, scoring="neg_mean_squared_error", n_jobs=n_jobs, refit=final == "refit"
+    )
+    if distributed and strategy == "halving":
+        raise ValueError("Distributed search supports grid and random strategies")
+    if final == "fold_ensemble" and strategy == "halving":
+        raise ValueError("Fold ensemble supports grid and random strategies")
+    if final == "fold_ensemble":
+        kwargs.update(keep_fold_estimators=True)
+    if profile and strategy != "halving":
+        kwargs.update(profile=True)
+    if distributed:
+        return DistributedSearchCV(
+            estimator,
+            param_grid,
+            n_iter=n_iter if strategy == "random" else None,
+            random_state=42,
+            return_train_score=True,
+            n_estimators_param=f"{prefix}{n_estimators}",
+            warm_start=warm_start,
+            results_path=results_path,
+            **distributed,
+            **kwargs,
+        )
+    forest_search = results_path or final == "fold_ensemble" or profile
+    if strategy == "random" and forest_search:
+        return ForestSearchCV(
+            estimator,
+            param_grid,
+            n_iter=n_iter,
+            random_state=42,
+            return_train_score=True,
+            n_estimators_param=f"{prefix}{n_estimators}",
+            warm_start=warm_start,
+            results_path=results_path,
+            **kwargs,
+        )
+    if strategy == "random":
+        return RandomizedSearchCV(
+            estimator,
+            param_grid,
+            n_iter=n_iter,
+            random_state=42,
+            return_train_score=True,
+            **kwargs,
+        )
+    if strategy == "halving":
+        if resource == "n_estimators":
+            # the last round trains the largest number of trees of the grid
+            resource = f"{prefix}{n_estimators}"
+            resources = [
+                value for grid in param_grid for value in grid.pop(resource, [])
+            ] or [estimator.get_params()[resource]]
+            kwargs.update(min_resources="exhaust", max_resources=max(resources))
+        return HalvingGridSearchCV(
+            estimator,
+            param_grid,
+            factor=factor,
+            resource=resource,
+            random_state=42,
+            return_train_score=True,
+            **kwargs,
+        )
+    if warm_start or forest_search:
+        # grow 7 forests of up to 30 trees across 5 folds with DEFAULT_PARAM_GRID
+        return ForestSearchCV(
+            estimator,
+            param_grid,
+            return_train_score=True,
+            n_estimators_param=f"{prefix}{n_estimators}",
+            warm_start=warm_start,
+            results_path=results_path,
+            **kwargs,
+        )
+    # train across 5 folds, that's a total of (12+6)*5=90 rounds of training with
+    # DEFAULT_PARAM_GRID
+    return GridSearchCV(estimator, param_grid, return_train_score=True, **kwargs)
+
+
+def parallel_jobs(n_jobs=None, forest_jobs=None):
+    """Function to split cores between parallel candidate fits and parallel trees.
+
+    Parameters
+    ----------
+    n_jobs : int
+        The number of candidate fits run in parallel, -1 uses all cores.
+    forest_jobs : int
+        The number of trees of each random forest built in parallel.
+
+    Returns
+    -------
+    n_jobs : int
+        The number of candidate fits run in parallel, with -1 resolved to the number
+        of cores divided by forest_jobs so that both levels together use all cores.
+    forest_jobs : int
+        The number of trees of each random forest built in parallel.
+
+    """
+    if n_jobs == -1 and forest_jobs and forest_jobs > 1:
+        n_jobs = max(1, effective_n_jobs(-1) // forest_jobs)
+    return n_jobs, forest_jobs
+
+
+def model_engine(engine="forest", forest_jobs=None):
+    """Function to build the model of an engine with its default search space.
+
+    Parameters
+    ----------
+    engine : str
+        The model engine, forest for RandomForestRegressor or boosting for
+        HistGradientBoostingRegressor on binned features with early stopping.
+    forest_jobs : int
+        The number of trees of each random forest built in parallel.
+
+    Returns
+    -------
+    name : str
+        The name of model step in pipeline (for e.g - rf).
+    model : object
+        The unfitted sklearn regressor.
+    param_grid : list
+        The default search space of model parameters without prefix.
+    n_estimators : str
+        The name of the number of trees parameter of model.
+
+    """
+    if engine not in MODEL_ENGINES:
+        raise ValueError(f"Unsupported model engine : {engine}")
+    if engine == "boosting":
+        model = HistGradientBoostingRegressor(
+            max_iter=500, early_stopping=True, random_state=42
+        )
+        return "hgb", model, DEFAULT_BOOSTING_PARAM_GRID, "max_iter"
+    model = RandomForestRegressor(random_state=42, n_jobs=forest_jobs)
+    return "rf", model, DEFAULT_PARAM_GRID, "n_estimators"
+
+
+def rf_regressor_model_training(
+    df_prepared,
+    labels,
+    pickle_path=None,
+    model_file=None,
+    n_jobs=None,
+    backend=None,
+    forest_jobs=None,
+    strategy="grid",
+    param_grid=None,
+    n_iter=10,
+    resource="n_samples",
+    factor=3,
+    warm_start=False,
+    results_path=None,
+    distributed=None,
+):
     """Function to train model using Random Forest Regressor.
 
     Parameters
@@ -122,6 +508,36 @@ def rf_regressor_model_training(df_prepared, labels, pickle_path=None, model_fil
         The directory to store model pickle file.
     model_file : str
         The name of model file (for e.g - something.pkl).
+    n_jobs : int
+        The number of candidate fits run in parallel, -1 uses all cores shared with
+        forest_jobs.
+    backend : str
+        The joblib backend of parallel fits, one of loky, threading or
+        multiprocessing, joblib default if not provided.
+    forest_jobs : int
+        The number of trees of each random forest built in parallel.
+    strategy : str
+        The search strategy, grid for every candidate, random for n_iter sampled
+        candidates or halving for successive halving of candidates.
+    param_grid : list
+        The search space of random forest parameters without prefix, for e.g -
+        DEFAULT_PARAM_GRID which is used if not provided.
+    n_iter : int
+        The number of candidates sampled by random strategy.
+    resource : str
+        The resource of halving strategy, n_samples or n_estimators.
+    factor : int
+        The proportion of candidates kept in each round of halving strategy.
+    warm_start : bool
+        Whether grid strategy grows one forest per fold for candidates that differ
+        only in n_estimators, giving the same results with fewer trees built.
+    results_path : str
+        The directory to store the score of each candidate on each fold, so that a
+        rerun search fits only new candidates, no store is used if not provided.
+    distributed : dictionary
+        The address, authkey, local_workers, shared_path and task_timeout of a
+        distributed search of grid or random strategy, the search runs on this host if
+        not provided.
 
     Returns
     -------
@@ -131,22 +547,22 @@ def rf_regressor_model_training(df_prepared, labels, pickle_path=None, model_fil
         parameters of selected model
     """
     logger.debug("Training model")
-    param_grid = [
-        # try 12 (3×4) combinations of hyperparameters
-        {"n_estimators": [3, 10, 30], "max_features": [2, 4, 6, 8]},
-        # then try 6 (2×3) combinations with bootstrap set as False
-        {"bootstrap": [False], "n_estimators": [3, 10], "max_features": [2, 3, 4]},
-    ]
-    forest_reg = RandomForestRegressor(random_state=42)
-    # train across 5 folds, that's a total of (12+6)*5=90 rounds of training
-    grid_search = GridSearchCV(
+    n_jobs, forest_jobs = parallel_jobs(n_jobs, forest_jobs)
+    forest_reg = RandomForestRegressor(random_state=42, n_jobs=forest_jobs)
+    grid_search = search_cv(
         forest_reg,
         param_grid,
-        cv=5,
-        scoring="neg_mean_squared_error",
-        return_train_score=True,
+        strategy=strategy,
+        n_iter=n_iter,
+        resource=resource,
+        factor=factor,
+        n_jobs=n_jobs,
+        warm_start=warm_start,
+        results_path=results_path,
+        distributed=distributed,
     )
-    grid_search.fit(df_prepared, labels)
+    with parallel_backend(backend) if backend else contextlib.nullcontext():
+        grid_search.fit(df_prepared, labels)
     best_param = grid_search.best_params_
     model = grid_search.best_estimator_
     if pickle_path and model_file:
@@ -160,7 +576,203 @@ def rf_regressor_model_training(df_prepared, labels, pickle_path=None, model_fil
     return model, best_param
 
 
-def training_with_pipeline(df, labels, pickle_path=None, pipe_file=None):
+def reduce_cache(memory, cache_size):
+    """Function to evict least recently used entries of a joblib cache beyond a size.
+
+    Parameters
+    ----------
+    memory : object
+        The joblib.Memory object.
+    cache_size : int
+        The maximum size of cache in bytes.
+
+    Returns
+    -------
+    None
+
+    """
+    try:
+        memory.reduce_size(bytes_limit=cache_size)
+    except TypeError:  # joblib < 1.3 takes bytes_limit in Memory
+        memory.bytes_limit = cache_size
+        memory.reduce_size()
+    logger.debug(f"Reduced preprocessing cache at : {memory.location}")
+
+
+def engine_report(pipe, df, engine, search_time, refit_time=None, rows=10000):
+    """Function to measure the training and serving cost of a trained pipeline.
+
+    Parameters
+    ----------
+    pipe : object
+        The fitted sklearn.pipeline.Pipeline object.
+    df : object
+        The pandas dataframe of features to time predictions on.
+    engine : str
+        The model engine of pipeline.
+    search_time : float
+        The seconds taken by search, including refit if it is done in search.
+    refit_time : float
+        The seconds taken to refit the best candidate.
+    rows : int
+        The number of rows of df predicted to time predictions.
+
+    Returns
+    -------
+    report : dictionary
+        The engine, search and refit time, model size in bytes and the time to
+        predict predict_rows rows.
+
+    """
+    sample = df.iloc[:rows]
+    start = time.perf_counter()
+    pipe.predict(sample)
+    predict_time = time.perf_counter() - start
+    report = {
+        "engine": engine,
+        "search_time": search_time,
+        "refit_time": refit_time,
+        "model_size": pickled_size(pipe),
+        "predict_rows": len(sample),
+        "predict_time": predict_time,
+    }
+    logger.info(
+        f"Trained {engine} pipeline of {report['model_size']} bytes in "
+        f"{search_time:.2f} s, predicting {len(sample)} rows in {predict_time:.4f} s"
+    )
+    return report
+
+
+def write_engine_report(report, path):
+    """Function to add the report of an engine to a json file of engine reports.
+
+    Parameters
+    ----------
+    report : dictionary
+        The report of engine_report.
+    path : str
+        The json file keeping the latest report of each engine side by side.
+
+    Returns
+    -------
+    reports : dictionary
+        The reports of every engine keyed by engine.
+
+    """
+    reports = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            reports = json.load(file)
+    reports[report["engine"]] = report
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(reports, file, indent=2)
+    logger.info(f"Stored {report['engine']} engine report at : {path}")
+    return reports
+
+
+def profile_report(search):
+    """Function to collect the cost and score of each candidate on each fold of search.
+
+    Parameters
+    ----------
+    search : object
+        The fitted search, with profiles_ if it is a ForestSearchCV with profile.
+
+    Returns
+    -------
+    report : dictionary
+        The fits, with the candidate, fold, params, test score and mean fit time of
+        every candidate on every fold plus its wall time, cpu time, peak resident
+        memory, growth of that peak, model size in bytes and whether it ran concurrently with other fits
+        of its process, whose cpu time and peak memory it then includes, where
+        profiled, and the candidates, with the mean test score and total wall and cpu
+        time, highest peak resident memory and growth and mean model size of every candidate
+        over its folds.
+
+    """
+    results = search.cv_results_
+    profiles = {
+        (profile["candidate"], profile["fold"]): profile
+        for profile in getattr(search, "profiles_", [])
+    }
+    fits, candidates = [], []
+    for candidate, params in enumerate(results["params"]):
+        candidate_fits = []
+        for fold in range(search.n_splits_):
+            fit = {
+                "candidate": candidate,
+                "fold": fold,
+                "params": params,
+                "test_score": results[f"split{fold}_test_score"][candidate],
+                "mean_fit_time": results["mean_fit_time"][candidate],
+            }
+            fit.update(profiles.get((candidate, fold), {}))
+            candidate_fits.append(fit)
+        summary = {
+            "candidate": candidate,
+            "params": params,
+            "mean_test_score": results["mean_test_score"][candidate],
+        }
+        if all("wall_time" in fit for fit in candidate_fits):
+            summary.update(
+                wall_time=sum(fit["wall_time"] for fit in candidate_fits),
+                cpu_time=sum(fit["cpu_time"] for fit in candidate_fits),
+                peak_rss=max(fit["peak_rss"] for fit in candidate_fits),
+                rss_growth=max(fit["rss_growth"] for fit in candidate_fits),
+                model_size=np.mean([fit["model_size"] for fit in candidate_fits]),
+            )
+        fits.extend(candidate_fits)
+        candidates.append(summary)
+    return {"fits": fits, "candidates": candidates}
+
+
+def write_profile_report(report, path):
+    """Function to store the profile report of a search as a json file.
+
+    Parameters
+    ----------
+    report : dictionary
+        The report of profile_report.
+    path : str
+        The json file of report.
+
+    Returns
+    -------
+    None
+
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2, default=lambda value: value.item())
+    logger.info(f"Stored profile of {len(report['fits'])} fits at : {path}")
+
+
+def training_with_pipeline(
+    df,
+    labels,
+    pickle_path=None,
+    pipe_file=None,
+    preprocessor="column",
+    cache_path=None,
+    cache_size=None,
+    n_jobs=None,
+    backend=None,
+    forest_jobs=None,
+    strategy="grid",
+    param_grid=None,
+    n_iter=10,
+    resource="n_samples",
+    factor=3,
+    warm_start=False,
+    results_path=None,
+    distributed=None,
+    engine="forest",
+    report_path=None,
+    final="refit",
+    profile_path=None,
+    compact=None,
+):
     """Function to transform data and train model in one pipeline.
 
     Parameters
@@ -173,62 +785,215 @@ def training_with_pipeline(df, labels, pickle_path=None, pipe_file=None):
         The directory to store pipe pickle file.
     pipe_file : str
         The name of pipe file (for e.g - something.pkl).
+    preprocessor : str
+        The preprocessor of pipeline, column for a ColumnTransformer of SimpleImputer,
+        AdditionalAttributes and OneHotEncoder or fused for the equivalent
+        FusedPreprocessor.
+    cache_path : str
+        The directory to cache the fitted preprocessor and transformed data of each
+        fold, so that it is fitted once per fold instead of once per candidate, no
+        cache is used if not provided.
+    cache_size : int
+        The maximum size of preprocessing cache in bytes, least recently used
+        entries are evicted after search.
+    n_jobs : int
+        The number of candidate fits run in parallel, -1 uses all cores shared with
+        forest_jobs.
+    backend : str
+        The joblib backend of parallel fits, one of loky, threading or
+        multiprocessing, joblib default if not provided.
+    forest_jobs : int
+        The number of trees of each random forest built in parallel.
+    strategy : str
+        The search strategy, grid for every candidate, random for n_iter sampled
+        candidates or halving for successive halving of candidates.
+    param_grid : list
+        The search space of random forest parameters without prefix, for e.g -
+        DEFAULT_PARAM_GRID which is used if not provided.
+    n_iter : int
+        The number of candidates sampled by random strategy.
+    resource : str
+        The resource of halving strategy, n_samples or n_estimators.
+    factor : int
+        The proportion of candidates kept in each round of halving strategy.
+    warm_start : bool
+        Whether grid strategy grows one forest per fold for candidates that differ
+        only in n_estimators, giving the same results with fewer trees built.
+    results_path : str
+        The directory to store the score of each candidate on each fold, so that a
+        rerun search fits only new candidates, no store is used if not provided.
+    distributed : dictionary
+        The address, authkey, local_workers, shared_path and task_timeout of a
+        distributed search of grid or random strategy, the search runs on this host if
+        not provided.
+    engine : str
+        The model engine, forest for RandomForestRegressor or boosting for
+        HistGradientBoostingRegressor, with DEFAULT_PARAM_GRID or
+        DEFAULT_BOOSTING_PARAM_GRID as default search space. Boosting ignores
+        warm_start as its trees depend on the validation scores of early stopping.
+    report_path : str
+        The json file to store the search time, refit time, model size and predict
+        time of engine next to those of other engines, not stored if not provided.
+    final : str
+        The final model strategy, refit to fit the best candidate on all rows after
+        search, background to do that refit in a thread while the caller goes on or
+        fold_ensemble to save the models of the best candidate on each fold of
+        search as a FoldEnsembleRegressor without any refit.
+    profile_path : str
+        The json file to store the wall time, cpu time, peak resident memory and
+        model size of each candidate on each fold of search, not profiled if not
+        provided.
+    compact : str
+        The dtype of thresholds and leaf values, float64 or float32, to convert the
+        random forests of the final pipe to CompactForestRegressor before it is
+        reported and saved, not compacted if not provided. Compact pipes are smaller
+        and load faster but predict large batches slower and can not be refreshed.
 
     Returns
     -------
     pipe : object
-        The sklearn.pipeline.Pipeline object.
+        The sklearn.pipeline.Pipeline object, a concurrent.futures.Future of it for
+        background final strategy or a FoldEnsembleRegressor of fold pipelines.
     best_param : dictionary
         parameters of selected model which is integrated in pipeline
     """
     logger.debug("Training Pipeline")
 
-    numeric_features = [col for col in df.columns if col != "ocean_proximity"]
-    numeric_transformer = Pipeline(
-        [
-            ("imputer", SimpleImputer(strategy="median")),
-            ("new_attributes", AdditionalAttributes()),
-        ]
-    )
-    categorical_features = ["ocean_proximity"]
-    categorical_transformer = OneHotEncoder(handle_unknown="ignore")
+    if preprocessor not in PREPROCESSORS:
+        raise ValueError(f"Unsupported preprocessor : {preprocessor}")
+    if preprocessor == "fused":
+        preprocessor = FusedPreprocessor()
+    else:
+        numeric_features = [col for col in df.columns if col != "ocean_proximity"]
+        numeric_transformer = Pipeline(
+            [
+                ("imputer", SimpleImputer(strategy="median")),
+                ("new_attributes", AdditionalAttributes(columns=numeric_features)),
+            ]
+        )
+        categorical_features = ["ocean_proximity"]
+        categorical_transformer = OneHotEncoder(handle_unknown="ignore")
 
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("num", numeric_transformer, numeric_features),
-            ("cat", categorical_transformer, categorical_features),
-        ]
-    )
+        preprocessor = ColumnTransformer(
+            transformers=[
+                ("num", numeric_transformer, numeric_features),
+                ("cat", categorical_transformer, categorical_features),
+            ]
+        )
 
+    n_jobs, forest_jobs = parallel_jobs(n_jobs, forest_jobs)
+    memory = Memory(location=cache_path, verbose=0) if cache_path else None
+    name, model, default_param_grid, n_estimators = model_engine(engine, forest_jobs)
     pipeline = Pipeline(
-        steps=[
-            ("preprocessor", preprocessor),
-            ("rf", RandomForestRegressor(random_state=42)),
-        ]
+        steps=[("preprocessor", preprocessor), (name, model)],
+        memory=memory,
     )
 
-    param_grid = [
-        # try 12 (3×4) combinations of hyperparameters
-        {"rf__n_estimators": [3, 10, 30], "rf__max_features": [2, 4, 6, 8]},
-        # then try 6 (2×3) combinations with bootstrap set as False
-        {
-            "rf__bootstrap": [False],
-            "rf__n_estimators": [3, 10],
-            "rf__max_features": [2, 3, 4],
-        },
-    ]
-
-    # train across 5 folds, that's a total of (12+6)*5=90 rounds of training
-    grid_search = GridSearchCV(
+    grid_search = search_cv(
         pipeline,
-        param_grid,
-        cv=5,
-        scoring="neg_mean_squared_error",
-        return_train_score=True,
+        param_grid or default_param_grid,
+        strategy=strategy,
+        prefix=f"{name}__",
+        n_iter=n_iter,
+        resource=resource,
+        factor=factor,
+        n_jobs=n_jobs,
+        warm_start=warm_start and engine == "forest",
+        results_path=results_path,
+        distributed=distributed,
+        n_estimators=n_estimators,
+        final=final,
+        profile=bool(profile_path),
     )
-    grid_search.fit(df, labels)
+    start = time.perf_counter()
+    with parallel_backend(backend) if backend else contextlib.nullcontext():
+        grid_search.fit(df, labels)
+    search_time = time.perf_counter() - start
     best_param = grid_search.best_params_
-    pipe = grid_search.best_estimator_
+    if profile_path:
+        write_profile_report(profile_report(grid_search), profile_path)
+    if memory and cache_size:
+        reduce_cache(memory, cache_size)
+    save_kwargs = dict(
+        pickle_path=pickle_path,
+        pipe_file=pipe_file,
+        engine=engine,
+        search_time=search_time,
+        report_path=report_path,
+        compact=compact,
+    )
+    if final == "background":
+        # the refit runs in a thread while the caller goes on to its next stage
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        pipe = executor.submit(
+            refit_pipeline, pipeline, best_param, df, labels, **save_kwargs
+        )
+        executor.shutdown(wait=False)
+    elif final == "fold_ensemble":
+        pipe = FoldEnsembleRegressor(
+            [
+                estimator.set_params(memory=None)
+                for estimator in grid_search.fold_estimators_
+            ]
+        )
+        pipe = save_pipeline(pipe, df, refit_time=0.0, **save_kwargs)
+    else:
+        pipe = grid_search.best_estimator_.set_params(memory=None)
+        pipe = save_pipeline(
+            pipe,
+            df,
+            refit_time=getattr(grid_search, "refit_time_", None),
+            **save_kwargs,
+        )
+    return pipe, best_param
+
+
+def save_pipeline(
+    pipe,
+    df=None,
+    pickle_path=None,
+    pipe_file=None,
+    engine="forest",
+    search_time=None,
+    refit_time=None,
+    report_path=None,
+    compact=None,
+):
+    """Function to report and save the final pipeline of training.
+
+    Parameters
+    ----------
+    pipe : object
+        The fitted pipeline or FoldEnsembleRegressor of pipelines.
+    df : object
+        The pandas dataframe of features to time predictions on for report.
+    pickle_path : str
+        The directory to store pipe pickle file.
+    pipe_file : str
+        The name of pipe file (for e.g - something.pkl).
+    engine : str
+        The model engine of pipeline.
+    search_time : float
+        The seconds taken by search.
+    refit_time : float
+        The seconds taken to fit the final pipeline after search.
+    report_path : str
+        The json file of engine reports, not stored if not provided.
+    compact : str
+        The dtype of thresholds and leaf values, float64 or float32, of compact
+        forests replacing random forests of pipe, not compacted if not provided.
+
+    Returns
+    -------
+    pipe : object
+        The saved pipe, compacted if compact is provided.
+    """
+    if compact:
+        pipe = compact_pipeline(pipe, compact)
+        logger.info(f"Compacted random forests of pipe to {compact}")
+    if report_path:
+        report = engine_report(pipe, df, engine, search_time, refit_time)
+        write_engine_report(report, report_path)
     if pickle_path and pipe_file:
         pickle.dump(pipe, open(f"{pickle_path}/{pipe_file}", "wb"))
         logger.info(f"Saved {pipe_file} at : {pickle_path}")
@@ -237,7 +1002,94 @@ def training_with_pipeline(df, labels, pickle_path=None, pipe_file=None):
         logger.info(f"Saved pipe pickle file at : {pickle_path}")
     else:
         pass
-    return pipe, best_param
+    return pipe
+
+
+def refit_pipeline(pipeline, best_param, df, labels, **save_kwargs):
+    """Function to fit the best candidate of search on all rows and save it.
+
+    Parameters
+    ----------
+    pipeline : object
+        The unfitted sklearn.pipeline.Pipeline object searched.
+    best_param : dictionary
+        The parameters of selected model.
+    df : object
+        The pandas dataframe of features.
+    labels : object
+        The pandas series of labels.
+    save_kwargs : dictionary
+        The keyword arguments of save_pipeline.
+
+    Returns
+    -------
+    pipe : object
+        The fitted and saved sklearn.pipeline.Pipeline object.
+    """
+    start = time.perf_counter()
+    pipe = clone(pipeline).set_params(memory=None, **best_param).fit(df, labels)
+    refit_time = time.perf_counter() - start
+    logger.info(f"Refitted best candidate in {refit_time:.2f} s")
+    return save_pipeline(pipe, df, refit_time=refit_time, **save_kwargs)
+
+
+def refresh_pipeline(df, labels, pickle_path, pipe_file=None, n_estimators=None):
+    """Function to update a trained pipeline with new rows without searching again.
+
+    Trees fitted on the new rows only are added to the random forest with warm_start,
+    keeping the trees and hyperparameters of the trained pipeline. The running
+    aggregates of the fused preprocessor take in the new rows, but its imputer medians
+    stay those the existing trees were fitted with, so that their predictions do not
+    drift, until the pipeline is trained again.
+
+    Parameters
+    ----------
+    df : object
+        The pandas dataframe of features of new rows only.
+    labels : object
+        The pandas series of labels of new rows.
+    pickle_path : str
+        The directory of pipe pickle file, which is updated in place.
+    pipe_file : str
+        The name of pipe file (for e.g - something.pkl), pipe.pkl if not provided.
+    n_estimators : int
+        The number of trees to add, if not provided trees are added in proportion
+        of new rows to rows seen before, at least one.
+
+    Returns
+    -------
+    pipe : object
+        The updated sklearn.pipeline.Pipeline object.
+    n_estimators : int
+        The number of trees added.
+    """
+    logger.debug("Refreshing Pipeline")
+    pipe_file = pipe_file or "pipe.pkl"
+    pipe = pickle.load(open(f"{pickle_path}/{pipe_file}", "rb"))
+    if not isinstance(pipe, Pipeline):
+        raise ValueError("Only pipelines refitted on all rows can be refreshed")
+    preprocessor, forest = pipe.steps[0][1], pipe.steps[-1][1]
+    if not isinstance(forest, RandomForestRegressor):
+        raise ValueError(
+            "Only pipelines of forest engine, not compacted, can be refreshed"
+        )
+    if not hasattr(preprocessor, "partial_fit"):
+        raise ValueError("Only pipelines of fused preprocessor can be refreshed")
+    if not n_estimators:
+        share = len(df) / preprocessor.n_samples_seen_
+        n_estimators = max(1, round(forest.n_estimators * share))
+    statistics = preprocessor.statistics_.copy()
+    preprocessor.partial_fit(df)
+    preprocessor.statistics_ = statistics
+    forest.set_params(warm_start=True, n_estimators=forest.n_estimators + n_estimators)
+    forest.fit(preprocessor.transform(df), labels)
+    forest.set_params(warm_start=False)
+    pickle.dump(pipe, open(f"{pickle_path}/{pipe_file}", "wb"))
+    logger.info(
+        f"Added {n_estimators} trees for {len(df)} new rows, saved {pipe_file} at : "
+        f"{pickle_path}"
+    )
+    return pipe, n_estimators
 
 
 if __name__ == "__main__":
@@ -257,6 +1109,187 @@ if __name__ == "__main__":
         type=str,
         help="directory to save pickle files, default val in setup.cfg: artifacts",
     )
+    parser.add_argument(
+        "--data-format",
+        dest="FORMAT",
+        type=str,
+        choices=DATA_FORMATS,
+        help="format of processed data, default val in setup.cfg: csv",
+    )
+    parser.add_argument(
+        "--feature-store",
+        dest="FEATURE",
+        type=str,
+        help="directory of feature store to open train data from, default val in \
+        setup.cfg: data/features if feature_store is True",
+    )
+    parser.add_argument(
+        "--preprocessor",
+        dest="PREPROCESSOR",
+        type=str,
+        choices=PREPROCESSORS,
+        help="preprocessor of pipeline, default val in setup.cfg: column",
+    )
+    parser.add_argument(
+        "--engine",
+        dest="ENGINE",
+        type=str,
+        choices=MODEL_ENGINES,
+        help="model engine of pipeline, default val in setup.cfg: forest",
+    )
+    parser.add_argument(
+        "--engine-report",
+        dest="REPORT",
+        type=str,
+        help="json file to compare train time, model size and predict time of \
+        engines, default val in setup.cfg: artifacts/engine_report.json",
+    )
+    parser.add_argument(
+        "--pipeline-cache",
+        dest="PIPECACHE",
+        type=str,
+        help="directory to cache preprocessing across candidates of search, default \
+        val in setup.cfg: data/pipeline_cache",
+    )
+    parser.add_argument(
+        "--no-pipeline-cache",
+        dest="NOPIPECACHE",
+        action="store_true",
+        help="refit preprocessing for every candidate of search",
+    )
+    parser.add_argument(
+        "--n-jobs",
+        dest="JOBS",
+        type=int,
+        help="number of candidate fits run in parallel, -1 for all cores, default val \
+        in setup.cfg: 1",
+    )
+    parser.add_argument(
+        "--backend",
+        dest="BACKEND",
+        type=str,
+        choices=BACKENDS,
+        help="joblib backend of parallel fits, default val in setup.cfg: loky",
+    )
+    parser.add_argument(
+        "--forest-jobs",
+        dest="FORESTJOBS",
+        type=int,
+        help="number of trees of each random forest built in parallel, default val in \
+        setup.cfg: 1",
+    )
+    parser.add_argument(
+        "--search-strategy",
+        dest="STRATEGY",
+        type=str,
+        choices=SEARCH_STRATEGIES,
+        help="strategy of hyperparameter search, default val in setup.cfg: grid",
+    )
+    parser.add_argument(
+        "--n-iter",
+        dest="ITER",
+        type=int,
+        help="number of candidates sampled by random search, default val in \
+        setup.cfg: 10",
+    )
+    parser.add_argument(
+        "--halving-resource",
+        dest="RESOURCE",
+        type=str,
+        choices=HALVING_RESOURCES,
+        help="resource of halving search, default val in setup.cfg: n_samples",
+    )
+    parser.add_argument(
+        "--warm-start",
+        dest="WARMSTART",
+        action="store_true",
+        help="grow one forest per fold across n_estimators instead of fitting every \
+        candidate of grid search from scratch, default val in setup.cfg: False",
+    )
+    parser.add_argument(
+        "--results-data",
+        dest="RESULTS",
+        type=str,
+        help="directory to store the score of each candidate on each fold of search \
+        and resume from, default val in setup.cfg: empty, no results are stored",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="RESUME",
+        action="store_true",
+        help="reuse and store search results in data/search_results if no results \
+        directory is provided",
+    )
+    parser.add_argument(
+        "--distributed",
+        dest="DISTRIBUTED",
+        action="store_true",
+        help="hand the fits of search to worker processes of a coordinator, default \
+        val in setup.cfg: False",
+    )
+    parser.add_argument(
+        "--address",
+        dest="ADDRESS",
+        type=str,
+        help="host:port of search coordinator, default val in setup.cfg: \
+        localhost:50000",
+    )
+    parser.add_argument(
+        "--local-workers",
+        dest="WORKERS",
+        type=int,
+        help="number of worker processes started on this host by distributed search, \
+        default val in setup.cfg: 2",
+    )
+    parser.add_argument(
+        "--final-strategy",
+        dest="FINAL",
+        type=str,
+        choices=FINAL_STRATEGIES,
+        help="how the saved pipe is built after search, background refits in place \
+        as nothing follows training in this script, default val in setup.cfg: refit",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="PROFILE",
+        action="store_true",
+        help="profile every fit of search, default val in setup.cfg: False",
+    )
+    parser.add_argument(
+        "--profile-report",
+        dest="PROFILEREPORT",
+        type=str,
+        help="json file to store the profile of every fit of search, default val in \
+        setup.cfg: artifacts/profile_report.json",
+    )
+    parser.add_argument(
+        "--compact",
+        dest="COMPACT",
+        type=str,
+        choices=COMPACT_DTYPES,
+        help="dtype of thresholds and leaf values of compact forest saved in pipe, \
+        smaller and faster to load but slower to predict large batches, default val \
+        in setup.cfg: float32 if compact is True",
+    )
+    parser.add_argument(
+        "--no-compact",
+        dest="NOCOMPACT",
+        action="store_true",
+        help="save random forests of pipe as they are",
+    )
+    parser.add_argument(
+        "--refresh-data",
+        dest="REFRESH",
+        type=str,
+        help="directory of new rows to add trees for to the trained pipe instead of \
+        training it again, keeping its imputer medians",
+    )
+    parser.add_argument(
+        "--refresh-trees",
+        dest="TREES",
+        type=int,
+        help="number of trees added by refresh, default val: in proportion of new rows",
+    )
     parser.add_argument(
         "--log-level",
         dest="LEVEL",
@@ -304,6 +1337,18 @@ if __name__ == "__main__":
     else:
         PROCESSED_DATA = str(config["Default"]["processed_data"])
 
+    if args.FORMAT:
+        DATA_FORMAT = args.FORMAT
+    else:
+        DATA_FORMAT = str(config["Default"]["data_format"])
+
+    if args.FEATURE:
+        FEATURE_DATA = args.FEATURE
+    elif config.getboolean("Default", "feature_store"):
+        FEATURE_DATA = str(config["Default"]["feature_data"])
+    else:
+        FEATURE_DATA = None
+
     if args.PICKLE:
         PICKLE_DATA = args.PICKLE
     else:
@@ -315,19 +1360,167 @@ if __name__ == "__main__":
 
     PIPE_FILE = str(config["Default"]["pipe_file"])
 
-    housing, housing_labels = load_training_data(processed_path=PROCESSED_DATA)
+    if args.NOPIPECACHE:
+        PIPELINE_CACHE = None
+    elif args.PIPECACHE:
+        PIPELINE_CACHE = args.PIPECACHE
+    else:
+        PIPELINE_CACHE = str(config["Train"]["pipeline_cache"])
+    PIPELINE_CACHE_SIZE = int(
+        float(config["Train"]["pipeline_cache_size_mb"]) * 1024**2
+    )
 
-    # imputer, housing_prepared = original_feature_engineering(
-    #     df=housing, pickle_path=PICKLE_DATA, imputer_file=IMPUTER_FILE
-    # )
+    if args.JOBS is not None:
+        N_JOBS = args.JOBS
+    else:
+        N_JOBS = int(config["Train"]["n_jobs"])
 
-    # model, best_param = rf_regressor_model_training(
-    #     df_prepared=housing_prepared,
-    #     labels=housing_labels,
-    #     pickle_path=PICKLE_DATA,
-    #     model_file=MODEL_FILE,
-    # )
+    if args.BACKEND:
+        BACKEND = args.BACKEND
+    else:
+        BACKEND = str(config["Train"]["backend"])
 
-    pipe, best_param = training_with_pipeline(
-        df=housing, labels=housing_labels, pickle_path=PICKLE_DATA, pipe_file=PIPE_FILE,
-    )
+    if args.FORESTJOBS is not None:
+        FOREST_JOBS = args.FORESTJOBS
+    else:
+        FOREST_JOBS = int(config["Train"]["forest_jobs"])
+
+    if args.STRATEGY:
+        SEARCH_STRATEGY = args.STRATEGY
+    else:
+        SEARCH_STRATEGY = str(config["Search"]["strategy"])
+
+    if args.ITER is not None:
+        N_ITER = args.ITER
+    else:
+        N_ITER = int(config["Search"]["n_iter"])
+
+    if args.RESOURCE:
+        HALVING_RESOURCE = args.RESOURCE
+    else:
+        HALVING_RESOURCE = str(config["Search"]["halving_resource"])
+
+    if args.ENGINE:
+        ENGINE = args.ENGINE
+    else:
+        ENGINE = str(config["Train"]["engine"])
+
+    if args.REPORT:
+        ENGINE_REPORT = args.REPORT
+    else:
+        ENGINE_REPORT = str(config["Train"]["engine_report"])
+
+    if args.FINAL:
+        FINAL_STRATEGY = args.FINAL
+    else:
+        FINAL_STRATEGY = str(config["Train"]["final_strategy"])
+
+    if FINAL_STRATEGY == "background":
+        # training is the last stage of this script, nothing would overlap the refit
+        logger.info("Refitting in place as no later stage overlaps background refit")
+        FINAL_STRATEGY = "refit"
+
+    if args.PROFILE or config.getboolean("Train", "profile"):
+        PROFILE_REPORT = args.PROFILEREPORT or str(config["Train"]["profile_report"])
+    else:
+        PROFILE_REPORT = None
+
+    if args.NOCOMPACT:
+        COMPACT = None
+    elif args.COMPACT:
+        COMPACT = args.COMPACT
+    elif config.getboolean("Train", "compact"):
+        COMPACT = str(config["Train"]["compact_dtype"])
+    else:
+        COMPACT = None
+
+    if ENGINE == "boosting":
+        PARAM_GRID = json.loads(config["Search"]["boosting_param_grid"])
+    else:
+        PARAM_GRID = json.loads(config["Search"]["param_grid"])
+
+    if args.RESULTS:
+        RESULTS_DATA = args.RESULTS
+    elif config["Search"]["results_data"]:
+        RESULTS_DATA = str(config["Search"]["results_data"])
+    elif args.RESUME:
+        RESULTS_DATA = "data/search_results"
+    else:
+        RESULTS_DATA = None
+
+    if args.DISTRIBUTED or config.getboolean("Distributed", "distributed"):
+        DISTRIBUTED = {
+            "address": args.ADDRESS or str(config["Distributed"]["address"]),
+            "local_workers": (
+                args.WORKERS
+                if args.WORKERS is not None
+                else int(config["Distributed"]["local_workers"])
+            ),
+            "shared_path": str(config["Distributed"]["shared_data"]),
+            "task_timeout": float(config["Distributed"]["task_timeout"]),
+        }
+    else:
+        DISTRIBUTED = None
+
+    if args.PREPROCESSOR:
+        PREPROCESSOR = args.PREPROCESSOR
+    else:
+        PREPROCESSOR = str(config["Train"]["preprocessor"])
+
+    if args.REFRESH:
+        new_housing, new_labels = load_training_data(
+            processed_path=args.REFRESH,
+            data_format=DATA_FORMAT,
+            float_dtype=str(config["Data"]["float_dtype"]),
+        )
+        refresh_pipeline(
+            df=new_housing,
+            labels=new_labels,
+            pickle_path=PICKLE_DATA,
+            pipe_file=PIPE_FILE,
+            n_estimators=args.TREES,
+        )
+    else:
+        housing, housing_labels = load_training_data(
+            processed_path=PROCESSED_DATA,
+            data_format=DATA_FORMAT,
+            float_dtype=str(config["Data"]["float_dtype"]),
+            feature_path=FEATURE_DATA,
+        )
+
+        # imputer, housing_prepared = original_feature_engineering(
+        #     df=housing, pickle_path=PICKLE_DATA, imputer_file=IMPUTER_FILE
+        # )
+
+        # model, best_param = rf_regressor_model_training(
+        #     df_prepared=housing_prepared,
+        #     labels=housing_labels,
+        #     pickle_path=PICKLE_DATA,
+        #     model_file=MODEL_FILE,
+        # )
+
+        pipe, best_param = training_with_pipeline(
+            df=housing,
+            labels=housing_labels,
+            pickle_path=PICKLE_DATA,
+            pipe_file=PIPE_FILE,
+            preprocessor=PREPROCESSOR,
+            cache_path=PIPELINE_CACHE,
+            cache_size=PIPELINE_CACHE_SIZE,
+            n_jobs=N_JOBS,
+            backend=BACKEND,
+            forest_jobs=FOREST_JOBS,
+            strategy=SEARCH_STRATEGY,
+            param_grid=PARAM_GRID,
+            n_iter=N_ITER,
+            resource=HALVING_RESOURCE,
+            factor=int(config["Search"]["halving_factor"]),
+            warm_start=args.WARMSTART or config.getboolean("Search", "warm_start"),
+            results_path=RESULTS_DATA,
+            distributed=DISTRIBUTED,
+            engine=ENGINE,
+            report_path=ENGINE_REPORT,
+            final=FINAL_STRATEGY,
+            profile_path=PROFILE_REPORT,
+            compact=COMPACT,
+        )
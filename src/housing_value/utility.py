@@ -3,34 +3,344 @@ Notes
 -----
 This is a utility file consists of custom classes.
 """
-import configparser
+import pickle
+import resource
+import sys
+import time
+import tracemalloc
 
 import numpy as np
+import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
-config = configparser.ConfigParser()
-config.read("setup.cfg")
+from housing_value.dataset import NUMERIC_COLUMNS
+
+FEATURE_COLUMNS = [
+    column for column in NUMERIC_COLUMNS if column != "median_house_value"
+]
+
+# new columns as ratios of numerator and denominator columns, in output order
+RATIO_COLUMNS = [
+    ("rooms_per_household", "total_rooms", "households"),
+    ("population_per_household", "population", "households"),
+    ("bedrooms_per_room", "total_bedrooms", "total_rooms"),
+]
+
+
+def ratio_indices(columns):
+    """Function to resolve the positions of numerator and denominator of new columns.
+
+    Parameters
+    ----------
+    columns : list
+        The names of input columns in order.
+
+    Returns
+    -------
+    indices : list
+        The pair of positions of numerator and denominator of each new column.
+
+    """
+    columns = list(columns)
+    return [
+        (columns.index(numerator), columns.index(denominator))
+        for _, numerator, denominator in RATIO_COLUMNS
+    ]
+
+
+def histogram_median(edges, counts):
+    """Function to estimate the median of values from their histogram.
+
+    Parameters
+    ----------
+    edges : object
+        The numpy array of bin edges.
+    counts : object
+        The numpy array of number of values in each bin.
+
+    Returns
+    -------
+    median : float
+        The median interpolated within the bin holding the middle value, nan if the
+        histogram is empty.
+
+    """
+    cumulative = np.cumsum(counts)
+    if not len(cumulative) or cumulative[-1] == 0:
+        return np.nan
+    half = cumulative[-1] / 2
+    position = int(np.searchsorted(cumulative, half))
+    before = cumulative[position - 1] if position else 0
+    fraction = (half - before) / counts[position]
+    return edges[position] + fraction * (edges[position + 1] - edges[position])
 
 
 class AdditionalAttributes(BaseEstimator, TransformerMixin):
     """Class to transform dataframe by adding new columns to dataframe.
 
+    Positions of the columns in the ratios are resolved by name in fit, from the
+    columns of a dataframe, from columns or else from the housing feature order. The
+    input is copied once into an output array of the given dtype, float32 halves the
+    output and is used as is by RandomForestRegressor, and new columns are written
+    into it in place.
+
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, columns=None, dtype=None):
+        self.columns = columns
+        self.dtype = dtype
 
     def fit(self, X, y=None):
+        if hasattr(X, "columns"):
+            columns = X.columns
+        elif self.columns is not None:
+            columns = self.columns
+        else:
+            columns = FEATURE_COLUMNS
+        self.ratio_ix_ = ratio_indices(columns)
+        self.n_features_in_ = X.shape[1]
         return self
 
     def transform(self, X):
-        rooms_ix = int(config["Data"]["rooms_ix"])
-        bedrooms_ix = int(config["Data"]["bedrooms_ix"])
-        population_ix = int(config["Data"]["population_ix"])
-        households_ix = int(config["Data"]["households_ix"])
-        rooms_per_household = X[:, rooms_ix] / X[:, households_ix]
-        population_per_household = X[:, population_ix] / X[:, households_ix]
-        bedrooms_per_room = X[:, bedrooms_ix] / X[:, rooms_ix]
-        return np.c_[
-            X, rooms_per_household, population_per_household, bedrooms_per_room
+        X = np.asarray(X)
+        output = np.empty(
+            (X.shape[0], X.shape[1] + len(self.ratio_ix_)), dtype=self.dtype or X.dtype
+        )
+        output[:, : X.shape[1]] = X
+        for position, (numerator, denominator) in enumerate(self.ratio_ix_):
+            np.divide(
+                output[:, numerator],
+                output[:, denominator],
+                out=output[:, X.shape[1] + position],
+            )
+        return output
+
+    def __setstate__(self, state):
+        # pipelines pickled before indices were fitted use the housing feature order
+        state.setdefault("columns", None)
+        state.setdefault("dtype", None)
+        state.setdefault("ratio_ix_", ratio_indices(FEATURE_COLUMNS))
+        super().__setstate__(state)
+
+
+class FusedPreprocessor(BaseEstimator, TransformerMixin):
+    """Class to impute, add new columns and one-hot encode a dataframe in one pass.
+
+    The output matches the preprocessor of training_with_pipeline, a ColumnTransformer
+    of SimpleImputer(strategy="median") and AdditionalAttributes on numeric columns
+    followed by OneHotEncoder(handle_unknown="ignore") on the categorical column, but
+    every column is written straight into one preallocated array.
+    A histogram of each numeric column over n_bins quantile bins is kept as running
+    aggregate, so that partial_fit on new rows updates the medians without the rows
+    seen before, while categories stay those of fit.
+
+    """
+
+    def __init__(
+        self, categorical_column="ocean_proximity", dtype="float64", n_bins=256
+    ):
+        self.categorical_column = categorical_column
+        self.dtype = dtype
+        self.n_bins = n_bins
+
+    def fit(self, X, y=None):
+        self.numeric_columns_ = [
+            column for column in X.columns if column != self.categorical_column
         ]
+        self.statistics_ = np.array(
+            [np.nanmedian(X[column].to_numpy()) for column in self.numeric_columns_]
+        )
+        self.histograms_ = []
+        for column in self.numeric_columns_:
+            values = X[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values):
+                quantiles = np.linspace(0, 1, self.n_bins + 1)
+                edges = np.unique(np.quantile(values, quantiles))
+            else:
+                edges = np.zeros(1)
+            edges = np.append(edges, edges[-1]) if len(edges) < 2 else edges
+            self.histograms_.append((edges, np.histogram(values, edges)[0]))
+        self.n_samples_seen_ = len(X)
+        self.ratio_ix_ = ratio_indices(self.numeric_columns_)
+        values = X[self.categorical_column]
+        self.categories_ = sorted(values.dropna().unique())
+        self.encode_missing_ = bool(values.isna().any())
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def partial_fit(self, X, y=None):
+        if not hasattr(self, "histograms_"):
+            raise ValueError(
+                "FusedPreprocessor was fitted without running aggregates, fit it again"
+            )
+        for position, column in enumerate(self.numeric_columns_):
+            values = X[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            edges, counts = self.histograms_[position]
+            if len(values):
+                # widen the outer bins to values beyond those seen before
+                edges = edges.copy()
+                edges[0] = min(edges[0], values.min())
+                edges[-1] = max(edges[-1], values.max())
+                counts = counts + np.histogram(values, edges)[0]
+                self.histograms_[position] = (edges, counts)
+            median = histogram_median(edges, counts)
+            if not np.isnan(median):
+                self.statistics_[position] = median
+        self.n_samples_seen_ += len(X)
+        return self
+
+    def transform(self, X):
+        n_numeric = len(self.numeric_columns_)
+        n_categories = len(self.categories_) + self.encode_missing_
+        output = np.empty(
+            (len(X), n_numeric + len(self.ratio_ix_) + n_categories), dtype=self.dtype
+        )
+        for position, column in enumerate(self.numeric_columns_):
+            values = output[:, position]
+            values[...] = X[column].to_numpy()
+            np.copyto(values, self.statistics_[position], where=np.isnan(values))
+        for position, (numerator, denominator) in enumerate(self.ratio_ix_):
+            np.divide(
+                output[:, numerator],
+                output[:, denominator],
+                out=output[:, n_numeric + position],
+            )
+        values = X[self.categorical_column]
+        codes = pd.Categorical(values, categories=self.categories_).codes.astype(
+            np.intp
+        )
+        if self.encode_missing_:
+            # unseen categories stay all zeros as with handle_unknown="ignore"
+            codes[values.isna().to_numpy()] = len(self.categories_)
+        one_hot = output[:, n_numeric + len(self.ratio_ix_) :]
+        one_hot[...] = 0
+        rows = np.flatnonzero(codes >= 0)
+        one_hot[rows, codes[rows]] = 1
+        return output
+
+    def get_feature_names_out(self, input_features=None):
+        categories = list(self.categories_) + ([np.nan] if self.encode_missing_ else [])
+        return np.array(
+            self.numeric_columns_
+            + [column for column, _, _ in RATIO_COLUMNS]
+            + [f"{self.categorical_column}_{category}" for category in categories],
+            dtype=object,
+        )
+
+    def __setstate__(self, state):
+        # preprocessors pickled before running aggregates are refitted to refresh
+        state.setdefault("n_bins", 256)
+        super().__setstate__(state)
+
+
+class AllocationCounter:
+    """Class to count memory allocated by python objects and numpy arrays in a block.
+
+    Allocations are traced with tracemalloc, which numpy reports its array buffers to.
+    Memory mapped files are not allocations and are not counted. After the block,
+    allocated is the memory still held and peak the highest memory held, in bytes.
+
+    """
+
+    def __init__(self):
+        self.allocated = 0
+        self.peak = 0
+        self.started = False
+        self.baseline = 0
+
+    def __enter__(self):
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocated = current - self.baseline
+        self.peak = peak - self.baseline
+        if self.started:
+            tracemalloc.stop()
+
+
+def peak_rss():
+    """Function to read the peak resident memory of this process.
+
+    Returns
+    -------
+    peak : int
+        The peak resident memory in bytes.
+
+    """
+    try:
+        with open("/proc/self/status") as file:
+            peak = next(
+                int(line.split()[1]) * 1024
+                for line in file
+                if line.startswith("VmHWM:")
+            )
+        return peak
+    except (OSError, StopIteration):
+        # ru_maxrss is in kilobytes on linux and in bytes on macos
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ResourceProfiler:
+    """Class to measure wall time, cpu time and peak resident memory of a block.
+
+    cpu_time is the cpu time of every thread of the process, including the threads
+    of a random forest with n_jobs. peak_rss is the peak resident memory of the
+    process so far when the block ends, and rss_growth how much the block raised it,
+    which is 0 for a block that stays below an earlier peak. The peak is only read,
+    never reset, so measures around the block are left alone. Both are process-wide,
+    so they include whatever other threads of the process run during the block.
+
+    """
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_rss = 0
+        self.rss_growth = 0
+        self.start = (0.0, 0.0, 0)
+
+    def __enter__(self):
+        self.start = (time.perf_counter(), time.process_time(), peak_rss())
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_time = time.perf_counter() - self.start[0]
+        self.cpu_time = time.process_time() - self.start[1]
+        self.peak_rss = peak_rss()
+        self.rss_growth = self.peak_rss - self.start[2]
+
+
+class _ByteCounter:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += memoryview(data).nbytes
+
+
+def pickled_size(obj):
+    """Function to measure the size of an object once pickled without holding it.
+
+    Parameters
+    ----------
+    obj : object
+        The object to pickle (for e.g - a fitted pipeline).
+
+    Returns
+    -------
+    size : int
+        The number of bytes of pickle file of obj.
+
+    """
+    counter = _ByteCounter()
+    pickle.dump(obj, counter, protocol=pickle.HIGHEST_PROTOCOL)
+    return counter.size
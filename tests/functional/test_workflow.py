@@ -13,7 +13,9 @@ config.read("setup.cfg")
 
 
 def random_data_constructor(housing_url, housing_path):
-    df = ingest_data.data_ingestion(housing_url, housing_path)
+    df = ingest_data.data_ingestion(
+        housing_url, housing_path, cache_path=str(config["Default"]["cache_data"])
+    )
     df = df.sample(frac=0.1, random_state=101, ignore_index=True)
     df = ingest_data.data_labeling(df)
     return df
@@ -0,0 +1,25 @@
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+
+from housing_value import generate_data, train
+from housing_value.utility import FusedPreprocessor
+
+
+@pytest.fixture
+def housing_data(request):
+    # features and labels of 500 generated rows, or of the number of rows given with
+    # @pytest.mark.parametrize("housing_data", [rows], indirect=True)
+    housing = generate_data.generate_housing_data(getattr(request, "param", 500))
+    return train.load_training_data(df=housing)
+
+
+@pytest.fixture
+def pipeline():
+    # unfitted pipeline of fused preprocessor and random forest shared by search tests
+    return Pipeline(
+        [
+            ("preprocessor", FusedPreprocessor()),
+            ("rf", RandomForestRegressor(random_state=42)),
+        ]
+    )
@@ -0,0 +1,81 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from housing_value import dataset
+
+
+@pytest.fixture
+def housing_sample():
+    return pd.DataFrame(
+        {
+            "median_income": [1.5, 3.2, 8.1],
+            "median_house_value": [100000.0, 200000.0, 450000.0],
+            "ocean_proximity": ["INLAND", "NEAR BAY", "INLAND"],
+        }
+    )
+
+
+@pytest.mark.parametrize("data_format", dataset.DATA_FORMATS)
+def test_dataset_round_trip(tmp_path, housing_sample, data_format):
+    dataset.write_dataset(housing_sample, tmp_path, "train", data_format=data_format)
+    df = dataset.read_dataset(tmp_path, "train", data_format=data_format)
+    assert df.astype({"ocean_proximity": object}).equals(housing_sample)
+
+
+def test_parquet_dictionary_encoding(tmp_path, housing_sample):
+    file_path = dataset.write_dataset(housing_sample, tmp_path, "train", "parquet")
+    field = pq.read_schema(file_path).field("ocean_proximity")
+    assert str(field.type).startswith("dictionary")
+
+
+def test_read_dataset_columns(tmp_path, housing_sample):
+    dataset.write_dataset(housing_sample, tmp_path, "train", data_format="feather")
+    df = dataset.read_dataset(tmp_path, "train", "feather", columns=["median_income"])
+    assert list(df.columns) == ["median_income"]
+
+
+def test_unsupported_data_format(tmp_path):
+    with pytest.raises(ValueError):
+        dataset.dataset_path(tmp_path, "train", data_format="xlsx")
+
+
+def test_apply_schema(housing_sample):
+    df = dataset.apply_schema(housing_sample, float_dtype="float32")
+    assert df["median_income"].dtype == "float32"
+    assert list(df["ocean_proximity"].cat.categories) == (
+        dataset.OCEAN_PROXIMITY_CATEGORIES
+    )
+
+
+def test_apply_schema_unknown_category(housing_sample, caplog):
+    housing_sample.loc[1, "ocean_proximity"] = "LAKE"
+    housing_sample.loc[2, "ocean_proximity"] = None
+    df = dataset.apply_schema(housing_sample)
+    assert df["ocean_proximity"].isna().tolist() == [False, True, True]
+    assert "in 1 rows : ['LAKE']" in caplog.text
+
+
+def test_read_dataset_schema(tmp_path, housing_sample):
+    housing_sample = housing_sample.sample(1000, replace=True, random_state=42)
+    dataset.write_dataset(housing_sample, tmp_path, "train")
+    df = dataset.read_dataset(tmp_path, "train", float_dtype="float32")
+    assert dataset.log_memory_usage(df, "test") < dataset.log_memory_usage(
+        housing_sample, "test"
+    )
+
+
+@pytest.mark.parametrize("data_format", dataset.DATA_FORMATS)
+def test_dataset_writer_chunks(tmp_path, housing_sample, data_format):
+    housing_sample = dataset.apply_schema(housing_sample)
+    with dataset.DatasetWriter(tmp_path, "train", data_format) as writer:
+        for _ in range(3):
+            writer.write(housing_sample)
+    chunks = list(
+        dataset.read_dataset_chunks(
+            tmp_path, "train", data_format, chunksize=2, float_dtype="float64"
+        )
+    )
+    assert writer.rows == 9 and pd.concat(chunks, ignore_index=True).equals(
+        pd.concat([housing_sample] * 3, ignore_index=True)
+    )
@@ -0,0 +1,103 @@
+import multiprocessing
+import queue
+import socket
+import threading
+import types
+
+import numpy as np
+import pytest
+
+from housing_value import distributed, search
+
+
+def test_parse_address():
+    assert distributed.parse_address("localhost:50000") == ("localhost", 50000)
+    assert distributed.parse_address(("localhost", 0)) == ("localhost", 0)
+
+
+def test_search_authkey(monkeypatch):
+    monkeypatch.delenv(distributed.AUTHKEY_ENV, raising=False)
+    assert distributed.search_authkey() is None
+    assert distributed.search_authkey("key") == b"key"
+    monkeypatch.setenv(distributed.AUTHKEY_ENV, "secret")
+    assert distributed.search_authkey() == b"secret"
+    assert distributed.search_authkey(b"key") == b"key"
+
+
+def test_collect_results_requeues_lost_tasks():
+    tasks, results = queue.Queue(), queue.Queue()
+    queued = [("job", 0, [0], 0), ("job", 1, [0], 1)]
+    host = socket.gethostname()
+    dead_worker = types.SimpleNamespace(pid=-1, is_alive=lambda: False)
+    results.put((0, (host, -1), distributed.TASK_STARTED))
+    results.put((1, (host, -2), "second"))
+    # another worker takes the task lost with the dead worker
+    thread = threading.Thread(
+        target=lambda: results.put((tasks.get()[1], (host, -3), "first"))
+    )
+    thread.start()
+    distributed_search = distributed.DistributedSearchCV(None, {}, task_timeout=5)
+    out = distributed_search._collect_results(tasks, results, queued, [dead_worker])
+    thread.join()
+    assert out == ["first", "second"]
+    distributed_search.task_timeout = 0.5
+    with pytest.raises(RuntimeError, match="No search worker took a task"):
+        distributed_search._collect_results(tasks, results, queued, [])
+
+
+@pytest.mark.parametrize("housing_data", [300], indirect=True)
+def test_distributed_search_cv(tmp_path, housing_data, pipeline):
+    features, labels = housing_data
+    param_grid = {"rf__n_estimators": [3, 10], "rf__max_features": [2, 4]}
+    kwargs = dict(
+        scoring="neg_mean_squared_error", n_estimators_param="rf__n_estimators"
+    )
+    forest_search = search.ForestSearchCV(pipeline, param_grid, **kwargs)
+    forest_search.fit(features, labels)
+    distributed_search = distributed.DistributedSearchCV(
+        pipeline, param_grid, local_workers=2, shared_path=str(tmp_path), **kwargs
+    )
+    distributed_search.fit(features, labels)
+    for key, values in forest_search.cv_results_.items():
+        if key.endswith("_score"):
+            assert np.array_equal(distributed_search.cv_results_[key], values)
+    assert distributed_search.best_params_ == forest_search.best_params_
+    assert np.array_equal(
+        distributed_search.predict(features), forest_search.predict(features)
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("housing_data", [300], indirect=True)
+def test_distributed_search_cv_remote_workers(housing_data, pipeline):
+    features, labels = housing_data
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        address = f"localhost:{sock.getsockname()[1]}"
+    remote_workers = [
+        multiprocessing.Process(
+            target=distributed.serve_searches,
+            args=(address, b"remote"),
+            kwargs=dict(wait=0.1, n_searches=1),
+        )
+        for _ in range(3)
+    ]
+    for worker in remote_workers:
+        worker.start()
+    distributed_search = distributed.DistributedSearchCV(
+        pipeline,
+        {"rf__n_estimators": [3, 10], "rf__max_features": [2, 4, 6]},
+        scoring="neg_mean_squared_error",
+        n_estimators_param="rf__n_estimators",
+        address=address,
+        authkey=b"remote",
+        local_workers=1,
+    )
+    try:
+        distributed_search.fit(features, labels)
+    finally:
+        for worker in remote_workers:
+            worker.join(timeout=30)
+            worker.terminate()
+    assert [worker.exitcode for worker in remote_workers] == [0, 0, 0]
+    assert len(distributed_search.cv_results_["params"]) == 6
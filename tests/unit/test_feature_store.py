@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from housing_value import dataset, feature_store, train
+
+
+def test_feature_store_round_trip(tmp_path):
+    df = pd.DataFrame(
+        {
+            "total_bedrooms": [1.0, np.nan, 3.0],
+            "median_income": [1.5, 3.2, 8.1],
+            "ocean_proximity": ["INLAND", "NEAR BAY", "INLAND"],
+            "median_house_value": [100000.0, 200000.0, 450000.0],
+        }
+    )
+    dataset.write_dataset(df, tmp_path, "train")
+    dataset.write_dataset(df, tmp_path, "test")
+    feature_store.build_feature_store(tmp_path, tmp_path / "features")
+    features, labels = train.load_training_data(feature_path=tmp_path / "features")
+    assert list(features.columns) == [
+        "total_bedrooms",
+        "median_income",
+        "ocean_proximity",
+    ]
+    assert features["ocean_proximity"].astype(object).equals(df["ocean_proximity"])
+    assert np.allclose(labels, df["median_house_value"])
+    assert features["total_bedrooms"].isna().sum() == 1
+
+
+def test_feature_store_zero_copy(tmp_path):
+    features = pd.DataFrame({"median_income": np.linspace(0.5, 9.5, 100)})
+    labels = pd.Series(np.linspace(1e5, 5e5, 100), name="median_house_value")
+    feature_store.write_feature_store(features, labels, tmp_path, "train")
+    features, labels = feature_store.read_feature_store(tmp_path, "train")
+    assert not features["median_income"].to_numpy().flags.writeable
+    assert not labels.to_numpy().flags.writeable
@@ -0,0 +1,78 @@
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from housing_value import forest, train
+from housing_value.score import scoring_with_pipeline
+from housing_value.utility import FusedPreprocessor
+
+
+def test_float32_thresholds():
+    threshold = np.array([0.1, 0.5, 1 / 3, -0.7, 2.0**-140])
+    rounded = forest.float32_thresholds(threshold)
+    assert rounded.dtype == np.float32
+    assert np.all(rounded.astype(np.float64) <= threshold)
+    above = np.nextafter(rounded, np.float32(np.inf))
+    assert np.all(above.astype(np.float64) > threshold)
+
+
+@pytest.mark.parametrize("housing_data", [2000], indirect=True)
+@pytest.mark.parametrize("dtype", forest.COMPACT_DTYPES)
+def test_compact_forest_regressor(dtype, housing_data):
+    features, labels = housing_data
+    X = FusedPreprocessor().fit(features).transform(features)
+    rf = RandomForestRegressor(n_estimators=10, random_state=42).fit(X, labels)
+    compact = forest.CompactForestRegressor(dtype=dtype, batch_size=500).compact(rf)
+    assert np.array_equal(compact.apply(X) - compact.roots_, rf.apply(X))
+    if dtype == "float64":
+        assert np.array_equal(compact.predict(X), rf.predict(X))
+    else:
+        assert np.allclose(compact.predict(X), rf.predict(X), rtol=1e-6)
+    assert len(pickle.dumps(compact)) < len(pickle.dumps(rf)) / 2
+
+
+def test_training_with_pipeline_compact(tmp_path, housing_data):
+    features, labels = housing_data
+    kwargs = dict(
+        preprocessor="fused",
+        param_grid=[{"n_estimators": [10], "max_features": [4]}],
+        pickle_path=str(tmp_path),
+    )
+    pipe, _ = train.training_with_pipeline(features, labels, **kwargs)
+    compact_pipe, _ = train.training_with_pipeline(
+        features, labels, pipe_file="compact.pkl", compact="float64", **kwargs
+    )
+    assert isinstance(compact_pipe.named_steps["rf"], forest.CompactForestRegressor)
+    _, rmse = scoring_with_pipeline(
+        features, labels, pickle_path=str(tmp_path), pipe_file="pipe.pkl"
+    )
+    _, compact_rmse = scoring_with_pipeline(
+        features, labels, pickle_path=str(tmp_path), pipe_file="compact.pkl"
+    )
+    assert compact_rmse == rmse
+
+
+@pytest.mark.parametrize("compact", [False, "float64", "float32"])
+def test_scoring_with_vectorized_engine(tmp_path, compact, housing_data):
+    features, labels = housing_data
+    pipe, _ = train.training_with_pipeline(
+        features,
+        labels,
+        preprocessor="fused",
+        param_grid=[{"n_estimators": [10], "max_features": [4]}],
+        pickle_path=str(tmp_path),
+        compact=compact,
+    )
+    output, rmse = scoring_with_pipeline(
+        features, labels, pickle_path=str(tmp_path), engine="vectorized", n_jobs=3
+    )
+    assert np.allclose(output["Prediction"], pipe.predict(features))
+    vectorized = forest.vectorized_pipeline(pipe, n_jobs=3)
+    assert vectorized.named_steps["rf"].n_jobs == 3
+    assert np.array_equal(vectorized.predict(features), pipe.predict(features))
+    with pytest.raises(ValueError):
+        scoring_with_pipeline(
+            features, labels, pickle_path=str(tmp_path), engine="treelite"
+        )
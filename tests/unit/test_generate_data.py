@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from housing_value import dataset, generate_data, ingest_data
+
+
+def test_generate_housing_data():
+    df = generate_data.generate_housing_data(50000, missing_rate=0.05)
+    assert list(df.columns) == dataset.NUMERIC_COLUMNS + dataset.CATEGORICAL_COLUMNS
+    assert df["total_bedrooms"].isna().mean() == pytest.approx(0.05, abs=0.01)
+    income_cat = ingest_data.data_labeling(df)["income_cat"]
+    shares = income_cat.value_counts(normalize=True).sort_index()
+    assert np.allclose(shares, generate_data.INCOME_CAT_SHARES, atol=0.01)
+    assert set(df["ocean_proximity"].unique()) <= set(
+        dataset.OCEAN_PROXIMITY_CATEGORIES
+    )
+
+
+def test_generate_housing_chunks():
+    chunks = list(generate_data.generate_housing_chunks(2500, chunksize=1000))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    df = pd.concat(chunks)
+    assert df.index.equals(pd.RangeIndex(2500))
+    assert df.equals(pd.concat(generate_data.generate_housing_chunks(2500, 1000)))
+
+
+def test_write_housing_data(tmp_path):
+    archive = generate_data.write_housing_data(
+        tmp_path, 2500, chunksize=1000, archive=True
+    )
+    df = ingest_data.stream_housing_data(archive)
+    assert len(df) == 2500
+    with pytest.raises(FileExistsError):
+        generate_data.write_housing_data(tmp_path, 100, archive=True)
+    generate_data.write_housing_data(tmp_path, 2500, "feather", chunksize=1000)
+    df = dataset.read_dataset(tmp_path, "housing", "feather")
+    assert df["ocean_proximity"].dtype == "category"
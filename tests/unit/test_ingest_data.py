@@ -1,9 +1,16 @@
 import configparser
+import functools
+import os
+import tarfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from os import path
 
+import numpy as np
 import pandas as pd
+import pytest
 
-from housing_value import ingest_data
+from housing_value import dataset, generate_data, ingest_data
 
 config = configparser.ConfigParser()
 config.read("setup.cfg")
@@ -25,3 +32,227 @@ def test_load_housing_data():
 def test_data_ingestion():
     df = ingest_data.data_ingestion(housing_url=HOUSING_URL, housing_path=HOUSING_PATH)
     assert isinstance(df, pd.DataFrame)
+
+
+def archive_constructor(directory):
+    csv_path = directory / "housing.csv"
+    csv_path.write_text("median_income,median_house_value\n1.5,100000.0\n")
+    tgz_path = directory / "housing.tgz"
+    with tarfile.open(tgz_path, "w:gz") as archive:
+        archive.add(csv_path, arcname="housing.csv")
+    return tgz_path
+
+
+def test_fetch_housing_data_cache(tmp_path, monkeypatch):
+    tgz_path = archive_constructor(tmp_path)
+    raw_path, cache_path = tmp_path / "raw", tmp_path / "cache"
+    ingest_data.fetch_housing_data(tgz_path.as_uri(), raw_path, cache_path=cache_path)
+    # raw files are copies, editing them leaves the cached object as it was
+    (raw_path / "housing.csv").write_text("edited")
+    (entry_path,) = (cache_path / "objects").iterdir()
+    assert (entry_path / "housing.csv").read_text() != "edited"
+    downloads = []
+    monkeypatch.setattr(
+        ingest_data.urllib.request, "urlretrieve", lambda *args: downloads.append(args)
+    )
+    ingest_data.fetch_housing_data(tgz_path.as_uri(), raw_path, cache_path=cache_path)
+    assert path.exists(raw_path / "housing.csv") and not downloads
+
+
+def test_fetch_housing_data_unsafe_archive(tmp_path):
+    csv_path = tmp_path / "housing.csv"
+    csv_path.write_text("median_income\n1.0\n")
+    tgz_path = tmp_path / "archive" / "housing.tgz"
+    tgz_path.parent.mkdir()
+    with tarfile.open(tgz_path, "w:gz") as archive:
+        archive.add(csv_path, arcname="../housing.csv")
+    for cache_path in (None, tmp_path / "cache"):
+        with pytest.raises(ValueError):
+            ingest_data.fetch_housing_data(
+                tgz_path.as_uri(), tmp_path / "archive" / "raw", cache_path=cache_path
+            )
+
+
+def test_fetch_housing_data_cache_http(tmp_path):
+    tgz_path = archive_constructor(tmp_path)
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/housing.tgz"
+    try:
+        for _ in range(2):
+            ingest_data.fetch_housing_data(
+                url, tmp_path / "raw", cache_path=tmp_path / "cache"
+            )
+    finally:
+        server.shutdown()
+    sha256 = ingest_data.file_sha256(tgz_path)
+    assert os.listdir(tmp_path / "cache" / "objects") == [sha256]
+
+
+def test_evict_cache(tmp_path):
+    tgz_path = archive_constructor(tmp_path)
+    ingest_data.fetch_housing_data(
+        tgz_path.as_uri(), tmp_path / "raw", cache_path=tmp_path / "cache"
+    )
+    evicted = ingest_data.evict_cache(tmp_path / "cache", max_size=0)
+    assert evicted == [ingest_data.file_sha256(tgz_path)]
+
+
+def test_multi_source_ingestion_cache(tmp_path):
+    for name in ("north", "east"):
+        (tmp_path / name).mkdir()
+        generate_data.write_housing_data(tmp_path / name, 200, seed=len(name))
+    sources = [tmp_path / "north" / "housing.csv", tmp_path / "east" / "housing.csv"]
+    cache_path = tmp_path / "cache"
+    for _ in range(2):
+        df = ingest_data.data_ingestion(
+            sources, tmp_path / "raw", cache_path=cache_path, max_cache_size=0
+        )
+        assert len(df) == 400
+    # entries of the sources just parsed are kept, older ones are evicted
+    assert len(os.listdir(cache_path / "objects")) == 2
+    evicted = ingest_data.evict_cache(
+        cache_path, max_size=0, keep=[cache_path / "objects" / "missing"]
+    )
+    assert len(evicted) == 2 and os.listdir(cache_path / "urls") == []
+
+
+def test_stream_housing_data(tmp_path):
+    tgz_path = archive_constructor(tmp_path)
+    df = ingest_data.stream_housing_data(tgz_path.as_uri())
+    chunks = list(ingest_data.stream_housing_data(tgz_path, chunksize=1))
+    assert df.equals(pd.read_csv(tmp_path / "housing.csv")) and len(chunks) == 1
+
+
+def test_data_ingestion_stream(tmp_path):
+    tgz_path = archive_constructor(tmp_path)
+    df = ingest_data.data_ingestion(tgz_path.as_uri(), tmp_path / "raw", stream=True)
+    assert isinstance(df, pd.DataFrame) and not path.exists(tmp_path / "raw")
+
+
+def test_chunked_split_data(tmp_path):
+    df = pd.DataFrame(
+        {
+            "median_income": np.linspace(0.5, 9.5, 1000),
+            "median_house_value": np.linspace(1e5, 5e5, 1000),
+        }
+    )
+    chunks = (df.iloc[start : start + 64].copy() for start in range(0, len(df), 64))
+    train_rows, test_rows = ingest_data.chunked_split_data(
+        chunks, tmp_path, split_size=0.2, data_format="parquet"
+    )
+    test_set = ingest_data.data_labeling(pd.read_parquet(tmp_path / "test.parquet"))
+    expected = ingest_data.data_labeling(df)["income_cat"].value_counts() * 0.2
+    assert train_rows + test_rows == 1000 and abs(test_rows - 200) <= 3
+    assert np.allclose(test_set["income_cat"].value_counts(), expected, atol=1)
+
+
+def test_hash_split_mask():
+    df = ingest_data.data_labeling(generate_data.generate_housing_data(20000))
+    test_mask = ingest_data.hash_split_mask(df)
+    assert np.array_equal(
+        test_mask, ingest_data.hash_split_mask(df.drop("income_cat", axis=1))
+    )
+    shares = pd.Series(test_mask).groupby(df["income_cat"].to_numpy()).mean()
+    assert np.allclose(shares, 0.2, atol=0.03)
+
+
+def test_hash_split_append(tmp_path):
+    df = ingest_data.data_labeling(
+        pd.DataFrame(
+            {
+                "median_income": np.linspace(0.5, 9.5, 500),
+                "median_house_value": np.linspace(1e5, 5e5, 500),
+            }
+        )
+    )
+    train_set, test_set = ingest_data.save_split_data(df, strategy="hash")
+    ingest_data.save_split_data(df.iloc[:300], tmp_path, strategy="hash")
+    ingest_data.save_split_data(df.iloc[300:], tmp_path, strategy="hash", append=True)
+    test_appended = dataset.read_dataset(tmp_path, "test")
+    assert np.allclose(test_appended["median_income"], test_set["median_income"])
+    assert len(dataset.dataset_files(tmp_path, "train")) == 2
+
+
+def test_incremental_ingestion(tmp_path):
+    sources = []
+    for name, rows in (("north", 300), ("south", 200)):
+        (tmp_path / name).mkdir()
+        pd.DataFrame(
+            {
+                "median_income": np.linspace(0.5, 9.5, rows),
+                "median_house_value": np.linspace(1e5, 5e5, rows),
+            }
+        ).to_csv(tmp_path / name / "housing.csv", index=False)
+        with tarfile.open(tmp_path / name / "housing.tgz", "w:gz") as archive:
+            archive.add(tmp_path / name / "housing.csv", arcname="housing.csv")
+        sources.append(str(tmp_path / name / "housing.tgz"))
+    processed_path = tmp_path / "processed"
+    manifest = ingest_data.incremental_ingestion(
+        sources[:1], tmp_path / "raw", processed_path
+    )
+    manifest = ingest_data.incremental_ingestion(
+        sources, tmp_path / "raw", processed_path
+    )
+    assert sum(record["rows"] for record in manifest["sources"].values()) == 500
+    train_set = dataset.read_dataset(processed_path, "train")
+    test_set = dataset.read_dataset(processed_path, "test")
+    assert len(train_set) + len(test_set) == 500
+    with tarfile.open(sources[1], "w:gz") as archive:
+        archive.add(tmp_path / "north" / "housing.csv", arcname="housing.csv")
+    manifest = ingest_data.incremental_ingestion(
+        sources, tmp_path / "raw", processed_path
+    )
+    train_set = dataset.read_dataset(processed_path, "train")
+    test_set = dataset.read_dataset(processed_path, "test")
+    assert len(train_set) + len(test_set) == 600
+    assert len(dataset.dataset_files(processed_path, "train")) == 2
+    # sources no longer configured are removed with their rows
+    manifest = ingest_data.incremental_ingestion(
+        sources[:1], tmp_path / "raw", processed_path
+    )
+    train_set = dataset.read_dataset(processed_path, "train")
+    test_set = dataset.read_dataset(processed_path, "test")
+    assert len(manifest["sources"]) == 1
+    assert len(train_set) + len(test_set) == 300
+    # a full rewrite removes the manifest, so no source is skipped afterwards
+    dataset.write_dataset(train_set, processed_path, "train")
+    assert not (processed_path / dataset.MANIFEST_FILE).exists()
+    manifest = ingest_data.incremental_ingestion(
+        sources, tmp_path / "raw", processed_path
+    )
+    train_set = dataset.read_dataset(processed_path, "train")
+    test_set = dataset.read_dataset(processed_path, "test")
+    assert len(train_set) + len(test_set) == 600
+    # csv sources are ingested like archives
+    manifest = ingest_data.incremental_ingestion(
+        sources + [str(tmp_path / "south" / "housing.csv")],
+        tmp_path / "raw",
+        processed_path,
+    )
+    train_set = dataset.read_dataset(processed_path, "train")
+    test_set = dataset.read_dataset(processed_path, "test")
+    assert len(manifest["sources"]) == 3
+    assert len(train_set) + len(test_set) == 800
+
+
+def test_multi_source_ingestion(tmp_path):
+    for name in ("north", "south", "east"):
+        (tmp_path / name).mkdir()
+        generate_data.write_housing_data(
+            tmp_path / name, 300, seed=len(name), archive=True
+        )
+    df = ingest_data.data_ingestion(
+        str(tmp_path / "*" / "housing.tgz"), tmp_path / "raw", max_workers=2
+    )
+    assert len(df) == 900
+    assert df["ocean_proximity"].dtype == "category"
+    south = ingest_data.parse_source(tmp_path / "south" / "housing.csv")
+    assert df.iloc[600:].reset_index(drop=True).equals(south)
+    chunks = ingest_data.data_ingestion_chunks(
+        [tmp_path / "north" / "housing.tgz", tmp_path / "south" / "housing.tgz"],
+        tmp_path / "raw",
+        chunksize=200,
+    )
+    assert sum(len(chunk) for chunk in chunks) == 600
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import Pipeline
+
+from housing_value import search, train
+from housing_value.utility import ResourceProfiler
+
+
+def test_warm_start_groups():
+    candidate_params = [
+        {"max_features": 2, "n_estimators": 30},
+        {"max_features": 2, "n_estimators": 3},
+        {"max_features": 4, "n_estimators": 10},
+        {"max_features": 2, "n_estimators": 10},
+    ]
+    groups = search.warm_start_groups(candidate_params)
+    assert groups == [[1, 3, 0], [2]]
+
+
+def test_best_model_store(tmp_path):
+    models = search.BestModelStore(str(tmp_path))
+    assert models.save(0, 3, -2.0, "three")
+    assert not models.save(0, 4, -3.0, "four")
+    assert models.save(0, 1, -2.0, "one")
+    assert models.save(1, 4, -3.0, "four")
+    assert models.scores(0) == {1: -2.0} and models.scores(1) == {4: -3.0}
+    assert models.load(0, 1) == "one" and models.load(0, 3) is None
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_search_fingerprint(tmp_path):
+    X, y = np.arange(20.0).reshape(10, 2), np.arange(10.0)
+    folds = [(np.arange(5), np.arange(5, 10))]
+    pipeline = Pipeline([("rf", RandomForestRegressor(n_jobs=1))])
+    fingerprint = search.search_fingerprint(pipeline, X, y, folds)
+    parallel = Pipeline(
+        [("rf", RandomForestRegressor(n_jobs=-1, verbose=1))], memory=str(tmp_path)
+    )
+    assert search.search_fingerprint(parallel, X, y, folds) == fingerprint
+    other = Pipeline([("rf", RandomForestRegressor(n_jobs=1, max_features=1))])
+    assert search.search_fingerprint(other, X, y, folds) != fingerprint
+
+
+def test_forest_search_cv(monkeypatch, housing_data, pipeline):
+    # fits are not profiled without profile
+    profilers = []
+
+    class SpyProfiler(ResourceProfiler):
+        def __init__(self):
+            profilers.append(self)
+            super().__init__()
+
+    monkeypatch.setattr(search, "ResourceProfiler", SpyProfiler)
+    features, labels = housing_data
+    param_grid = [
+        {f"rf__{name}": values for name, values in grid.items()}
+        for grid in train.DEFAULT_PARAM_GRID
+    ]
+    kwargs = dict(cv=5, scoring="neg_mean_squared_error", return_train_score=True)
+    grid_search = GridSearchCV(pipeline, param_grid, **kwargs).fit(features, labels)
+    forest_search = search.ForestSearchCV(
+        pipeline, param_grid, n_estimators_param="rf__n_estimators", **kwargs
+    ).fit(features, labels)
+    assert set(forest_search.cv_results_) == set(grid_search.cv_results_)
+    for key, values in grid_search.cv_results_.items():
+        if key.endswith("_score"):
+            assert np.array_equal(forest_search.cv_results_[key], values)
+    assert forest_search.cv_results_["params"] == grid_search.cv_results_["params"]
+    assert forest_search.best_params_ == grid_search.best_params_
+    assert np.array_equal(
+        forest_search.predict(features), grid_search.predict(features)
+    )
+    assert profilers == []
+
+
+@pytest.mark.parametrize("housing_data", [300], indirect=True)
+def test_forest_search_cv_resume(tmp_path, monkeypatch, housing_data, pipeline):
+    features, labels = housing_data
+    kwargs = dict(
+        scoring="neg_mean_squared_error",
+        n_estimators_param="rf__n_estimators",
+        results_path=str(tmp_path),
+    )
+    fits = []
+    fit = RandomForestRegressor.fit
+    monkeypatch.setattr(
+        RandomForestRegressor,
+        "fit",
+        lambda self, *args, **kwargs: fits.append(self) or fit(self, *args, **kwargs),
+    )
+    param_grid = {"rf__n_estimators": [3, 10], "rf__max_features": [2, 4]}
+    first = search.ForestSearchCV(pipeline, param_grid, **kwargs).fit(features, labels)
+    assert len(fits) == 2 * 2 * 5 + 1
+    fits.clear()
+    second = search.ForestSearchCV(pipeline, param_grid, **kwargs).fit(features, labels)
+    assert len(fits) == 1
+    for key, values in first.cv_results_.items():
+        if key.endswith("_score"):
+            assert np.array_equal(second.cv_results_[key], values)
+    fits.clear()
+    param_grid["rf__max_features"].append(6)
+    third = search.ForestSearchCV(pipeline, param_grid, **kwargs).fit(features, labels)
+    assert len(fits) == 2 * 5 + 1
+    assert np.array_equal(
+        third.cv_results_["mean_test_score"][:4],
+        first.cv_results_["mean_test_score"],
+    )
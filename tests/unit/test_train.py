@@ -0,0 +1,226 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+
+from housing_value import generate_data, ingest_data, train
+from housing_value.utility import AllocationCounter, FusedPreprocessor
+
+
+def test_load_training_data_index():
+    housing = ingest_data.data_labeling(
+        generate_data.generate_housing_data(100000, float_dtype="float32")
+    )
+    train_set, _ = ingest_data.save_split_data(housing)
+    train_index, _ = ingest_data.save_split_data(housing, return_indices=True)
+    with AllocationCounter() as counter:
+        features, labels = train.load_training_data(
+            df=housing, index=train_index, float_dtype="float32"
+        )
+    assert features.equals(train_set.drop("median_house_value", axis=1))
+    assert labels.equals(train_set["median_house_value"])
+    # one gather of train rows, labels and features share its memory
+    assert counter.peak < 1.5 * train_set.memory_usage(index=True, deep=True).sum()
+
+
+def test_training_with_pipeline_cache(tmp_path, monkeypatch, housing_data):
+    features, labels = housing_data
+    fits = []
+    fit = FusedPreprocessor.fit
+    monkeypatch.setattr(
+        FusedPreprocessor,
+        "fit",
+        lambda self, X, y=None: fits.append(len(X)) or fit(self, X),
+    )
+    pipe, best_param = train.training_with_pipeline(
+        features, labels, preprocessor="fused"
+    )
+    assert len(fits) == 18 * 5 + 1
+    fits.clear()
+    cached_pipe, cached_best_param = train.training_with_pipeline(
+        features,
+        labels,
+        preprocessor="fused",
+        cache_path=tmp_path,
+        cache_size=1024**2,
+    )
+    # preprocessor is fitted once per fold and once more on whole data
+    assert len(fits) == 5 + 1
+    assert cached_best_param == best_param
+    assert np.array_equal(cached_pipe.predict(features), pipe.predict(features))
+
+
+@pytest.mark.parametrize("housing_data", [300], indirect=True)
+def test_training_with_pipeline_parallel(housing_data):
+    features, labels = housing_data
+    pipe, best_param = train.training_with_pipeline(
+        features, labels, preprocessor="fused"
+    )
+    for backend, n_jobs, forest_jobs in (("threading", 1, 2), ("loky", 2, None)):
+        parallel_pipe, parallel_best_param = train.training_with_pipeline(
+            features,
+            labels,
+            preprocessor="fused",
+            n_jobs=n_jobs,
+            backend=backend,
+            forest_jobs=forest_jobs,
+        )
+        assert parallel_best_param == best_param
+        assert np.array_equal(parallel_pipe.predict(features), pipe.predict(features))
+
+
+def test_search_cv():
+    search = train.search_cv(RandomForestRegressor(), strategy="random", n_iter=4)
+    assert search.n_iter == 4
+    search = train.search_cv(
+        Pipeline([("rf", RandomForestRegressor())]),
+        strategy="halving",
+        prefix="rf__",
+        resource="n_estimators",
+    )
+    assert search.resource == "rf__n_estimators"
+    assert search.max_resources == 30
+    assert all("rf__n_estimators" not in grid for grid in search.param_grid)
+    with pytest.raises(ValueError):
+        train.search_cv(RandomForestRegressor(), strategy="bayes")
+
+
+@pytest.mark.parametrize("housing_data", [1000], indirect=True)
+def test_training_with_pipeline_halving(housing_data):
+    features, labels = housing_data
+    pipe, best_param = train.training_with_pipeline(
+        features,
+        labels,
+        preprocessor="fused",
+        strategy="halving",
+        resource="n_estimators",
+    )
+    assert best_param["rf__n_estimators"] == 30
+    assert pipe.named_steps["rf"].n_estimators == 30
+
+
+def test_training_with_pipeline_engines(tmp_path, housing_data):
+    features, labels = housing_data
+    report_path = str(tmp_path / "engine_report.json")
+    forest_pipe, forest_param = train.training_with_pipeline(
+        features,
+        labels,
+        param_grid=[{"n_estimators": [10], "max_features": [4]}],
+        report_path=report_path,
+    )
+    boosting_pipe, boosting_param = train.training_with_pipeline(
+        features,
+        labels,
+        param_grid=[{"learning_rate": [0.1, 0.2]}],
+        strategy="halving",
+        resource="n_estimators",
+        engine="boosting",
+        report_path=report_path,
+    )
+    assert set(boosting_param) == {"hgb__learning_rate", "hgb__max_iter"}
+    assert boosting_pipe.named_steps["hgb"].n_iter_ <= boosting_param["hgb__max_iter"]
+    assert boosting_pipe.predict(features).shape == labels.shape
+    with open(report_path) as file:
+        reports = json.load(file)
+    assert set(reports) == {"forest", "boosting"}
+    for report in reports.values():
+        assert report["model_size"] > 0
+        assert report["predict_rows"] == len(features)
+    with pytest.raises(ValueError):
+        train.model_engine("linear")
+
+
+def test_refresh_pipeline(tmp_path, housing_data):
+    features, labels = housing_data
+    pipe, _ = train.training_with_pipeline(
+        features.iloc[:400],
+        labels.iloc[:400],
+        pickle_path=str(tmp_path),
+        preprocessor="fused",
+        param_grid=[{"n_estimators": [10], "max_features": [4]}],
+    )
+    trees = [tree.tree_.threshold.copy() for tree in pipe.named_steps["rf"]]
+    # larger new rows move the running median away from the one the trees were fit with
+    features = features.copy()
+    features.iloc[400:, features.columns.get_loc("total_bedrooms")] *= 10
+    features.iloc[0, features.columns.get_loc("total_bedrooms")] = np.nan
+    refreshed, n_estimators = train.refresh_pipeline(
+        features.iloc[400:], labels.iloc[400:], pickle_path=str(tmp_path)
+    )
+    forest = refreshed.named_steps["rf"]
+    assert n_estimators == 2
+    assert len(forest.estimators_) == 12 and not forest.warm_start
+    for tree, threshold in zip(forest.estimators_, trees):
+        assert np.array_equal(tree.tree_.threshold, threshold)
+    with open(tmp_path / "pipe.pkl", "rb") as file:
+        assert len(pickle.load(file).named_steps["rf"].estimators_) == 12
+    assert refreshed.predict(features).shape == labels.shape
+    preprocessor = refreshed.named_steps["preprocessor"]
+    assert preprocessor.n_samples_seen_ == len(features)
+    trained = pipe.named_steps["preprocessor"]
+    assert np.array_equal(preprocessor.transform(features), trained.transform(features))
+
+
+def test_training_with_pipeline_final(tmp_path, monkeypatch, housing_data):
+    features, labels = housing_data
+    kwargs = dict(
+        preprocessor="fused",
+        param_grid=[{"n_estimators": [3, 10], "max_features": [2, 4]}],
+    )
+    refit_pipe, refit_param = train.training_with_pipeline(features, labels, **kwargs)
+    future, background_param = train.training_with_pipeline(
+        features, labels, pickle_path=str(tmp_path), final="background", **kwargs
+    )
+    background_pipe = future.result()
+    assert background_param == refit_param
+    assert np.array_equal(
+        background_pipe.predict(features), refit_pipe.predict(features)
+    )
+    assert (tmp_path / "pipe.pkl").exists()
+    fits = []
+    fit = Pipeline.fit
+    monkeypatch.setattr(
+        Pipeline, "fit", lambda self, X, y: fits.append(len(X)) or fit(self, X, y)
+    )
+    ensemble, ensemble_param = train.training_with_pipeline(
+        features, labels, final="fold_ensemble", **kwargs
+    )
+    # only the fits of search on 4/5 of rows, no refit on all rows
+    assert ensemble_param == refit_param
+    assert fits == [len(features) * 4 // 5] * 4 * 5
+    assert len(ensemble.estimators) == 5
+    predictions = np.mean([pipe.predict(features) for pipe in ensemble.estimators], 0)
+    assert np.allclose(ensemble.predict(features), predictions)
+    with pytest.raises(ValueError):
+        train.training_with_pipeline(
+            features, labels, strategy="halving", final="fold_ensemble", **kwargs
+        )
+
+
+def test_training_with_pipeline_profile(tmp_path, housing_data):
+    features, labels = housing_data
+    profile_path = str(tmp_path / "profile_report.json")
+    train.training_with_pipeline(
+        features,
+        labels,
+        preprocessor="fused",
+        param_grid=[{"n_estimators": [3, 10], "max_features": [2, 4]}],
+        warm_start=True,
+        profile_path=profile_path,
+    )
+    with open(profile_path) as file:
+        report = json.load(file)
+    assert len(report["fits"]) == 4 * 5 and len(report["candidates"]) == 4
+    for fit in report["fits"]:
+        assert fit["wall_time"] > 0 and fit["cpu_time"] > 0
+        assert fit["peak_rss"] > 0 and fit["model_size"] > 0
+        assert fit["concurrent"] is False
+    sizes = {
+        candidate["params"]["rf__n_estimators"]: candidate["model_size"]
+        for candidate in report["candidates"]
+        if candidate["params"]["rf__max_features"] == 2
+    }
+    assert sizes[10] > sizes[3]
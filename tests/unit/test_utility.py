@@ -0,0 +1,85 @@
+import pickle
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from housing_value import generate_data, utility
+from housing_value.utility import (
+    AdditionalAttributes,
+    AllocationCounter,
+    FusedPreprocessor,
+)
+
+
+def test_allocation_counter():
+    with AllocationCounter() as counter:
+        array = np.ones(1_000_000)
+        np.ones(1_000_000)
+    assert counter.allocated >= array.nbytes
+    assert counter.peak >= 2 * array.nbytes
+
+
+def test_fused_preprocessor():
+    df = generate_data.generate_housing_data(5000, missing_rate=0.05)
+    df = df.drop("median_house_value", axis=1)
+    numeric_features = [col for col in df.columns if col != "ocean_proximity"]
+    column_transformer = ColumnTransformer(
+        transformers=[
+            (
+                "num",
+                Pipeline(
+                    [
+                        ("imputer", SimpleImputer(strategy="median")),
+                        ("new_attributes", AdditionalAttributes()),
+                    ]
+                ),
+                numeric_features,
+            ),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), ["ocean_proximity"]),
+        ]
+    )
+    expected = column_transformer.fit(df).transform(df)
+    fused = pickle.loads(pickle.dumps(FusedPreprocessor().fit(df)))
+    assert np.allclose(fused.transform(df), expected)
+    assert np.allclose(fused.transform(df.iloc[:1]), expected[:1])
+    assert len(fused.get_feature_names_out()) == expected.shape[1]
+    df.loc[df.index[0], "ocean_proximity"] = np.nan
+    fused, column_transformer = FusedPreprocessor().fit(df), column_transformer.fit(df)
+    unseen = df.iloc[:3].copy()
+    unseen["ocean_proximity"] = ["MARS", np.nan, "INLAND"]
+    assert fused.encode_missing_
+    assert np.allclose(fused.transform(unseen), column_transformer.transform(unseen))
+
+
+def test_additional_attributes_columns():
+    df = generate_data.generate_housing_data(100)[utility.FEATURE_COLUMNS[::-1]]
+    transformer = AdditionalAttributes(dtype="float32").fit(df)
+    output = transformer.transform(df.to_numpy())
+    assert output.dtype == np.float32
+    assert np.allclose(output[:, -3], df["total_rooms"] / df["households"])
+    transformer = AdditionalAttributes(columns=list(df.columns)).fit(df.to_numpy())
+    assert np.allclose(transformer.transform(df.to_numpy()), output)
+
+
+def test_fused_preprocessor_partial_fit():
+    df = generate_data.generate_housing_data(2000, missing_rate=0.05, seed=1)
+    old, new = df.iloc[:1500], df.iloc[1500:]
+    fused = FusedPreprocessor().fit(old.drop("median_house_value", axis=1))
+    fused.partial_fit(new.drop("median_house_value", axis=1))
+    medians = df.drop(["median_house_value", "ocean_proximity"], axis=1).median()
+    assert fused.n_samples_seen_ == len(df)
+    assert np.allclose(fused.statistics_, medians.to_numpy(), rtol=0.01)
+
+
+def test_resource_profiler():
+    before = utility.peak_rss()
+    with utility.ResourceProfiler() as profiler:
+        values = np.ones(20_000_000)
+        values.sum()
+    assert profiler.wall_time >= profiler.cpu_time * 0.5 > 0
+    assert profiler.peak_rss >= max(values.nbytes, before)
+    assert profiler.rss_growth == profiler.peak_rss - profiler.start[2] >= 0
+    assert utility.pickled_size(values) >= values.nbytes